@@ -3,7 +3,14 @@ Django admin page
 """
 from django.contrib import admin
 
-from openedx_external_enrollments.models import EnrollmentRequestLog, ProgramSalesforceEnrollment
+from openedx_external_enrollments.models import (
+    EnrollmentDeadLetter,
+    EnrollmentRequestLog,
+    ExternalCourse,
+    ExternalEnrollmentJob,
+    ExternalEnrollmentOutbox,
+    ProgramSalesforceEnrollment,
+)
 
 
 class ProgramSalesforceEnrollmentAdmin(admin.ModelAdmin):
@@ -20,15 +27,106 @@ class ProgramSalesforceEnrollmentAdmin(admin.ModelAdmin):
 class EnrollmentRequestLogAdmin(admin.ModelAdmin):
     """
     Enrollment request model admin.
+
+    The search uses the indexed columns: an exact course id, or the email of the learner.
     """
     list_display = [
         'request_type',
+        'course_id',
+        'http_status',
+        'success',
+        'duration',
+        'created_at',
+        'updated_at',
+    ]
+
+    list_filter = ('request_type', 'success', 'http_status',)
+    search_fields = ('=course_id',)
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Search emails by their hash, any other term is matched against the course id.
+        """
+        if '@' in search_term:
+            return queryset.filter(user_email_hash=EnrollmentRequestLog.hash_email(search_term)), False
+
+        return super(EnrollmentRequestLogAdmin, self).get_search_results(request, queryset, search_term)
+
+
+class ExternalEnrollmentJobAdmin(admin.ModelAdmin):
+    """
+    External enrollment job model admin.
+
+    The enrollment data isn't searchable, matching the JSON blob scans the whole table.
+    """
+    list_display = [
+        'job_id',
+        'controller',
+        'course_id',
+        'status',
+        'response_status',
         'created_at',
         'updated_at',
     ]
 
-    search_fields = ('request_type', 'details',)
+    list_filter = ('status', 'controller',)
+    search_fields = ('job_id', 'course_id',)
+
+
+class EnrollmentDeadLetterAdmin(admin.ModelAdmin):
+    """
+    Enrollment dead letter model admin.
+
+    The dead letters are filtered by request type instead of searching their payloads.
+    """
+    list_display = [
+        'request_type',
+        'attempts',
+        'created_at',
+        'replayed_at',
+    ]
+
+    list_filter = ('request_type',)
+
+
+class ExternalCourseAdmin(admin.ModelAdmin):
+    """
+    External course index model admin.
+    """
+    list_display = [
+        'course_id',
+        'external_platform_target',
+        'external_course_run_id',
+        'updated_at',
+    ]
+
+    list_filter = ('external_platform_target',)
+    search_fields = ('course_id', 'external_course_run_id',)
+
+
+class ExternalEnrollmentOutboxAdmin(admin.ModelAdmin):
+    """
+    External enrollment outbox model admin.
+    """
+    list_display = [
+        'user_email',
+        'course_id',
+        'course_mode',
+        'is_active',
+        'version',
+        'status',
+        'attempts',
+        'created_at',
+        'sent_at',
+    ]
+
+    list_filter = ('status', 'is_active',)
+    search_fields = ('=user_email', '=course_id', '=idempotency_key',)
 
 
+admin.site.register(EnrollmentDeadLetter, EnrollmentDeadLetterAdmin)
 admin.site.register(EnrollmentRequestLog, EnrollmentRequestLogAdmin)
+admin.site.register(ExternalCourse, ExternalCourseAdmin)
+admin.site.register(ExternalEnrollmentJob, ExternalEnrollmentJobAdmin)
+admin.site.register(ExternalEnrollmentOutbox, ExternalEnrollmentOutboxAdmin)
 admin.site.register(ProgramSalesforceEnrollment, ProgramSalesforceEnrollmentAdmin)
@@ -13,10 +13,30 @@ urlpatterns = [
         views.ExternalEnrollment.as_view(),
         name='external-enrollment',
     ),
+    url(
+        r'^external-enrollment/jobs/(?P<job_id>[0-9a-f-]+)$',
+        views.ExternalEnrollmentJobView.as_view(),
+        name='external-enrollment-job',
+    ),
+    url(
+        r'^external-enrollment/bulk$',
+        views.BulkExternalEnrollment.as_view(),
+        name='bulk-external-enrollment',
+    ),
     url(
         r'^salesforce-enrollment$',
         views.SalesforceEnrollmentView.as_view(),
         name='salesforce-enrollment',
     ),
+    url(
+        r'^circuit-breakers$',
+        views.CircuitBreakerView.as_view(),
+        name='circuit-breakers',
+    ),
+    url(
+        r'^circuit-breakers/(?P<provider>[\w.-]+)$',
+        views.CircuitBreakerView.as_view(),
+        name='circuit-breaker',
+    ),
 
 ]
@@ -2,21 +2,32 @@
 This file contains the views for openedx-external-enrollments API.
 """
 import logging
+from collections import OrderedDict
 
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.http import JsonResponse
 from opaque_keys.edx.keys import CourseKey
 from rest_framework import status
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.permissions import IsAdminUser
 from rest_framework.views import APIView
 from rest_framework_oauth.authentication import OAuth2Authentication
 
-from openedx_external_enrollments.edxapp_wrapper.get_courseware import get_course_by_id
+from openedx_external_enrollments.circuit_breakers import CircuitBreaker, get_circuit_breakers_stats
+from openedx_external_enrollments.edxapp_wrapper.get_courseware import get_course_by_id, get_other_course_settings
 from openedx_external_enrollments.edxapp_wrapper.get_edx_rest_framework_extensions import get_jwt_authentication
 from openedx_external_enrollments.edxapp_wrapper.get_openedx_permissions import get_api_key_permission
+from openedx_external_enrollments.exceptions import UnknownExternalTargetError
 from openedx_external_enrollments.external_enrollments.salesforce_external_enrollment import SalesforceEnrollment
 from openedx_external_enrollments.factory import ExternalEnrollmentFactory
-from openedx_external_enrollments.tasks import generate_salesforce_enrollment
+from openedx_external_enrollments.models import ExternalEnrollmentJob
+from openedx_external_enrollments.tasks import generate_salesforce_enrollment, process_external_enrollment_job
+from openedx_external_enrollments.tracing import traced
 
 LOG = logging.getLogger(__name__)
+ASYNC_MODE = 'async'
 
 
 class ExternalEnrollment(APIView):
@@ -32,9 +43,13 @@ class ExternalEnrollment(APIView):
         get_api_key_permission(),
     ]
 
+    @traced('external_enrollment_view')
     def post(self, request):
         """
         View to execute the external enrollment.
+
+        With mode=async in the query string, or when it's the configured default mode, the enrollment
+        is executed by a celery task and the response contains the job id to poll its status.
         """
         response = {}
         course = self._get_course(request.data.get("course_id"))
@@ -57,6 +72,9 @@ class ExternalEnrollment(APIView):
                 status=status.HTTP_200_OK,
             )
         else:
+            if self._get_mode(request) == ASYNC_MODE:
+                return self._enqueue_enrollment(request, course)
+
             # Now, let's try to execute the enrollment
             response, request_status = enrollment_controller._post_enrollment(  # pylint: disable=protected-access
                 request.data,
@@ -77,6 +95,196 @@ class ExternalEnrollment(APIView):
         course = get_course_by_id(course_key)
         return course
 
+    @staticmethod
+    def _get_mode(request):
+        """
+        Return the execution mode requested by the caller or the default one.
+        """
+        return request.query_params.get("mode", settings.EXTERNAL_ENROLLMENTS_API_DEFAULT_MODE).lower()
+
+    @staticmethod
+    def _enqueue_enrollment(request, course):
+        """
+        Create the enrollment job and enqueue it once the job has been committed.
+        """
+        job = ExternalEnrollmentJob.objects.create(  # pylint: disable=no-member
+            controller=course.other_course_settings.get("external_platform_target"),
+            course_id=str(course.id),
+            data=dict(request.data.items()),
+        )
+        job_id = str(job.job_id)
+        transaction.on_commit(lambda: process_external_enrollment_job.delay(job_id))
+
+        response = job.to_dict()
+        response["status_url"] = "{}/jobs/{}".format(request.path, job_id)
+
+        return JsonResponse(response, status=status.HTTP_202_ACCEPTED)
+
+
+class ExternalEnrollmentJobView(APIView):
+    """
+    ExternalEnrollmentJobView APIView.
+    """
+
+    authentication_classes = [
+        get_jwt_authentication(),
+        OAuth2Authentication,
+    ]
+    permission_classes = [
+        get_api_key_permission(),
+    ]
+
+    def get(self, request, job_id):  # pylint: disable=unused-argument
+        """
+        View to get the status of an asynchronous external enrollment.
+        """
+        try:
+            job = ExternalEnrollmentJob.objects.get(job_id=job_id)  # pylint: disable=no-member
+        except (ExternalEnrollmentJob.DoesNotExist, ValidationError):  # pylint: disable=no-member
+            return JsonResponse(
+                {"error": "Job {} not found".format(job_id)},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        return JsonResponse(job.to_dict(), status=status.HTTP_200_OK)
+
+
+class BulkExternalEnrollment(APIView):
+    """
+    BulkExternalEnrollment APIView.
+    """
+
+    authentication_classes = [
+        get_jwt_authentication(),
+        OAuth2Authentication,
+    ]
+    permission_classes = [
+        get_api_key_permission(),
+    ]
+
+    @traced('bulk_external_enrollment_view')
+    def post(self, request):
+        """
+        View to execute many external enrollments, grouped by controller.
+
+        The body is either a list of enrollments or an object with an "enrollments" list,
+        every enrollment contains the user_email, course_id, course_mode and is_active keys.
+        At most EXTERNAL_ENROLLMENTS_BULK_MAX_SIZE enrollments are accepted per request.
+        """
+        enrollments = request.data
+
+        if isinstance(enrollments, dict):
+            enrollments = enrollments.get("enrollments")
+
+        if not enrollments or not isinstance(enrollments, list):
+            return JsonResponse(
+                {"error": "Invalid operation: a list of enrollments is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if len(enrollments) > settings.EXTERNAL_ENROLLMENTS_BULK_MAX_SIZE:
+            return JsonResponse(
+                {"error": "Invalid operation: at most {} enrollments are allowed per request".format(
+                    settings.EXTERNAL_ENROLLMENTS_BULK_MAX_SIZE,
+                )},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        errors = self._validate_enrollments(enrollments)
+
+        if errors:
+            return JsonResponse(
+                {"error": "Invalid operation: invalid enrollments", "errors": errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return JsonResponse(
+            {"results": self._execute_bulk_enrollment(enrollments)},
+            status=status.HTTP_200_OK,
+        )
+
+    def _execute_bulk_enrollment(self, enrollments):
+        """
+        Group the enrollments by controller, execute every group and return a result per enrollment.
+        """
+        results = [None] * len(enrollments)
+        courses_settings = {}
+        controller_groups = OrderedDict()
+
+        for index, enrollment_data in enumerate(enrollments):
+            course_id = enrollment_data.get("course_id")
+
+            if course_id not in courses_settings:
+                courses_settings[course_id] = self._get_course_settings(course_id)
+
+            course_settings = courses_settings[course_id]
+
+            if course_settings is None:
+                results[index] = ({"error": "Invalid operation: course not found"}, status.HTTP_400_BAD_REQUEST)
+                continue
+
+            controller = course_settings.get("external_platform_target")
+
+            if not controller:
+                results[index] = (
+                    {"info": "Course {} not configured as external".format(course_id)},
+                    status.HTTP_200_OK,
+                )
+                continue
+
+            controller_groups.setdefault(controller.lower(), []).append((index, enrollment_data, course_settings))
+
+        for controller, group in controller_groups.items():
+            try:
+                enrollment_controller = ExternalEnrollmentFactory.get_enrollment_controller(controller)
+            except UnknownExternalTargetError as error:
+                for index, _, _ in group:
+                    results[index] = ({"error": str(error)}, status.HTTP_400_BAD_REQUEST)
+                continue
+
+            group_results = enrollment_controller._post_bulk_enrollment(  # pylint: disable=protected-access
+                [(enrollment_data, course_settings) for _, enrollment_data, course_settings in group],
+            )
+
+            for (index, _, _), result in zip(group, group_results):
+                results[index] = result
+
+        return [
+            {
+                "user_email": enrollment_data.get("user_email"),
+                "course_id": enrollment_data.get("course_id"),
+                "status": request_status,
+                "response": response,
+            }
+            for enrollment_data, (response, request_status) in zip(enrollments, results)
+        ]
+
+    @staticmethod
+    def _validate_enrollments(enrollments):
+        """
+        Return an error for every enrollment that isn't an object with a user_email and a course_id.
+        """
+        errors = []
+
+        for index, enrollment_data in enumerate(enrollments):
+            if not isinstance(enrollment_data, dict):
+                errors.append({"index": index, "error": "The enrollment must be an object"})
+            elif not enrollment_data.get("user_email") or not enrollment_data.get("course_id"):
+                errors.append({"index": index, "error": "The user_email and course_id are required"})
+
+        return errors
+
+    @staticmethod
+    def _get_course_settings(course_id):
+        """
+        Return the other_course_settings of the course or None when the course can't be loaded.
+        """
+        try:
+            return get_other_course_settings(CourseKey.from_string(course_id))
+        except Exception:  # pylint: disable=broad-except
+            LOG.info('Course [%s] not found', course_id)
+            return None
+
 
 class SalesforceEnrollmentView(APIView):
     """
@@ -91,6 +299,7 @@ class SalesforceEnrollmentView(APIView):
         get_api_key_permission(),
     ]
 
+    @traced('salesforce_enrollment_view')
     def post(self, request):
         """
         View to execute enrollments in salesforce.
@@ -114,3 +323,47 @@ class SalesforceEnrollmentView(APIView):
                 status=status.HTTP_200_OK,
                 safe=False,
             )
+
+
+class CircuitBreakerView(APIView):
+    """
+    CircuitBreakerView APIView, available to staff users only.
+    """
+
+    authentication_classes = [
+        get_jwt_authentication(),
+        OAuth2Authentication,
+        SessionAuthentication,
+    ]
+    permission_classes = [
+        IsAdminUser,
+    ]
+
+    def get(self, request, provider=None):  # pylint: disable=unused-argument
+        """
+        View to get the state and the counters of the circuit breakers.
+        """
+        if provider:
+            return JsonResponse(CircuitBreaker(provider).get_stats(), status=status.HTTP_200_OK)
+
+        return JsonResponse({"results": get_circuit_breakers_stats()}, status=status.HTTP_200_OK)
+
+    def post(self, request, provider=None):
+        """
+        View to open, close or reset the circuit breaker of a provider.
+
+        The body contains the action: open, close or reset.
+        """
+        action = request.data.get("action")
+
+        if not provider or action not in ("open", "close", "reset"):
+            return JsonResponse(
+                {"error": "Invalid operation: a provider and an open, close or reset action are required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        circuit_breaker = CircuitBreaker(provider)
+        getattr(circuit_breaker, action)()
+        LOG.info('Circuit breaker of %s changed with the %s action by %s.', provider, action, request.user)
+
+        return JsonResponse(circuit_breaker.get_stats(), status=status.HTTP_200_OK)
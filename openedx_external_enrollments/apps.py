@@ -51,12 +51,36 @@ class OpenedxExternalEnrollmentConfig(AppConfig):
                         'dispatch_uid': 'update_external_enrollment_receiver',
                         'sender_path': 'student.models.CourseEnrollment',
                     },
+                    {
+                        'receiver_func_name': 'track_enrollment_state',
+                        'signal_path': 'django.db.models.signals.post_init',
+                        'dispatch_uid': 'track_enrollment_state_receiver',
+                        'sender_path': 'student.models.CourseEnrollment',
+                    },
                     {
                         'receiver_func_name': 'delete_external_enrollment',
                         'signal_path': 'django.db.models.signals.post_delete',
                         'dispatch_uid': 'delete_external_enrollment_receiver',
                         'sender_path': 'student.models.CourseEnrollment',
                     },
+                    {
+                        'receiver_func_name': 'invalidate_site_configuration_cache',
+                        'signal_path': 'django.db.models.signals.post_save',
+                        'dispatch_uid': 'invalidate_site_configuration_cache_receiver',
+                        'sender_path': 'openedx.core.djangoapps.site_configuration.models.SiteConfiguration',
+                    },
+                    {
+                        'receiver_func_name': 'invalidate_program_metadata_cache',
+                        'signal_path': 'django.db.models.signals.post_save',
+                        'dispatch_uid': 'invalidate_program_metadata_cache_save_receiver',
+                        'sender_path': 'openedx_external_enrollments.models.ProgramSalesforceEnrollment',
+                    },
+                    {
+                        'receiver_func_name': 'invalidate_program_metadata_cache',
+                        'signal_path': 'django.db.models.signals.post_delete',
+                        'dispatch_uid': 'invalidate_program_metadata_cache_delete_receiver',
+                        'sender_path': 'openedx_external_enrollments.models.ProgramSalesforceEnrollment',
+                    },
                 ],
             },
         },
@@ -70,3 +94,19 @@ class OpenedxExternalEnrollmentConfig(AppConfig):
         from openedx_external_enrollments.api.v0.views import (  # pylint: disable=unused-variable
             generate_salesforce_enrollment,
         )
+        from openedx_external_enrollments.edxapp_wrapper.backend_registry import warm_up_backends
+        from openedx_external_enrollments.edxapp_wrapper.get_courseware import get_course_published_signal
+        from openedx_external_enrollments.signal_receivers import (
+            invalidate_course_settings_cache,
+            update_external_course_index,
+        )
+
+        warm_up_backends()
+        get_course_published_signal().connect(
+            invalidate_course_settings_cache,
+            dispatch_uid='invalidate_course_settings_cache_receiver',
+        )
+        get_course_published_signal().connect(
+            update_external_course_index,
+            dispatch_uid='update_external_course_index_receiver',
+        )
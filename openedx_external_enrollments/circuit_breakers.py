@@ -0,0 +1,261 @@
+"""
+Circuit breakers that stop the enrollment requests to an external platform while it's failing.
+
+The state of every provider is shared by all the workers through the Django cache. The circuit
+opens after failure_threshold consecutive failures, or when failure_rate of the requests sent in
+the current window failed and there were at least min_requests of them. While open, the requests
+are rejected without reaching the provider. After reset_timeout seconds the circuit is half-open
+and a single request probes the provider: the circuit closes when the probe succeeds and opens
+again when it fails.
+
+The state changes and the rejected requests are also emitted as metrics: the circuit_state gauge
+is 0 while closed, 1 while half-open and 2 while open.
+"""
+import logging
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from openedx_external_enrollments.metrics import gauge, increment
+
+LOG = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+FAIL_FAST = 'fail_fast'
+QUEUE = 'queue'
+
+CIRCUIT_CACHE_KEY = 'openedx_external_enrollments.circuit.{provider}.{name}'
+KNOWN_PROVIDERS = ('edX', 'openedX', 'greenfig', 'salesforce')
+STATE_GAUGE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+DEFAULT_CIRCUIT_BREAKER_SETTINGS = {
+    'enabled': True,
+    'failure_threshold': 5,
+    'failure_rate': 0.5,
+    'min_requests': 20,
+    'window': 60,
+    'reset_timeout': 30,
+    'open_action': FAIL_FAST,
+}
+
+
+class CircuitBreaker(object):
+    """
+    Circuit breaker of a provider, e.g. CircuitBreaker(str(controller)).
+    """
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.settings = get_circuit_breaker_settings(provider)
+
+    def get_state(self):
+        """
+        Return the closed, open or half_open state of the circuit.
+        """
+        opened_at = cache.get(self._get_key('opened_at'))
+
+        if opened_at is None:
+            return CLOSED
+
+        if time.time() - opened_at < self.settings['reset_timeout']:
+            return OPEN
+
+        return HALF_OPEN
+
+    def allow_request(self):
+        """
+        True when a request can be sent to the provider.
+
+        Only the first caller of a half-open circuit gets to probe the provider, the rest are
+        rejected until the probe finishes or reset_timeout seconds pass.
+        """
+        if not self.settings['enabled']:
+            return True
+
+        state = self.get_state()
+
+        if state == CLOSED:
+            return True
+
+        if state == HALF_OPEN and cache.add(self._get_key('probe'), True, self.settings['reset_timeout']):
+            LOG.info('Circuit of %s is half-open, probing the provider.', self.provider)
+            self._emit_state(HALF_OPEN)
+            return True
+
+        _increment(self._get_key('rejected'))
+        increment('circuit_rejections', controller=self.provider, state=state)
+        return False
+
+    def get_retry_after(self):
+        """
+        Return the seconds left until the circuit is half-open.
+        """
+        opened_at = cache.get(self._get_key('opened_at'))
+
+        if opened_at is None:
+            return 0
+
+        return max(int(math.ceil(opened_at + self.settings['reset_timeout'] - time.time())), 0)
+
+    def record_success(self):
+        """
+        Count a request answered by the provider, closing the circuit when it wasn't closed.
+        """
+        if not self.settings['enabled']:
+            return
+
+        self._count_request(failed=False)
+        cache.set(self._get_key('consecutive_failures'), 0, None)
+
+        if cache.get(self._get_key('opened_at')) is not None:
+            self.close()
+
+    def record_failure(self):
+        """
+        Count a failed request and open the circuit when a threshold is reached or the probe failed.
+        """
+        if not self.settings['enabled']:
+            return
+
+        window_requests, window_failures = self._count_request(failed=True)
+        consecutive_failures = _increment(self._get_key('consecutive_failures'))
+        state = self.get_state()
+
+        if state == HALF_OPEN:
+            self.open()
+        elif state == CLOSED and (
+                consecutive_failures >= self.settings['failure_threshold']
+                or (
+                    window_requests >= self.settings['min_requests']
+                    and window_failures >= self.settings['failure_rate'] * window_requests
+                )
+        ):
+            self.open()
+
+    def open(self):
+        """
+        Reject the requests to the provider for the next reset_timeout seconds.
+        """
+        cache.set(self._get_key('opened_at'), time.time(), None)
+        cache.delete(self._get_key('probe'))
+        _increment(self._get_key('opened'))
+        self._emit_state(OPEN)
+        LOG.warning('Circuit of %s opened for %s seconds.', self.provider, self.settings['reset_timeout'])
+
+    def close(self):
+        """
+        Send again the requests to the provider.
+        """
+        cache.delete_many([self._get_key('opened_at'), self._get_key('probe')])
+        cache.set(self._get_key('consecutive_failures'), 0, None)
+        self._emit_state(CLOSED)
+        LOG.info('Circuit of %s closed.', self.provider)
+
+    def reset(self):
+        """
+        Close the circuit and clear its counters.
+        """
+        window_key = self._get_window_key()
+        cache.delete_many([
+            self._get_key(name)
+            for name in ('opened_at', 'probe', 'consecutive_failures', 'opened', 'rejected')
+        ] + [window_key.format('requests'), window_key.format('failures')])
+        self._emit_state(CLOSED)
+
+    def get_stats(self):
+        """
+        Return the state of the circuit and its counters.
+        """
+        window_key = self._get_window_key()
+
+        return {
+            'provider': self.provider,
+            'enabled': self.settings['enabled'],
+            'state': self.get_state(),
+            'open_action': self.settings['open_action'],
+            'retry_after': self.get_retry_after(),
+            'consecutive_failures': cache.get(self._get_key('consecutive_failures'), 0),
+            'window_requests': cache.get(window_key.format('requests'), 0),
+            'window_failures': cache.get(window_key.format('failures'), 0),
+            'opened': cache.get(self._get_key('opened'), 0),
+            'rejected': cache.get(self._get_key('rejected'), 0),
+        }
+
+    def _emit_state(self, state):
+        """
+        Count the change of the circuit to state and set its circuit_state gauge.
+        """
+        increment('circuit_state_changes', controller=self.provider, state=state)
+        gauge('circuit_state', STATE_GAUGE_VALUES[state], controller=self.provider)
+
+    def _count_request(self, failed):
+        """
+        Count the request in the current window and return the window requests and failures.
+        """
+        window_key = self._get_window_key()
+        timeout = self.settings['window'] * 2
+        window_requests = _increment(window_key.format('requests'), timeout)
+
+        if failed:
+            return window_requests, _increment(window_key.format('failures'), timeout)
+
+        return window_requests, cache.get(window_key.format('failures'), 0)
+
+    def _get_window_key(self):
+        """
+        Return the key template of the counters of the current window.
+        """
+        window = int(time.time() // self.settings['window'])
+
+        return self._get_key('window.{}.'.format(window)) + '{}'
+
+    def _get_key(self, name):
+        """
+        Return the cache key of a value of the circuit.
+        """
+        return CIRCUIT_CACHE_KEY.format(provider=self.provider, name=name)
+
+
+def get_circuit_breaker_settings(provider):
+    """
+    Return the circuit breaker settings of the provider merged over the default ones.
+    """
+    configured_settings = settings.OEE_CIRCUIT_BREAKER_SETTINGS
+    circuit_breaker_settings = dict(DEFAULT_CIRCUIT_BREAKER_SETTINGS)
+    circuit_breaker_settings.update(configured_settings.get('default', {}))
+    circuit_breaker_settings.update(configured_settings.get(provider, {}))
+
+    return circuit_breaker_settings
+
+
+def get_circuit_breakers_stats():
+    """
+    Return the stats of the known providers and of the ones with their own settings.
+    """
+    providers = list(KNOWN_PROVIDERS)
+    providers.extend(sorted(
+        provider
+        for provider in settings.OEE_CIRCUIT_BREAKER_SETTINGS
+        if provider != 'default' and provider not in providers
+    ))
+
+    return [CircuitBreaker(provider).get_stats() for provider in providers]
+
+
+def _increment(key, timeout=None):
+    """
+    Increment the counter stored in the key, creating it when it doesn't exist.
+    """
+    cache.add(key, 0, timeout)
+
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # The counter expired between the add and the incr.
+        cache.set(key, 1, timeout)
+        return 1
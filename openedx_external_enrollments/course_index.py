@@ -0,0 +1,162 @@
+"""
+Index of the courses with an external_platform_target.
+
+The index is persisted in the ExternalCourse model and updated when a course is published in
+Studio, so the signal receivers can skip the internal courses before any modulestore access.
+
+Every process keeps a local copy of the index tagged with its version stored in the Django
+cache, the shared version is read at most once every check_interval seconds per process. The
+local copy is also loaded again after reload_interval seconds, so a course indexed by a process
+that doesn't share the cache, e.g. a Studio with its own cache, isn't skipped for longer than that.
+While the index is not enabled in OEE_EXTERNAL_COURSE_INDEX_SETTINGS every course is considered
+external, the index must be built with the build_external_course_index command before enabling it.
+"""
+import time
+from collections import namedtuple
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from openedx_external_enrollments.models import ExternalCourse
+
+COURSE_INDEX_VERSION_CACHE_KEY = 'openedx_external_enrollments.course_index_version'
+
+DEFAULT_COURSE_INDEX_SETTINGS = {
+    'enabled': False,
+    'check_interval': 5,
+    'reload_interval': 300,
+}
+
+ExternalCourseEntry = namedtuple('ExternalCourseEntry', ['external_platform_target', 'external_course_run_id'])
+
+_LOCAL_INDEX = {}
+
+
+def is_external_course(course_key):
+    """
+    Return whether the enrollments of the course must be sent to an external platform.
+    """
+    if not get_course_index_settings()['enabled']:
+        return True
+
+    return str(course_key) in _get_courses()
+
+
+def get_external_course(course_key):
+    """
+    Return the ExternalCourseEntry of the course or None when the course is not external.
+    """
+    return _get_courses().get(str(course_key))
+
+
+def get_course_index_settings():
+    """
+    Return the external course index settings merged over the default ones.
+    """
+    course_index_settings = dict(DEFAULT_COURSE_INDEX_SETTINGS)
+    course_index_settings.update(settings.OEE_EXTERNAL_COURSE_INDEX_SETTINGS)
+
+    return course_index_settings
+
+
+def index_course(course_key, course_settings):
+    """
+    Add, update or remove the course from the index according to its other_course_settings.
+    """
+    _index_course(str(course_key), course_settings)
+    invalidate_index()
+
+
+def rebuild_index(courses):
+    """
+    Replace the index with the external courses found in courses.
+
+    Returns:
+        Number of indexed courses.
+    """
+    course_ids = set()
+
+    with transaction.atomic():
+        for course in courses:
+            course_id = str(course.id)
+
+            if _index_course(course_id, course.other_course_settings):
+                course_ids.add(course_id)
+
+        ExternalCourse.objects.exclude(course_id__in=course_ids).delete()  # pylint: disable=no-member
+
+    invalidate_index()
+
+    return len(course_ids)
+
+
+def invalidate_index():
+    """
+    Change the version of the index, so every process loads it again.
+    """
+    cache.set(COURSE_INDEX_VERSION_CACHE_KEY, uuid4().hex, None)
+    _LOCAL_INDEX.clear()
+
+
+def _index_course(course_id, course_settings):
+    """
+    Persist the index entry of the course, return whether the course is external.
+    """
+    course_settings = course_settings or {}
+    target = course_settings.get('external_platform_target')
+
+    if not target:
+        ExternalCourse.objects.filter(course_id=course_id).delete()  # pylint: disable=no-member
+        return False
+
+    ExternalCourse.objects.update_or_create(  # pylint: disable=no-member
+        course_id=course_id,
+        defaults={
+            'external_platform_target': target,
+            'external_course_run_id': course_settings.get('external_course_run_id') or '',
+        },
+    )
+
+    return True
+
+
+def _get_courses():
+    """
+    Return the local copy of the index, a dict of ExternalCourseEntry by course id.
+    """
+    now = time.time()
+
+    if _LOCAL_INDEX and now < _LOCAL_INDEX['checked_until']:
+        return _LOCAL_INDEX['courses']
+
+    version = cache.get(COURSE_INDEX_VERSION_CACHE_KEY)
+
+    if version is None:
+        version = uuid4().hex
+
+        if not cache.add(COURSE_INDEX_VERSION_CACHE_KEY, version, None):
+            version = cache.get(COURSE_INDEX_VERSION_CACHE_KEY, version)
+
+    course_index_settings = get_course_index_settings()
+
+    if _LOCAL_INDEX.get('version') == version and now < _LOCAL_INDEX['loaded_until']:
+        courses = _LOCAL_INDEX['courses']
+    else:
+        courses = {
+            external_course.course_id: ExternalCourseEntry(
+                external_course.external_platform_target,
+                external_course.external_course_run_id,
+            )
+            for external_course in ExternalCourse.objects.all()  # pylint: disable=no-member
+        }
+        _LOCAL_INDEX['loaded_until'] = now + course_index_settings['reload_interval']
+
+    _LOCAL_INDEX.update(
+        version=version,
+        courses=courses,
+        checked_until=now + course_index_settings['check_interval'],
+    )
+
+    return courses
@@ -0,0 +1,75 @@
+"""
+Registry of the resolved edxapp backend functions.
+
+Every backend function is imported and bound once per process, the registry is
+cleared when one of the backend settings changes, e.g. with override_settings.
+"""
+from importlib import import_module
+
+from django.conf import settings
+from django.core.signals import setting_changed
+
+BACKEND_FUNCTIONS = (
+    ('OEE_COURSE_HOME_MODULE', 'calculate_course_home'),
+    ('OEE_COURSEWARE_BACKEND', 'get_course_by_id_backend'),
+    ('OEE_COURSEWARE_BACKEND', 'get_courses_backend'),
+    ('OEE_COURSEWARE_BACKEND', 'get_course_published_signal_backend'),
+    ('OEE_EDX_REST_FRAMEWORK_EXTENSIONS', 'JwtAuthentication'),
+    ('OEE_OPENEDX_PERMISSIONS', 'IsStaffOrOwner'),
+    ('OEE_OPENEDX_PERMISSIONS', 'ApiKeyHeaderPermissionIsAuthenticated'),
+    ('OEE_SITE_CONFIGURATION_BACKEND', 'get_configuration_helpers'),
+    ('OEE_SITE_CONFIGURATION_BACKEND', 'get_site_configuration_model'),
+    ('OEE_STUDENT_BACKEND', 'get_user_backend'),
+    ('OEE_STUDENT_BACKEND', 'get_users_by_email_backend'),
+    ('OEE_STUDENT_BACKEND', 'get_course_enrollment_backend'),
+)
+BACKEND_SETTINGS = frozenset(setting_name for setting_name, _ in BACKEND_FUNCTIONS)
+
+_RESOLVED_BACKENDS = {}
+
+
+def get_backend_function(setting_name, function_name):
+    """
+    Return the function_name attribute of the backend module configured in setting_name.
+    """
+    try:
+        return _RESOLVED_BACKENDS[(setting_name, function_name)]
+    except KeyError:
+        backend = import_module(getattr(settings, setting_name))
+        backend_function = _RESOLVED_BACKENDS[(setting_name, function_name)] = getattr(backend, function_name)
+
+        return backend_function
+
+
+def warm_up_backends():
+    """
+    Resolve every known backend function, backends that can't be imported are skipped.
+
+    Returns:
+        Number of resolved functions.
+    """
+    resolved = 0
+
+    for setting_name, function_name in BACKEND_FUNCTIONS:
+        if not getattr(settings, setting_name, None):
+            continue
+
+        try:
+            get_backend_function(setting_name, function_name)
+        except (ImportError, AttributeError):
+            continue
+
+        resolved += 1
+
+    return resolved
+
+
+def reset_backends(setting=None, **kwargs):  # pylint: disable=unused-argument
+    """
+    Clear the registry when a backend setting changes.
+    """
+    if setting is None or setting in BACKEND_SETTINGS:
+        _RESOLVED_BACKENDS.clear()
+
+
+setting_changed.connect(reset_backends, dispatch_uid='oee_reset_backends')
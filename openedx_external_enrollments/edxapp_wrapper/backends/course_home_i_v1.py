@@ -33,18 +33,21 @@ def calculate_course_home(course_id, user):
     if custom_entry_point:
         return custom_entry_point
 
-    if is_external_course(course_id):
+    if is_external_course(course_id, course=course):
         return custom_course_settings.get("external_course_target")
 
     return None
 
 
-def is_external_course(course_id):
+def is_external_course(course_id, course=None):
     """
     Decide if the course was confiured as external or not.
+    The course is only loaded when the caller doesn't provide it.
     """
-    course_key = CourseKey.from_string(course_id)
-    course = get_course_by_id(course_key)
+    if course is None:
+        course_key = CourseKey.from_string(course_id)
+        course = get_course_by_id(course_key)
+
     custom_course_settings = course.other_course_settings
 
     return (
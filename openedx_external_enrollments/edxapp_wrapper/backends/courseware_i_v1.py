@@ -1,8 +1,19 @@
 """Backend for courseware module."""
 
 from courseware.courses import get_course_by_id  # pylint: disable=import-error
+from xmodule.modulestore.django import SignalHandler, modulestore  # pylint: disable=import-error
 
 
 def get_course_by_id_backend(*args, **kwargs):
     """Return the method get_course_by_id from courseware.courses."""
     return get_course_by_id(*args, **kwargs)
+
+
+def get_courses_backend():
+    """Return every course of the modulestore."""
+    return modulestore().get_courses()
+
+
+def get_course_published_signal_backend():
+    """Return the course_published signal from xmodule.modulestore.django."""
+    return SignalHandler.course_published
@@ -1,7 +1,13 @@
 """Site Configuration backend file."""
 from openedx.core.djangoapps.site_configuration import helpers  # pylint: disable=import-error
+from openedx.core.djangoapps.site_configuration.models import SiteConfiguration  # pylint: disable=import-error
 
 
 def get_configuration_helpers():
     """Backend function."""
     return helpers
+
+
+def get_site_configuration_model():
+    """Return the model SiteConfiguration from the module site_configuration.models."""
+    return SiteConfiguration
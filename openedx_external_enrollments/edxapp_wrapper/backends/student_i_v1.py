@@ -1,4 +1,5 @@
 """Student backend file."""
+from django.contrib.auth.models import User
 
 from student.models import CourseEnrollment, get_user  # pylint: disable=import-error
 
@@ -11,3 +12,8 @@ def get_user_backend(*args, **kwargs):
 def get_course_enrollment_backend():
     """Return the model CourseEnrollment from the module student.models."""
     return CourseEnrollment
+
+
+def get_users_by_email_backend(emails):
+    """Return the users with the given emails, their profiles are fetched in the same query."""
+    return User.objects.filter(email__in=emails).select_related('profile')
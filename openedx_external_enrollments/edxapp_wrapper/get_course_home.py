@@ -1,12 +1,7 @@
 """ Course home backend abstraction """
-from importlib import import_module
-
-from django.conf import settings
+from openedx_external_enrollments.edxapp_wrapper.backend_registry import get_backend_function
 
 
 def calculate_course_home(*args, **kwargs):
     """ Backend function to calculate course home """
-    backend_module = settings.OEE_COURSE_HOME_MODULE
-    backend = import_module(backend_module)
-
-    return backend.calculate_course_home(*args, **kwargs)
+    return get_backend_function('OEE_COURSE_HOME_MODULE', 'calculate_course_home')(*args, **kwargs)
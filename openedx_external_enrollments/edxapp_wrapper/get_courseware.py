@@ -1,13 +1,78 @@
 """Courseware definitions."""
 
-from importlib import import_module
-
 from django.conf import settings
+from django.core.cache import cache
+
+from openedx_external_enrollments.edxapp_wrapper.backend_registry import get_backend_function
+from openedx_external_enrollments.metrics import timed
+from openedx_external_enrollments.query_profiling import record_edxapp_call
+from openedx_external_enrollments.request_cache import get_request_cache
+from openedx_external_enrollments.tracing import start_span
+
+COURSE_SETTINGS_CACHE_KEY = 'openedx_external_enrollments.other_course_settings.{}'
 
 
 def get_course_by_id(*args, **kwargs):
-    """ Return get_course_by_id method."""
-    backend_function = settings.OEE_COURSEWARE_BACKEND
-    backend = import_module(backend_function)
+    """
+    Return get_course_by_id method.
+
+    Descriptors are memoized for the current request or task, so every course is read
+    from the modulestore once per unit of work.
+    """
+    descriptors = get_request_cache('course_descriptors')
+
+    if descriptors is None:
+        return _get_course_by_id(*args, **kwargs)
+
+    key = (args, tuple(sorted(kwargs.items())))
+
+    if key not in descriptors:
+        descriptors[key] = _get_course_by_id(*args, **kwargs)
+
+    return descriptors[key]
+
+
+def get_other_course_settings(course_key):
+    """
+    Return the other_course_settings dict of the course.
+
+    When OEE_COURSE_SETTINGS_CACHE_TIMEOUT is set the dict is also cached across requests,
+    the cached value is removed when the course is published in Studio.
+    """
+    timeout = settings.OEE_COURSE_SETTINGS_CACHE_TIMEOUT
+
+    if not timeout:
+        return get_course_by_id(course_key).other_course_settings
+
+    cache_key = COURSE_SETTINGS_CACHE_KEY.format(course_key)
+    course_settings = cache.get(cache_key)
+
+    if course_settings is None:
+        course_settings = dict(get_course_by_id(course_key).other_course_settings)
+        cache.set(cache_key, course_settings, timeout)
+
+    return course_settings
+
+
+def invalidate_other_course_settings(course_key):
+    """ Remove the cached other_course_settings of the course."""
+    cache.delete(COURSE_SETTINGS_CACHE_KEY.format(course_key))
+
+
+def get_courses():
+    """ Return every course of the modulestore."""
+    record_edxapp_call('get_courses')
+    return get_backend_function('OEE_COURSEWARE_BACKEND', 'get_courses_backend')()
+
+
+def get_course_published_signal():
+    """ Return the signal sent when a course is published."""
+    return get_backend_function('OEE_COURSEWARE_BACKEND', 'get_course_published_signal_backend')()
+
+
+def _get_course_by_id(*args, **kwargs):
+    """ Call the backend get_course_by_id method."""
+    record_edxapp_call('get_course_by_id')
 
-    return backend.get_course_by_id_backend(*args, **kwargs)
+    with start_span('load_course'), timed('course_load_time'):
+        return get_backend_function('OEE_COURSEWARE_BACKEND', 'get_course_by_id_backend')(*args, **kwargs)
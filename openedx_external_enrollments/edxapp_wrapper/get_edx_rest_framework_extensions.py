@@ -1,13 +1,8 @@
 """ Backend abstraction """
-from importlib import import_module
-
-from django.conf import settings
+from openedx_external_enrollments.edxapp_wrapper.backend_registry import get_backend_function
 
 
 def get_jwt_authentication(*args, **kwargs):  # pylint: disable=unused-argument
     """ Get JwtAuthentication Class """
 
-    backend_function = settings.OEE_EDX_REST_FRAMEWORK_EXTENSIONS
-    backend = import_module(backend_function)
-
-    return backend.JwtAuthentication
+    return get_backend_function('OEE_EDX_REST_FRAMEWORK_EXTENSIONS', 'JwtAuthentication')
@@ -1,14 +1,15 @@
 """Site Configurations definitions."""
-from importlib import import_module
-
-from django.conf import settings
+from openedx_external_enrollments.edxapp_wrapper.backend_registry import get_backend_function
 
 
 def get_configuration_helpers(*args, **kwargs):
     """ Get configuration_helpers function."""
-    backend_function = settings.OEE_SITE_CONFIGURATION_BACKEND
-    backend = import_module(backend_function)
-    return backend.get_configuration_helpers(*args, **kwargs)
+    return get_backend_function('OEE_SITE_CONFIGURATION_BACKEND', 'get_configuration_helpers')(*args, **kwargs)
+
+
+def get_site_configuration_model():
+    """ Return SiteConfiguration model."""
+    return get_backend_function('OEE_SITE_CONFIGURATION_BACKEND', 'get_site_configuration_model')()
 
 
 configuration_helpers = get_configuration_helpers()
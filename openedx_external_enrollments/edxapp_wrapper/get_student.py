@@ -1,24 +1,26 @@
 """Student definitions."""
 
-from importlib import import_module
-
-from django.conf import settings
+from openedx_external_enrollments.edxapp_wrapper.backend_registry import get_backend_function
+from openedx_external_enrollments.query_profiling import record_edxapp_call
 
 
 def get_user(*args, **kwargs):
     """ Return get_user result method."""
-    backend_function = settings.OEE_STUDENT_BACKEND
-    backend = import_module(backend_function)
+    record_edxapp_call('get_user')
+    return get_backend_function('OEE_STUDENT_BACKEND', 'get_user_backend')(*args, **kwargs)
+
 
-    return backend.get_user_backend(*args, **kwargs)
+def get_users_by_email(emails):
+    """ Return a dict with the (user, profile) tuple of every given email, fetched in one query."""
+    record_edxapp_call('get_users_by_email')
+    users = get_backend_function('OEE_STUDENT_BACKEND', 'get_users_by_email_backend')(emails)
+
+    return {user.email: (user, user.profile) for user in users}
 
 
 def get_course_enrollment():
     """ Return CourseEnrollment model."""
-    backend_function = settings.OEE_STUDENT_BACKEND
-    backend = import_module(backend_function)
-
-    return backend.get_course_enrollment_backend()
+    return get_backend_function('OEE_STUDENT_BACKEND', 'get_course_enrollment_backend')()
 
 
 CourseEnrollment = get_course_enrollment()
@@ -0,0 +1,95 @@
+"""
+Detection and debouncing of the CourseEnrollment changes sent to the external platforms.
+
+The is_active and mode values of every CourseEnrollment are remembered when it's loaded and
+saved, so saves that don't change them are not dispatched. In the async dispatch mode the
+changes of the same user and course within OEE_ENROLLMENT_DEBOUNCE_WINDOW seconds are collapsed
+into their final state, which is dropped when it's the state the burst started from.
+"""
+import hashlib
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+
+ENROLLMENT_STATE_ATTRIBUTE = '_oee_enrollment_state'
+DEBOUNCE_CACHE_KEY = 'openedx_external_enrollments.debounce.{}'
+
+
+def get_enrollment_state(instance):
+    """
+    Return the (is_active, mode) values of the CourseEnrollment, without loading deferred fields.
+    """
+    return instance.__dict__.get('is_active'), instance.__dict__.get('mode')
+
+
+def remember_enrollment_state(instance):
+    """
+    Store the current (is_active, mode) values in the CourseEnrollment instance.
+    """
+    setattr(instance, ENROLLMENT_STATE_ATTRIBUTE, get_enrollment_state(instance))
+
+
+def get_remembered_enrollment_state(instance):
+    """
+    Return the (is_active, mode) values of the CourseEnrollment when it was loaded or last saved.
+    """
+    return getattr(instance, ENROLLMENT_STATE_ATTRIBUTE, None)
+
+
+def debounce_enrollment_change(data, course_id, previous_state=None):
+    """
+    Record the change as the latest one of its user and course.
+
+    Args:
+        data: dict with the user_email, course_mode and is_active values.
+        course_id: string representation of the course key.
+        previous_state: (is_active, mode) values before the change, kept for the first change of a burst.
+    Returns:
+        Token identifying the change, None when debouncing is disabled.
+    """
+    window = settings.OEE_ENROLLMENT_DEBOUNCE_WINDOW
+
+    if not window:
+        return None
+
+    key = _get_debounce_key(data['user_email'], course_id)
+    pending_change = cache.get(key)
+    token = uuid4().hex
+    cache.set(key, {
+        'token': token,
+        'initial_state': pending_change['initial_state'] if pending_change else previous_state,
+    }, window * 2)
+
+    return token
+
+
+def is_latest_enrollment_change(data, course_id, token):
+    """
+    Return whether the change identified by token must be dispatched.
+
+    Only the latest change of a burst is dispatched, unless it returns the enrollment
+    to the state the burst started from.
+    """
+    key = _get_debounce_key(data['user_email'], course_id)
+    pending_change = cache.get(key)
+
+    if pending_change is None:
+        return True
+
+    if pending_change['token'] != token:
+        return False
+
+    cache.delete(key)
+    initial_state = pending_change['initial_state']
+
+    return initial_state is None or tuple(initial_state) != (data['is_active'], data['course_mode'])
+
+
+def _get_debounce_key(user_email, course_id):
+    """
+    Return the cache key of the pending change of the user and course.
+    """
+    pair = u'{}|{}'.format(user_email, course_id).encode('utf-8')
+
+    return DEBOUNCE_CACHE_KEY.format(hashlib.sha256(pair).hexdigest())
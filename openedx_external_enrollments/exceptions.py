@@ -0,0 +1,33 @@
+"""Openedx external enrollments exceptions file."""
+
+
+class RetryableEnrollmentError(Exception):
+    """
+    The provider couldn't process the enrollment for a transient reason, e.g. a connection error,
+    a 5xx response or a 429 response. The enrollment can be sent again later.
+    """
+
+    def __init__(self, message, status_code=None, retry_after=None):
+        super(RetryableEnrollmentError, self).__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(RetryableEnrollmentError):
+    """
+    The circuit breaker of the provider is open, the enrollment wasn't sent. It can be sent again
+    once the circuit is half-open, retry_after seconds later.
+    """
+
+
+class ThrottledEnrollmentError(RetryableEnrollmentError):
+    """
+    The rate limits of the provider were reached, the enrollment wasn't sent. It can be sent again
+    retry_after seconds later.
+    """
+
+
+class UnknownExternalTargetError(ValueError):
+    """
+    There's no enrollment controller registered for the external platform target.
+    """
@@ -1,38 +1,100 @@
 """External enrollments method file."""
 import logging
 
-from openedx_external_enrollments.edxapp_wrapper.get_site_configuration import configuration_helpers
+from celery import current_app
+
+from openedx_external_enrollments.circuit_breakers import OPEN, QUEUE, CircuitBreaker
+from openedx_external_enrollments.exceptions import (
+    CircuitOpenError,
+    RetryableEnrollmentError,
+    ThrottledEnrollmentError,
+    UnknownExternalTargetError,
+)
 from openedx_external_enrollments.factory import ExternalEnrollmentFactory
+from openedx_external_enrollments.site_cache import get_site_settings
+from openedx_external_enrollments.tracing import traced
 
 LOG = logging.getLogger(__name__)
 
+EXTERNAL_ENROLLMENT_TASK = 'openedx_external_enrollments.tasks.process_external_enrollment'
+# Seconds to wait for the probe of a half-open circuit before sending a rejected enrollment again.
+HALF_OPEN_RETRY_DELAY = 5
+
 
+@traced('execute_external_enrollment')
 def execute_external_enrollment(data, course):
     """
     Execute an enrollment for the given data and course.
 
+    When the circuit breaker of the controller rejects the enrollment and its open_action is queue,
+    the enrollment is enqueued to be executed once the circuit is half-open, or once the probe of
+    the half-open circuit finishes. Enrollments throttled by the rate limits of the controller are
+    enqueued as well, to be executed once there's capacity.
+
     Args:
         data: dict with the enrollment data.
         course: instance of CourseDescriptor.
     """
+    enrollment_controller = get_enrollment_controller(course)
+
+    if enrollment_controller is None:
+        return
+
+    controller = course.other_course_settings.get('external_platform_target', '')
+    circuit_breaker = CircuitBreaker(str(enrollment_controller))
+
+    if circuit_breaker.settings['open_action'] == QUEUE and circuit_breaker.get_state() == OPEN:
+        retry_after = circuit_breaker.get_retry_after()
+        LOG.info('Circuit of %s is open, enqueuing the enrollment for %s seconds.', controller, retry_after)
+        current_app.send_task(EXTERNAL_ENROLLMENT_TASK, args=(str(course.id), data), countdown=retry_after)
+        return
+
+    try:
+        enrollment_controller._post_enrollment(  # pylint: disable=protected-access
+            data,
+            course.other_course_settings,
+            raise_on_retryable=True,
+        )
+    except ThrottledEnrollmentError as error:
+        LOG.info('Enrollment for %s throttled, enqueuing it for %s seconds.', controller, error.retry_after)
+        current_app.send_task(EXTERNAL_ENROLLMENT_TASK, args=(str(course.id), data), countdown=error.retry_after)
+    except CircuitOpenError as error:
+        if circuit_breaker.settings['open_action'] == QUEUE:
+            retry_after = error.retry_after or HALF_OPEN_RETRY_DELAY
+            LOG.info('Circuit of %s rejected the enrollment, enqueuing it for %s seconds.', controller, retry_after)
+            current_app.send_task(EXTERNAL_ENROLLMENT_TASK, args=(str(course.id), data), countdown=retry_after)
+    except RetryableEnrollmentError:
+        # The failure has already been logged by the controller.
+        pass
+
+
+def get_enrollment_controller(course):
+    """
+    Return the enrollment controller of the external_platform_target of the course.
+
+    Returns:
+        The controller or None when the course can't be enrolled in a valid external target.
+    """
     try:
         controller = course.other_course_settings.get('external_platform_target', '')
     except AttributeError:
         LOG.error('Course [%s] not configured as external.', str(course.id))
-        return
+        return None
 
-    valid_external_targets = configuration_helpers.get_value('VALID_EXTERNAL_TARGETS', [])
+    valid_external_targets = get_site_settings().valid_targets
 
     if controller.lower() not in valid_external_targets:
         LOG.warning(
             'The controller %s is not present in the valid external targets list %s.',
             controller,
-            valid_external_targets,
+            sorted(valid_external_targets),
         )
-        return
-
-    enrollment_controller = ExternalEnrollmentFactory.get_enrollment_controller(
-        controller=controller,
-    )
+        return None
 
-    enrollment_controller._post_enrollment(data, course.other_course_settings)  # pylint: disable=protected-access
+    try:
+        return ExternalEnrollmentFactory.get_enrollment_controller(
+            controller=controller,
+        )
+    except UnknownExternalTargetError as error:
+        LOG.error('Course [%s] can not be enrolled. Reason: %s', str(course.id), str(error))
+        return None
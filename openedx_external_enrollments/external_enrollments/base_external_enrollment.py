@@ -1,13 +1,24 @@
 """BaseExternalEnrollment class file."""
 import logging
+import time
 
 import requests
 from rest_framework import status
 
-from openedx_external_enrollments.models import EnrollmentRequestLog
+from openedx_external_enrollments.circuit_breakers import CircuitBreaker
+from openedx_external_enrollments.exceptions import CircuitOpenError, RetryableEnrollmentError, ThrottledEnrollmentError
+from openedx_external_enrollments.http_sessions import get_session, get_timeout
+from openedx_external_enrollments.metrics import collect_timings, get_collected_timings, increment, timed
+from openedx_external_enrollments.rate_limits import RateLimiter
+from openedx_external_enrollments.request_logs import log_enrollment_request
+from openedx_external_enrollments.responses import SUCCESS, decode_response
+from openedx_external_enrollments.retries import is_retryable_status, parse_retry_after
+from openedx_external_enrollments.tracing import inject_trace_headers, start_span
 
 LOG = logging.getLogger(__name__)
 
+IDEMPOTENCY_KEY_HEADER = 'Idempotency-Key'
+
 
 class BaseExternalEnrollment(object):
     """
@@ -16,53 +27,253 @@ class BaseExternalEnrollment(object):
 
     def _execute_post(self, url, data=None, headers=None, json_data=None):
         """
-        Execute post request.
+        Execute post request using the pooled session of the controller.
+
+        The body is streamed, so it's only read up to the size the caller needs.
         """
-        response = requests.post(
+        response = get_session(str(self)).post(
             url=url,
             data=data,
             headers=headers,
             json=json_data,
+            timeout=get_timeout(str(self)),
+            stream=True,
         )
         return response
 
-    def _post_enrollment(self, data, course_settings=None):
+    def _post_enrollment(self, data, course_settings=None, raise_on_retryable=False):
         """
         Get request data and execute the post request.
+
+        With raise_on_retryable, transient failures raise RetryableEnrollmentError instead of
+        returning an error response, so the caller can retry the enrollment.
+        The idempotency_key of the data, if any, is sent so the provider can discard redelivered enrollments.
+        The timings of every step are emitted as metrics and stored in the request log.
+        """
+        with collect_timings():
+            with start_span('build_payload', controller=str(self)), timed('payload_build_time', controller=str(self)):
+                url = self._get_enrollment_url(course_settings)
+                json_data = self._get_enrollment_data(data, course_settings)
+
+            LOG.info('calling enrollment for [%s] with data: %s', self.__str__(), json_data)
+            LOG.info('calling enrollment for [%s] with url: %s', self.__str__(), url)
+            LOG.info('calling enrollment for [%s] with course settings: %s', self.__str__(), course_settings)
+
+            return self._send_enrollment_request(
+                url,
+                json_data,
+                course_settings,
+                raise_on_retryable,
+                log_fields=self._get_log_fields(data),
+                idempotency_key=data.get('idempotency_key'),
+            )
+
+    def _post_bulk_enrollment(self, enrollments):
+        """
+        Execute the enrollment of several learners.
+
+        Args:
+            enrollments: list of (data, course_settings) tuples.
+        Returns:
+            List with the (response, status) result of every enrollment, in the same order.
+        """
+        return [self._post_enrollment(data, course_settings) for data, course_settings in enrollments]
+
+    def _send_enrollment_request(self, url, json_data, course_settings=None, raise_on_retryable=False,
+                                 log_fields=None, idempotency_key=None):
+        """
+        Execute the post request with the given payload and log its result.
+
+        The request isn't sent while the controller is throttled by its rate limits or its circuit
+        breaker is open, connection errors and retryable responses count as failures of the provider.
+
+        Args:
+            log_fields: dict with the user_email and course_id columns of the request log.
+            idempotency_key: key sent in the Idempotency-Key header.
         """
-        url = self._get_enrollment_url(course_settings)
-        json_data = self._get_enrollment_data(data, course_settings)
-        LOG.info('calling enrollment for [%s] with data: %s', self.__str__(), json_data)
-        LOG.info('calling enrollment for [%s] with url: %s', self.__str__(), url)
-        LOG.info('calling enrollment for [%s] with course settings: %s', self.__str__(), course_settings)
         log_details = {
             "request_payload": json_data,
             "url": url,
             "course_advanced_settings": course_settings,
         }
+        log_fields = dict(log_fields or {})
+        rate_limiter = RateLimiter(str(self))
+        wait = rate_limiter.acquire()
+
+        if wait:
+            increment('enrollment_requests', controller=str(self), outcome='throttled')
+            return self._throttle_enrollment_request(wait, raise_on_retryable)
 
         try:
-            response = self._execute_post(
-                url=url,
-                headers=self._get_enrollment_headers(),
-                json_data=json_data,
+            circuit_breaker = CircuitBreaker(str(self))
+
+            if not circuit_breaker.allow_request():
+                increment('enrollment_requests', controller=str(self), outcome='circuit_open')
+                return self._reject_enrollment_request(circuit_breaker, log_details, log_fields, raise_on_retryable)
+
+            return self._execute_enrollment_request(
+                url,
+                json_data,
+                log_details,
+                log_fields,
+                circuit_breaker,
+                raise_on_retryable,
+                idempotency_key,
             )
+        finally:
+            rate_limiter.release()
+
+    def _execute_enrollment_request(self, url, json_data, log_details, log_fields, circuit_breaker,
+                                    raise_on_retryable=False, idempotency_key=None):
+        """
+        Execute the post request, log its result and count it in the circuit breaker.
+        """
+        start_time = time.time()
+
+        try:
+            response = self._post_enrollment_request(url, json_data, idempotency_key)
+
+            if response.status_code == status.HTTP_401_UNAUTHORIZED and self._invalidate_auth_token():
+                LOG.info('Enrollment token rejected by [%s], retrying with a new token.', self.__str__())
+                response.close()
+                response = self._post_enrollment_request(url, json_data, idempotency_key)
         except Exception as error:  # pylint: disable=broad-except
+            if isinstance(error, requests.RequestException):
+                circuit_breaker.record_failure()
+
             LOG.error("Failed to complete enrollment. Reason: %s", str(error))
+            increment('enrollment_requests', controller=str(self), outcome='error')
             log_details["response"] = {"error": "Failed to complete enrollment. Reason: " + str(error)}
-            EnrollmentRequestLog.objects.create(  # pylint: disable=no-member
-                request_type=str(self),
-                details=log_details,
+            self._log_enrollment_request(
+                log_details,
+                success=False,
+                duration=(time.time() - start_time) * 1000,
+                **log_fields
             )
+
+            if raise_on_retryable and isinstance(error, (requests.ConnectionError, requests.Timeout)):
+                raise RetryableEnrollmentError(str(error))
+
             return str(error), status.HTTP_400_BAD_REQUEST
         else:
-            LOG.info('External enrollment response for [%s] -- %s', self.__str__(), response.json())
-            log_details["response"] = response.json()
-            EnrollmentRequestLog.objects.create(  # pylint: disable=no-member
-                request_type=str(self),
-                details=log_details,
+            decoded_response = decode_response(response)
+            log_details["response"] = decoded_response.body
+            log_fields.update(
+                http_status=decoded_response.status_code,
+                success=decoded_response.classification == SUCCESS,
+                duration=(time.time() - start_time) * 1000,
             )
-            return response.json(), status.HTTP_200_OK
+
+            if decoded_response.truncated:
+                log_details["response_truncated"] = True
+
+            increment('enrollment_requests', controller=str(self), outcome=decoded_response.classification)
+
+            if decoded_response.classification == SUCCESS:
+                LOG.info('External enrollment response for [%s] -- %s', self.__str__(), decoded_response.body)
+            else:
+                LOG.error(
+                    'External enrollment for [%s] failed with a %s response (%s) -- %s',
+                    self.__str__(),
+                    decoded_response.classification,
+                    decoded_response.status_code,
+                    decoded_response.body,
+                )
+
+            self._log_enrollment_request(log_details, **log_fields)
+
+            if is_retryable_status(decoded_response.status_code):
+                circuit_breaker.record_failure()
+            else:
+                circuit_breaker.record_success()
+
+            if raise_on_retryable and is_retryable_status(decoded_response.status_code):
+                raise RetryableEnrollmentError(
+                    str(decoded_response.body),
+                    status_code=decoded_response.status_code,
+                    retry_after=parse_retry_after(response.headers.get('Retry-After')),
+                )
+
+            return decoded_response.body, decoded_response.status_code
+
+    def _post_enrollment_request(self, url, json_data, idempotency_key=None):
+        """
+        Build the headers, which may fetch an auth token, and execute the post request, timing both.
+
+        The trace context of the enrollment and its idempotency key are propagated in the request headers.
+        """
+        with start_span('auth', controller=str(self)), timed('auth_time', controller=str(self)):
+            headers = self._get_enrollment_headers()
+
+        if idempotency_key:
+            headers = dict(headers or {})
+            headers[IDEMPOTENCY_KEY_HEADER] = idempotency_key
+
+        with start_span('http_post', controller=str(self), url=url) as span, timed('http_time', controller=str(self)):
+            response = self._execute_post(
+                url=url,
+                headers=inject_trace_headers(headers),
+                json_data=json_data,
+            )
+
+            if span is not None:
+                span.set_attribute('http.status_code', response.status_code)
+
+            return response
+
+    def _log_enrollment_request(self, log_details, **log_fields):
+        """
+        Persist the request log of the controller with the timings collected for the enrollment.
+        """
+        with timed('log_write_time', controller=str(self)):
+            log_enrollment_request(str(self), log_details, timings=get_collected_timings(), **log_fields)
+
+    def _throttle_enrollment_request(self, wait, raise_on_retryable=False):
+        """
+        Return a 429 response for the enrollment throttled by the rate limits of the controller.
+
+        With raise_on_retryable, ThrottledEnrollmentError is raised so the caller defers it wait seconds.
+        """
+        message = 'Enrollment requests to {} are throttled, enrollment not sent.'.format(self.__str__())
+        LOG.info('%s Retry after %s seconds.', message, wait)
+
+        if raise_on_retryable:
+            raise ThrottledEnrollmentError(message, status_code=status.HTTP_429_TOO_MANY_REQUESTS, retry_after=wait)
+
+        return {"error": message}, status.HTTP_429_TOO_MANY_REQUESTS
+
+    def _reject_enrollment_request(self, circuit_breaker, log_details, log_fields, raise_on_retryable=False):
+        """
+        Log the enrollment rejected by the open circuit breaker and return a 503 response.
+
+        With raise_on_retryable, CircuitOpenError is raised so the caller retries it once the circuit is half-open.
+        """
+        retry_after = circuit_breaker.get_retry_after()
+        message = 'Circuit of {} is open, enrollment not sent.'.format(self.__str__())
+        LOG.warning('%s Retry after %s seconds.', message, retry_after)
+        log_details["response"] = {"error": message}
+        self._log_enrollment_request(log_details, success=False, **log_fields)
+
+        if raise_on_retryable:
+            raise CircuitOpenError(message, retry_after=retry_after)
+
+        return {"error": message}, status.HTTP_503_SERVICE_UNAVAILABLE
+
+    @staticmethod
+    def _get_log_fields(data):
+        """
+        Return the learner email and the course id stored in the indexed columns of the request log.
+        """
+        return {
+            'user_email': data.get('user_email'),
+            'course_id': data.get('course_id'),
+        }
+
+    def _invalidate_auth_token(self):
+        """
+        Drop the cached auth token of the controller. Returns True when there was a token to renew.
+        """
+        return False
 
     def _get_enrollment_data(self, data, course_settings):
         """Unimplemented method necessary to execute _post_enrollment."""
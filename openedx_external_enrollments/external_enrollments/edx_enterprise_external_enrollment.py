@@ -3,10 +3,14 @@ import logging
 from collections import OrderedDict
 
 from django.conf import settings
+from rest_framework import status
 
 from openedx_external_enrollments.external_enrollments.base_external_enrollment import BaseExternalEnrollment
+from openedx_external_enrollments.metrics import collect_timings, timed
+from openedx_external_enrollments.token_cache import get_token, invalidate_token
 
 LOG = logging.getLogger(__name__)
+REJECTED_CHUNK_STATUS_CODES = (status.HTTP_400_BAD_REQUEST, status.HTTP_422_UNPROCESSABLE_ENTITY)
 
 
 class EdxEnterpriseExternalEnrollment(BaseExternalEnrollment):
@@ -19,6 +23,25 @@ class EdxEnterpriseExternalEnrollment(BaseExternalEnrollment):
 
     def _get_enrollment_headers(self):
         """
+        Return the enrollment headers using the cached client-credentials token.
+        """
+        token = get_token(str(self), self._get_token_credentials(), self._get_auth_token)
+
+        if token:
+            return {
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+                "Authorization": "{} {}".format(
+                    token["token_type"],
+                    token["access_token"]
+                )
+            }
+
+        return None
+
+    def _get_auth_token(self):
+        """
+        Fetch a new client-credentials JWT from the edX API.
         """
         try:
             data = OrderedDict(
@@ -35,18 +58,28 @@ class EdxEnterpriseExternalEnrollment(BaseExternalEnrollment):
             LOG.error("Failed to get token: %s", str(error))
         else:
             if response.ok:
-                headers = {
-                    "Accept": "application/json",
-                    "Content-Type": "application/json",
-                    "Authorization": "{} {}".format(
-                        response.json()["token_type"],
-                        response.json()["access_token"]
-                    )
-                }
-                return headers
+                return response.json()
 
         return None
 
+    def _invalidate_auth_token(self):
+        """
+        Remove the cached token so the next request fetches a new one.
+        """
+        invalidate_token(str(self), self._get_token_credentials())
+        return True
+
+    @staticmethod
+    def _get_token_credentials():
+        """
+        Return the values identifying the cached token.
+        """
+        return (
+            settings.EDX_ENTERPRISE_API_TOKEN_URL,
+            settings.EDX_ENTERPRISE_API_CLIENT_ID,
+            settings.EDX_ENTERPRISE_API_CLIENT_SECRET,
+        )
+
     def _get_enrollment_data(self, data, course_settings):
 
         return [{
@@ -61,6 +94,70 @@ class EdxEnterpriseExternalEnrollment(BaseExternalEnrollment):
             "is_active": data.get("is_active", True),
         }]
 
+    def _post_bulk_enrollment(self, enrollments):
+        """
+        Execute the enrollments in chunks, the course-enrollments endpoint accepts many enrollments per request.
+
+        The endpoint answers a list with an item per enrollment, which is the result of every row.
+        A chunk rejected with a client error is sent again row by row, so a bad row only fails itself.
+
+        Args:
+            enrollments: list of (data, course_settings) tuples.
+        Returns:
+            List with the (response, status) result of every enrollment, in the same order.
+        """
+        results = []
+        chunk_size = settings.EDX_ENTERPRISE_API_BULK_CHUNK_SIZE
+        url = self._get_enrollment_url(course_settings=None)
+
+        for start in range(0, len(enrollments), chunk_size):
+            chunk = enrollments[start:start + chunk_size]
+            json_data = []
+
+            with collect_timings():
+                with timed('payload_build_time', controller=str(self)):
+                    for data, course_settings in chunk:
+                        json_data.extend(self._get_enrollment_data(data, course_settings))
+
+                LOG.info('calling bulk enrollment for [%s] with %s enrollments', self.__str__(), len(json_data))
+                response, response_status = self._send_enrollment_request(
+                    url,
+                    json_data,
+                    log_fields=self._get_bulk_log_fields(chunk),
+                )
+
+            if len(chunk) > 1 and self._is_rejected_chunk(response, response_status):
+                LOG.info('Bulk enrollment for [%s] rejected, sending its enrollments one by one.', self.__str__())
+                results.extend(self._post_enrollment(data, course_settings) for data, course_settings in chunk)
+            elif isinstance(response, list) and len(response) == len(chunk):
+                results.extend((row_response, response_status) for row_response in response)
+            else:
+                results.extend([(response, response_status)] * len(chunk))
+
+        return results
+
+    @staticmethod
+    def _is_rejected_chunk(response, response_status):
+        """
+        Return whether the provider rejected the content of the chunk, e.g. a row with an invalid email.
+
+        Connection errors, throttling, an open circuit and auth errors fail every row the same way,
+        so those chunks aren't sent again.
+        """
+        return response_status in REJECTED_CHUNK_STATUS_CODES and isinstance(response, (dict, list))
+
+    def _get_bulk_log_fields(self, chunk):
+        """
+        Return the request log columns shared by every enrollment of the chunk.
+        """
+        rows_log_fields = [self._get_log_fields(data) for data, _ in chunk]
+
+        return {
+            name: value
+            for name, value in rows_log_fields[0].items()
+            if all(row_log_fields[name] == value for row_log_fields in rows_log_fields)
+        }
+
     def _get_enrollment_url(self, course_settings):
         """
         """
@@ -1,41 +1,95 @@
 """GreenfigInstanceExternalEnrollment class file."""
 import io
+import json
 import logging
 from datetime import datetime
 
-import requests
+from celery import current_app
 from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from rest_framework import status
 
-from openedx_external_enrollments.edxapp_wrapper.get_site_configuration import configuration_helpers
 from openedx_external_enrollments.edxapp_wrapper.get_student import get_user
 from openedx_external_enrollments.external_enrollments.base_external_enrollment import BaseExternalEnrollment
-from openedx_external_enrollments.models import EnrollmentRequestLog
+from openedx_external_enrollments.http_sessions import get_session, get_timeout
+from openedx_external_enrollments.locks import acquire_lock, release_lock
+from openedx_external_enrollments.metrics import timed
+from openedx_external_enrollments.models import GreenfigRosterLine
+from openedx_external_enrollments.request_logs import log_enrollment_request
+from openedx_external_enrollments.site_cache import get_site_settings
 
 LOG = logging.getLogger(__name__)
 
+ROSTER_FLUSH_LOCK_KEY = 'openedx_external_enrollments.greenfig_roster.lock.{site}.{file_path}'
+ROSTER_FLUSH_SCHEDULED_KEY = 'openedx_external_enrollments.greenfig_roster.scheduled.{site}.{file_path}'
+ROSTER_FLUSH_TASK = 'openedx_external_enrollments.tasks.flush_greenfig_roster'
+DEFAULT_ROSTER_SETTINGS = {
+    'buffered': True,
+    'flush_interval': 60,
+    'flush_lock_timeout': 300,
+    'flush_batch_size': 5000,
+    'flush_max_attempts': 5,
+}
+
+
+def get_roster_settings():
+    """
+    Return the Greenfig roster settings merged over the default ones.
+    """
+    roster_settings = dict(DEFAULT_ROSTER_SETTINGS)
+    roster_settings.update(settings.GREENFIG_ROSTER_SETTINGS)
+
+    return roster_settings
+
 
 class GreenfigInstanceExternalEnrollment(BaseExternalEnrollment):
     """
     GreenfigInstanceExternalEnrollment class.
+
+    The dropbox settings are read from the current site, or from the given site, e.g. in the
+    flush task, which also gives the file path of the roster lines it flushes.
     """
 
-    def __init__(self):
-        self.DROPBOX_API_URL = configuration_helpers.get_value('DROPBOX_API_URL', 'https://content.dropboxapi.com/2')
-        self.DROPBOX_FILE_PATH = configuration_helpers.get_value('DROPBOX_FILE_PATH', '/courses.txt')
-        self.DROPBOX_TOKEN = configuration_helpers.get_value('DROPBOX_TOKEN', 'token')
+    def __init__(self, site_key=None, file_path=None):
+        site_settings = get_site_settings(site_key)
+        self.site_key = site_settings.site_key
+        self.DROPBOX_API_URL = site_settings.dropbox_api_url
+        self.DROPBOX_FILE_PATH = file_path or site_settings.dropbox_file_path
+        self.DROPBOX_TOKEN = site_settings.dropbox_token
 
     def __str__(self):
         return 'greenfig'
 
+    def _post_enrollment(self, data, course_settings=None, raise_on_retryable=False):
+        """
+        Upload the enrollment right away or, when the roster is buffered, queue its line for the next flush.
+        """
+        if not get_roster_settings()['buffered']:
+            return super(GreenfigInstanceExternalEnrollment, self)._post_enrollment(
+                data,
+                course_settings,
+                raise_on_retryable,
+            )
+
+        GreenfigRosterLine.objects.create(  # pylint: disable=no-member
+            site_key=self.site_key,
+            file_path=self.DROPBOX_FILE_PATH,
+            line=self._get_roster_line(data, course_settings),
+        )
+        self._schedule_roster_flush()
+
+        return {'info': 'Enrollment queued for the next roster upload.'}, status.HTTP_202_ACCEPTED
+
     def _execute_post(self, url, data=None, headers=None, json_data=None):
         """
         Send updated list of courses to dropbox.
         """
-        return requests.post(
+        return get_session(str(self)).post(
             url=url,
             data=json_data,
             headers=headers,
+            timeout=get_timeout(str(self)),
         )
 
     def _get_enrollment_headers(self):
@@ -46,6 +100,19 @@ class GreenfigInstanceExternalEnrollment(BaseExternalEnrollment):
             'Dropbox-API-Arg': settings.DROPBOX_API_ARG_UPLOAD % self.DROPBOX_FILE_PATH,
         }
 
+    def _get_update_headers(self, rev):
+        """
+        Returns headers required to upload a file to dropbox only if it is still at the given revision.
+        """
+        headers = self._get_enrollment_headers()
+
+        if rev:
+            headers['Dropbox-API-Arg'] = settings.DROPBOX_API_ARG_UPDATE % (self.DROPBOX_FILE_PATH, rev)
+        else:
+            headers['Dropbox-API-Arg'] = settings.DROPBOX_API_ARG_ADD % self.DROPBOX_FILE_PATH
+
+        return headers
+
     def _get_download_headers(self):
         """Returns headers required to download a dropbox file."""
         return {
@@ -55,9 +122,19 @@ class GreenfigInstanceExternalEnrollment(BaseExternalEnrollment):
 
     def _get_enrollment_data(self, data, course_settings):
         """Returns a file in memory with a new or updated enroll."""
-        user, _ = get_user(email=data.get('user_email'))
         dropbox_file = self._get_course_list(course_settings).text
-        enrollment_data = u'{date}, {fullname}, {first_name}, {last_name}, {email}, {course_id}, {enrolled}\n'.format(
+        dropbox_file += self._get_roster_line(data, course_settings)
+        temp_file = io.StringIO()
+        temp_file.write(dropbox_file)
+        temp_file.seek(0)
+
+        return temp_file.getvalue()
+
+    def _get_roster_line(self, data, course_settings):
+        """Returns the roster line of the enrollment."""
+        user, _ = get_user(email=data.get('user_email'))
+
+        return u'{date}, {fullname}, {first_name}, {last_name}, {email}, {course_id}, {enrolled}\n'.format(
             date=datetime.now().strftime(settings.DROPBOX_DATE_FORMAT),
             fullname=user.profile.name,
             first_name=user.first_name,
@@ -66,12 +143,6 @@ class GreenfigInstanceExternalEnrollment(BaseExternalEnrollment):
             course_id=course_settings.get('external_course_run_id'),
             enrolled=str(data.get('is_active')).lower(),
         )
-        dropbox_file += enrollment_data
-        temp_file = io.StringIO()
-        temp_file.write(dropbox_file)
-        temp_file.seek(0)
-
-        return temp_file.getvalue()
 
     def _get_enrollment_url(self, course_settings):
         """Gets dropbox upload file url."""
@@ -86,15 +157,152 @@ class GreenfigInstanceExternalEnrollment(BaseExternalEnrollment):
         }
 
         try:
-            response = requests.post(url, headers=self._get_download_headers())
+            with timed('course_list_time', controller=str(self)):
+                response = get_session(str(self)).post(
+                    url,
+                    headers=self._get_download_headers(),
+                    timeout=get_timeout(str(self)),
+                )
         except Exception as error:  # pylint: disable=broad-except
             LOG.error('Failed to download course list. Reason: %s', str(error))
             log_details['response'] = {'error': 'Failed to download dropbox course list. Reason: ' + str(error)}
-            EnrollmentRequestLog.objects.create(  # pylint: disable=no-member
-                request_type=str(self),
-                details=log_details,
-            )
+            log_enrollment_request(str(self), log_details, success=False)
 
             return str(error), status.HTTP_500_INTERNAL_SERVER_ERROR
         else:
             return response
+
+    def _download_roster(self):
+        """
+        Returns the roster content and its revision, both are empty when the file doesn't exist yet.
+        """
+        response = self._get_course_list(course_settings=None)
+
+        if isinstance(response, tuple):
+            raise IOError(response[0])
+
+        if response.status_code == status.HTTP_409_CONFLICT and 'not_found' in response.text:
+            return u'', None
+
+        response.raise_for_status()
+        metadata = json.loads(response.headers.get('Dropbox-API-Result', '{}'))
+
+        return response.text, metadata.get('rev')
+
+    def flush_roster(self):
+        """
+        Append the pending roster lines to the dropbox file in a single upload.
+
+        The file is uploaded in update mode with the downloaded revision, so a concurrent change
+        makes dropbox reject the upload and the lines are applied again over the new revision.
+
+        Returns:
+            Number of flushed lines.
+        """
+        lock_key = ROSTER_FLUSH_LOCK_KEY.format(site=self.site_key, file_path=self.DROPBOX_FILE_PATH)
+        lock_token = acquire_lock(lock_key, get_roster_settings()['flush_lock_timeout'])
+
+        if lock_token is None:
+            LOG.info('Greenfig roster %s is already being flushed.', self.DROPBOX_FILE_PATH)
+            return 0
+
+        try:
+            return self._flush_roster_lines()
+        finally:
+            release_lock(lock_key, lock_token)
+
+    def _flush_roster_lines(self):
+        """
+        Upload the pending lines, retrying on revision conflicts.
+        """
+        roster_settings = get_roster_settings()
+        pending_lines = list(
+            self._get_pending_lines().order_by('id')[:roster_settings['flush_batch_size']]
+        )
+
+        if not pending_lines:
+            return 0
+
+        url = self._get_enrollment_url(course_settings=None)
+        log_details = {
+            'url': url,
+            'roster_lines': len(pending_lines),
+        }
+        http_status = None
+
+        for attempt in range(1, roster_settings['flush_max_attempts'] + 1):
+            try:
+                roster, rev = self._download_roster()
+                roster += u''.join(pending_line.line for pending_line in pending_lines)
+                response = self._execute_post(
+                    url=url,
+                    headers=self._get_update_headers(rev),
+                    json_data=roster.encode('utf-8'),
+                )
+            except Exception as error:  # pylint: disable=broad-except
+                LOG.error('Failed to flush greenfig roster. Reason: %s', str(error))
+                log_details['response'] = {'error': 'Failed to flush greenfig roster. Reason: ' + str(error)}
+                break
+
+            if response.ok:
+                GreenfigRosterLine.objects.filter(  # pylint: disable=no-member
+                    id__in=[pending_line.id for pending_line in pending_lines],
+                ).delete()
+                LOG.info('Flushed %s lines to greenfig roster %s.', len(pending_lines), self.DROPBOX_FILE_PATH)
+                log_details['response'] = response.json()
+                log_enrollment_request(str(self), log_details, http_status=response.status_code, success=True)
+                return len(pending_lines)
+
+            if response.status_code != status.HTTP_409_CONFLICT:
+                log_details['response'] = {'error': response.text}
+                http_status = response.status_code
+                break
+
+            LOG.info('Greenfig roster revision %s changed during upload, attempt %s.', rev, attempt)
+        else:
+            log_details['response'] = {'error': 'Too many revision conflicts.'}
+            http_status = status.HTTP_409_CONFLICT
+
+        LOG.error('Failed to flush greenfig roster %s: %s', self.DROPBOX_FILE_PATH, log_details['response'])
+        log_enrollment_request(str(self), log_details, http_status=http_status, success=False)
+        return 0
+
+    def has_pending_lines(self):
+        """
+        Return whether roster lines of the site and file path are waiting to be flushed.
+        """
+        return self._get_pending_lines().exists()
+
+    def _get_pending_lines(self):
+        """
+        Return the queryset of the roster lines of the site and file path.
+        """
+        return GreenfigRosterLine.objects.filter(  # pylint: disable=no-member
+            site_key=self.site_key,
+            file_path=self.DROPBOX_FILE_PATH,
+        )
+
+    def _schedule_roster_flush(self):
+        """
+        Enqueue a roster flush of the site and file path unless one is already scheduled.
+
+        The flush task clears the scheduled mark before flushing, so the lines queued meanwhile
+        schedule the next flush.
+        """
+        interval = get_roster_settings()['flush_interval']
+        kwargs = {'site_key': self.site_key, 'file_path': self.DROPBOX_FILE_PATH}
+
+        if cache.add(self._get_scheduled_key(), True, interval):
+            transaction.on_commit(lambda: current_app.send_task(ROSTER_FLUSH_TASK, kwargs=kwargs, countdown=interval))
+
+    def clear_scheduled_flush(self):
+        """
+        Remove the scheduled mark of the site and file path, so a new flush can be scheduled.
+        """
+        cache.delete(self._get_scheduled_key())
+
+    def _get_scheduled_key(self):
+        """
+        Return the cache key marking a scheduled flush of the site and file path.
+        """
+        return ROSTER_FLUSH_SCHEDULED_KEY.format(site=self.site_key, file_path=self.DROPBOX_FILE_PATH)
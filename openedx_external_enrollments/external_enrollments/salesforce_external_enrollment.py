@@ -1,15 +1,88 @@
 """SalesforceEnrollment class file."""
 import datetime
+import logging
 
 from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
 from oauthlib.oauth2 import BackendApplicationClient
+from opaque_keys import InvalidKeyError
 from opaque_keys.edx.keys import CourseKey
 from requests_oauthlib import OAuth2Session
 
 from openedx_external_enrollments.edxapp_wrapper.get_courseware import get_course_by_id
-from openedx_external_enrollments.edxapp_wrapper.get_student import CourseEnrollment, get_user
+from openedx_external_enrollments.edxapp_wrapper.get_student import CourseEnrollment, get_user, get_users_by_email
 from openedx_external_enrollments.external_enrollments.base_external_enrollment import BaseExternalEnrollment
-from openedx_external_enrollments.models import ProgramSalesforceEnrollment
+from openedx_external_enrollments.http_sessions import get_timeout
+from openedx_external_enrollments.program_metadata import get_program_metadata
+from openedx_external_enrollments.query_profiling import record_edxapp_call
+from openedx_external_enrollments.token_cache import get_token, invalidate_token
+
+LOG = logging.getLogger(__name__)
+
+
+class OrderUsers(object):
+    """
+    Users and enrollments of the order lines, shared by every method building a Salesforce payload.
+
+    When the order lines are given, all the users with their profiles are fetched in one query and
+    all their enrollments in another one, anything not prefetched is read one by one. The users
+    aren't prefetched when one of them has no profile.
+    """
+
+    def __init__(self, order_lines=None):
+        self.order_lines = order_lines or []
+        self._users = {}
+        self._enrollments = {}
+
+        if self.order_lines:
+            try:
+                self._users = get_users_by_email({line.get("user_email") for line in self.order_lines})
+            except ObjectDoesNotExist as error:
+                LOG.warning('Users of the order not prefetched, reading them one by one. Reason: %s', str(error))
+
+            self._enrollments = self._get_order_enrollments()
+
+    def get_user(self, email):
+        """
+        Return the (user, profile) tuple of the email.
+        """
+        if email not in self._users:
+            self._users[email] = get_user(email=email)
+
+        return self._users[email]
+
+    def get_enrollment(self, user, course_key):
+        """
+        Return the enrollment of the user in the course.
+        """
+        if (user.id, course_key) not in self._enrollments:
+            record_edxapp_call('get_enrollment')
+            self._enrollments[(user.id, course_key)] = CourseEnrollment.get_enrollment(user, course_key)
+
+        return self._enrollments[(user.id, course_key)]
+
+    def _get_order_enrollments(self):
+        """
+        Fetch the enrollments of the prefetched users in the order courses.
+        """
+        course_keys = set()
+
+        for line in self.order_lines:
+            try:
+                course_keys.add(CourseKey.from_string(line.get("course_id")))
+            except InvalidKeyError:
+                continue
+
+        if not self._users or not course_keys:
+            return {}
+
+        record_edxapp_call('get_enrollments')
+        enrollments = CourseEnrollment.objects.filter(
+            user__in=[user for user, _ in self._users.values()],
+            course_id__in=course_keys,
+        )
+
+        return {(enrollment.user_id, enrollment.course_id): enrollment for enrollment in enrollments}
 
 
 class SalesforceEnrollment(BaseExternalEnrollment):
@@ -33,7 +106,7 @@ class SalesforceEnrollment(BaseExternalEnrollment):
         return course
 
     def _get_enrollment_headers(self):
-        token = self._get_auth_token()
+        token = self._get_cached_auth_token()
         return {
             "Content-Type": "application/json",
             "Authorization": "{} {}".format(
@@ -42,8 +115,7 @@ class SalesforceEnrollment(BaseExternalEnrollment):
             )
         }
 
-    @staticmethod
-    def _get_auth_token():
+    def _get_auth_token(self):
         """
 
         :return:
@@ -60,15 +132,41 @@ class SalesforceEnrollment(BaseExternalEnrollment):
         oauth.params = request_params
         token = oauth.fetch_token(
             token_url=settings.SALESFORCE_API_TOKEN_URL,
+            timeout=get_timeout(str(self)),
         )
 
         return token
 
+    def _get_cached_auth_token(self):
+        """
+        Return the shared Salesforce token, the same token provides the headers and the instance url.
+        """
+        return get_token(str(self), self._get_token_credentials(), self._get_auth_token)
+
+    def _invalidate_auth_token(self):
+        """
+        Remove the cached token so the next request fetches a new one.
+        """
+        invalidate_token(str(self), self._get_token_credentials())
+        return True
+
     @staticmethod
-    def _get_openedx_user(data):
+    def _get_token_credentials():
+        """
+        Return the values identifying the cached token.
+        """
+        return (
+            settings.SALESFORCE_API_TOKEN_URL,
+            settings.SALESFORCE_API_CLIENT_ID,
+            settings.SALESFORCE_API_USERNAME,
+        )
+
+    @staticmethod
+    def _get_openedx_user(data, users=None):
         """
 
         :param data:
+        :param users: OrderUsers instance shared while building the payload.
         :return:
         """
         user = {}
@@ -76,7 +174,7 @@ class SalesforceEnrollment(BaseExternalEnrollment):
         if order_lines:
             try:
                 email = order_lines[0].get("user_email")
-                _, openedx_profile = get_user(email=email)
+                _, openedx_profile = (users or OrderUsers()).get_user(email)
                 # TODO do not force logic assuming names with 2 words
                 first_name, last_name = openedx_profile.name.split(" ", 1)
                 user["FirstName"] = first_name.strip(" ")
@@ -87,17 +185,18 @@ class SalesforceEnrollment(BaseExternalEnrollment):
 
         return user
 
-    def _get_salesforce_data(self, data):
+    def _get_salesforce_data(self, data, users=None):
         """
 
         :param data:
+        :param users: OrderUsers instance shared while building the payload.
         :return:
         """
         salesforce_data = {}
         order_lines = data.get("supported_lines")
         if order_lines:
             try:
-                salesforce_data.update(self._get_program_of_interest_data(data, order_lines))
+                salesforce_data.update(self._get_program_of_interest_data(data, order_lines, users=users))
                 salesforce_data["Purchase_Type"] = "Program" if data.get("program") else "Course"
                 salesforce_data["PaymentAmount"] = data.get("paid_amount")
                 salesforce_data["Amount_Currency"] = data.get("currency")
@@ -106,24 +205,22 @@ class SalesforceEnrollment(BaseExternalEnrollment):
 
         return salesforce_data
 
-    def _get_program_of_interest_data(self, data, order_lines):
+    def _get_program_of_interest_data(self, data, order_lines, users=None):
         """
 
         :param data:
         :param order_lines:
+        :param users: OrderUsers instance shared while building the payload.
         :return:
         """
         program_of_interest = {}
         program = data.get("program")
         try:
             email = order_lines[0].get("user_email")
-            openedx_user, _ = get_user(email=email)
+            openedx_user, _ = (users or OrderUsers()).get_user(email)
             request_time = datetime.datetime.utcnow()
             if program:
-                related_program = ProgramSalesforceEnrollment.objects.get(  # pylint: disable=no-member
-                    bundle_id=program.get("uuid"),
-                )
-                program_of_interest = related_program.meta
+                program_of_interest = get_program_metadata(program.get("uuid"))
                 program_of_interest["Drupal_ID"] = "enrollment+program+{}+{}".format(
                     openedx_user.username,
                     request_time.strftime("%Y/%m/%d-%H:%M:%S"),
@@ -154,14 +251,16 @@ class SalesforceEnrollment(BaseExternalEnrollment):
 
         return program_of_interest
 
-    def _get_courses_data(self, data, order_lines):  # pylint: disable=unused-argument
+    def _get_courses_data(self, data, order_lines, users=None):  # pylint: disable=unused-argument
         """
 
         :param data:
         :param order_lines:
+        :param users: OrderUsers instance shared while building the payload.
         :return:
         """
         courses = []
+        users = users or OrderUsers()
         for line in order_lines:
             try:
                 course_id = line.get("course_id")
@@ -170,7 +269,12 @@ class SalesforceEnrollment(BaseExternalEnrollment):
                 course_data = dict()
                 course_data["CourseName"] = salesforce_settings.get("Program_Name") or course.display_name
                 course_data["CourseCode"] = self._get_salesforce_course_id(course, course_id)
-                course_data["CourseStartDate"] = self._get_course_start_date(course, line.get("user_email"), course_id)
+                course_data["CourseStartDate"] = self._get_course_start_date(
+                    course,
+                    line.get("user_email"),
+                    course_id,
+                    users=users,
+                )
                 course_data["CourseEndDate"] = course.end.strftime("%Y-%m-%d")
                 course_data["CourseDuration"] = "0"
             except Exception:  # pylint: disable=broad-except
@@ -201,14 +305,14 @@ class SalesforceEnrollment(BaseExternalEnrollment):
         )
 
     @staticmethod
-    def _get_course_start_date(course, email, course_id):
+    def _get_course_start_date(course, email, course_id, users=None):
         """
         Return the course date start.
         """
-
-        user, _ = get_user(email=email)
+        users = users or OrderUsers()
+        user, _ = users.get_user(email)
         course_key = CourseKey.from_string(course_id)
-        enrollment = CourseEnrollment.get_enrollment(user, course_key)
+        enrollment = users.get_enrollment(user, course_key)
 
         if course.self_paced:
             dates_to_check = [enrollment.created, course.start]
@@ -243,15 +347,17 @@ class SalesforceEnrollment(BaseExternalEnrollment):
         payload = {
             "enrollment": {}
         }
-        openedx_user_info = self._get_openedx_user(data)
+        users = OrderUsers(data.get("supported_lines"))
+        openedx_user_info = self._get_openedx_user(data, users=users)
         payload["enrollment"].update(openedx_user_info)
 
-        salesforce_data = self._get_salesforce_data(data)
+        salesforce_data = self._get_salesforce_data(data, users=users)
         payload["enrollment"].update(salesforce_data)
 
         payload["enrollment"]["Course_Data"] = self._get_courses_data(
             data,
             data.get("supported_lines"),
+            users=users,
         )
 
         unwanted = set(payload["enrollment"]) - set(valid_keys)
@@ -260,8 +366,20 @@ class SalesforceEnrollment(BaseExternalEnrollment):
 
         return payload
 
+    @staticmethod
+    def _get_log_fields(data):
+        """
+        Return the email and the course of the first order line, the one that identifies the learner.
+        """
+        order_lines = data.get("supported_lines") or [{}]
+
+        return {
+            "user_email": order_lines[0].get("user_email"),
+            "course_id": order_lines[0].get("course_id"),
+        }
+
     def _get_enrollment_url(self, course_settings):
         """
         """
-        token = self._get_auth_token()
+        token = self._get_cached_auth_token()
         return "{}/{}".format(token.get('instance_url'), settings.SALESFORCE_ENROLLMENT_API_PATH)
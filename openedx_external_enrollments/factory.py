@@ -1,4 +1,10 @@
 """Openedx external enrollments factory file."""
+import logging
+import threading
+
+import pkg_resources
+
+from openedx_external_enrollments.exceptions import UnknownExternalTargetError
 from openedx_external_enrollments.external_enrollments.edx_enterprise_external_enrollment import (
     EdxEnterpriseExternalEnrollment,
 )
@@ -8,19 +14,113 @@ from openedx_external_enrollments.external_enrollments.edx_instance_external_enr
 from openedx_external_enrollments.external_enrollments.greenfig_external_enrollment import (
     GreenfigInstanceExternalEnrollment,
 )
+from openedx_external_enrollments.site_cache import get_current_site_key, get_site_version
+
+LOG = logging.getLogger(__name__)
+
+CONTROLLERS_ENTRY_POINT = 'openedx_external_enrollments.controllers'
+BUILTIN_CONTROLLERS = {
+    'edx': EdxEnterpriseExternalEnrollment,
+    'openedx': EdxInstanceExternalEnrollment,
+    'greenfig': GreenfigInstanceExternalEnrollment,
+}
 
 
 class ExternalEnrollmentFactory(object):
-    """Class to define the right controller."""
+    """
+    Class to define the right controller.
+
+    Controllers are registered by target name: the built-in ones and the ones installed by other
+    packages in the openedx_external_enrollments.controllers entry point group, e.g.
+
+        entry_points={
+            'openedx_external_enrollments.controllers': [
+                'mytarget = my_package.controllers:MyTargetExternalEnrollment',
+            ],
+        }
+
+    The instances are cached per site until its SiteConfiguration changes.
+    """
+    _registry = None
+    _instances = {}
+    _lock = threading.Lock()
 
     @classmethod
     def get_enrollment_controller(cls, controller):
         """
-        Return the an instance of the enrollment controller.
+        Return the instance of the enrollment controller for the current site.
+
+        Raises:
+            UnknownExternalTargetError: there's no controller registered for the target.
+        """
+        target = controller.lower()
+        controller_class = cls.get_registry().get(target)
+
+        if controller_class is None:
+            raise UnknownExternalTargetError('Unknown external platform target: {}'.format(controller))
+
+        site_key = get_current_site_key()
+        version = get_site_version(site_key)
+        cached_instance = cls._instances.get((site_key, target))
+
+        if cached_instance and cached_instance[0] == version:
+            return cached_instance[1]
+
+        instance = controller_class()
+        cls._instances[(site_key, target)] = (version, instance)
+
+        return instance
+
+    @classmethod
+    def get_registry(cls):
+        """
+        Return the controller classes keyed by target name, loading the plugins on the first call.
         """
-        if controller.lower() == 'openedx':
-            return EdxInstanceExternalEnrollment()
-        elif controller.lower() == 'greenfig':
-            return GreenfigInstanceExternalEnrollment()
-        else:
-            return EdxEnterpriseExternalEnrollment()
+        if cls._registry is None:
+            with cls._lock:
+                if cls._registry is None:
+                    registry = dict(BUILTIN_CONTROLLERS)
+                    registry.update(_load_plugin_controllers())
+                    cls._registry = registry
+
+        return cls._registry
+
+    @classmethod
+    def register_controller(cls, target, controller_class):
+        """
+        Register the controller class of a target, replacing the current one.
+        """
+        registry = dict(cls.get_registry())
+        registry[target.lower()] = controller_class
+        cls._registry = registry
+        cls.clear_instances()
+
+    @classmethod
+    def clear_instances(cls):
+        """
+        Drop the cached controller instances of every site.
+        """
+        cls._instances = {}
+
+    @classmethod
+    def reset(cls):
+        """
+        Drop the registry and the cached instances, the plugins are loaded again on the next call.
+        """
+        cls._registry = None
+        cls.clear_instances()
+
+
+def _load_plugin_controllers():
+    """
+    Return the controller classes of the entry point group keyed by target name.
+    """
+    controllers = {}
+
+    for entry_point in pkg_resources.iter_entry_points(CONTROLLERS_ENTRY_POINT):
+        try:
+            controllers[entry_point.name.lower()] = entry_point.load()
+        except Exception as error:  # pylint: disable=broad-except
+            LOG.error('Failed to load the enrollment controller %s. Reason: %s', entry_point, str(error))
+
+    return controllers
@@ -0,0 +1,183 @@
+"""
+Per-process registry of the requests sessions used to reach the external platforms.
+
+Every provider gets its own keep-alive session with a bounded connection pool, retries
+for connection errors and the connect/read timeouts defined in OEE_HTTP_SESSION_SETTINGS.
+After every response the pool usage of the session is emitted as the http_pool_* gauges.
+"""
+import os
+import threading
+from functools import partial
+
+import requests
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from urllib3.util.retry import Retry
+
+from openedx_external_enrollments.metrics import gauge
+
+DEFAULT_SESSION_SETTINGS = {
+    'pool_size': 10,
+    'connect_timeout': 5,
+    'read_timeout': 30,
+    'max_retries': 2,
+    'backoff_factor': 0.5,
+}
+
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def get_session(provider):
+    """
+    Return the session of the provider for the current process.
+    """
+    key = (os.getpid(), provider)
+    session = _SESSIONS.get(key)
+
+    if session is None:
+        with _SESSIONS_LOCK:
+            session = _SESSIONS.get(key)
+
+            if session is None:
+                session = _SESSIONS[key] = _build_session(provider)
+
+    return session
+
+
+def get_timeout(provider):
+    """
+    Return the (connect, read) timeout tuple of the provider.
+    """
+    session_settings = get_session_settings(provider)
+
+    return session_settings['connect_timeout'], session_settings['read_timeout']
+
+
+def get_session_settings(provider):
+    """
+    Return the session settings of the provider merged over the default ones.
+    """
+    configured_settings = settings.OEE_HTTP_SESSION_SETTINGS
+    session_settings = dict(DEFAULT_SESSION_SETTINGS)
+    session_settings.update(configured_settings.get('default', {}))
+    session_settings.update(configured_settings.get(provider, {}))
+
+    return session_settings
+
+
+def get_session_stats():
+    """
+    Return the connection pool usage of every provider session in the current process.
+
+    Returns:
+        Dict keyed by provider with the number of requests, of new connections and of
+        requests that reused a pooled connection.
+    """
+    return {
+        provider: _get_pool_stats(session)
+        for (pid, provider), session in list(_SESSIONS.items())
+        if pid == os.getpid()
+    }
+
+
+def emit_session_stats(provider):
+    """
+    Emit the connection pool usage of the provider session as the http_pool_* gauges.
+    """
+    session = _SESSIONS.get((os.getpid(), provider))
+
+    if session is None:
+        return
+
+    for name, value in _get_pool_stats(session).items():
+        gauge('http_pool_{}'.format(name), value, controller=provider)
+
+
+def close_sessions():
+    """
+    Close and forget every registered session.
+    """
+    with _SESSIONS_LOCK:
+        for session in _SESSIONS.values():
+            session.close()
+
+        _SESSIONS.clear()
+
+
+def _build_session(provider):
+    """
+    Create a session with a pooled adapter configured for the provider.
+    """
+    session_settings = get_session_settings(provider)
+    retries = Retry(
+        total=session_settings['max_retries'],
+        connect=session_settings['max_retries'],
+        read=0,
+        status=0,
+        backoff_factor=session_settings['backoff_factor'],
+        raise_on_status=False,
+    )
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=session_settings['pool_size'],
+        pool_maxsize=session_settings['pool_size'],
+        max_retries=retries,
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.hooks['response'].append(partial(_emit_session_stats_hook, provider))
+
+    return session
+
+
+def _emit_session_stats_hook(provider, response, *args, **kwargs):  # pylint: disable=unused-argument
+    """
+    Response hook of the provider session that emits its pool usage.
+    """
+    emit_session_stats(provider)
+
+    return response
+
+
+def _get_pool_stats(session):
+    """
+    Return the number of requests, of new connections and of requests that reused a pooled connection.
+    """
+    requests_count = connections_count = 0
+
+    for pool in _get_connection_pools(session):
+        requests_count += pool.num_requests
+        connections_count += pool.num_connections
+
+    return {
+        'requests': requests_count,
+        'new_connections': connections_count,
+        'reused_connections': max(requests_count - connections_count, 0),
+    }
+
+
+def _get_connection_pools(session):
+    """
+    Return the urllib3 connection pools held by the session adapters.
+    """
+    pools = []
+    adapters = {id(adapter): adapter for adapter in session.adapters.values()}
+
+    for adapter in adapters.values():
+        pool_container = adapter.poolmanager.pools
+
+        with pool_container.lock:
+            pools.extend(pool_container._container.values())  # pylint: disable=protected-access
+
+    return pools
+
+
+@receiver(setting_changed)
+def reset_sessions(setting, **kwargs):  # pylint: disable=unused-argument
+    """
+    Rebuild the sessions when their settings change, e.g. with override_settings.
+    """
+    if setting == 'OEE_HTTP_SESSION_SETTINGS':
+        close_sessions()
@@ -0,0 +1,35 @@
+"""
+Locks shared between the workers through the Django cache.
+
+Every holder stores its own token in the lock, so a holder that outlived the lock timeout can't
+release the lock another worker took after it expired.
+"""
+from uuid import uuid4
+
+from django.core.cache import cache
+
+
+def acquire_lock(lock_key, timeout):
+    """
+    Take the lock for timeout seconds.
+
+    Returns:
+        The token of the holder, or None when the lock is held by another worker.
+    """
+    lock_token = uuid4().hex
+
+    if cache.add(lock_key, lock_token, timeout):
+        return lock_token
+
+    return None
+
+
+def release_lock(lock_key, lock_token):
+    """
+    Delete the lock only when it is still held by the holder of lock_token.
+
+    lock_token is None when the lock was held by another worker, its lock may also have
+    expired and been taken by a third worker, so the stored token is compared first.
+    """
+    if lock_token and cache.get(lock_key) == lock_token:
+        cache.delete(lock_key)
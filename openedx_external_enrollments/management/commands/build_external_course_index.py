@@ -0,0 +1,25 @@
+"""
+Command to build the index of the courses with an external_platform_target.
+"""
+from django.core.management.base import BaseCommand
+
+from openedx_external_enrollments.course_index import rebuild_index
+from openedx_external_enrollments.edxapp_wrapper.get_courseware import get_courses
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the external course index from every course of the modulestore.
+
+    The index is kept up to date when courses are published, the command must be run
+    once before enabling it in OEE_EXTERNAL_COURSE_INDEX_SETTINGS.
+
+    Example:
+        ./manage.py lms build_external_course_index
+    """
+    help = 'Rebuild the index of the courses with an external_platform_target.'
+
+    def handle(self, *args, **options):
+        indexed = rebuild_index(get_courses())
+
+        self.stdout.write('{} external courses indexed.'.format(indexed))
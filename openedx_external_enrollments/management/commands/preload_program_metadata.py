@@ -0,0 +1,32 @@
+"""
+Command to cache the metadata of the Salesforce programs.
+"""
+from django.core.management.base import BaseCommand
+
+from openedx_external_enrollments.program_metadata import preload_program_metadata
+
+
+class Command(BaseCommand):
+    """
+    Cache the metadata of the given programs, or of every program, before a burst of orders.
+
+    The metadata is cached on its first use anyway, the command avoids the first queries
+    of every program, e.g. after a deploy or before a sale.
+
+    Example:
+        ./manage.py lms preload_program_metadata
+        ./manage.py lms preload_program_metadata <bundle_id> <bundle_id>
+    """
+    help = 'Cache the metadata of the Salesforce programs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'bundle_ids',
+            nargs='*',
+            help='Bundle ids of the programs, every program by default.',
+        )
+
+    def handle(self, *args, **options):
+        cached = preload_program_metadata(options['bundle_ids'] or None)
+
+        self.stdout.write('{} program metadata entries cached.'.format(cached))
@@ -0,0 +1,106 @@
+"""
+Command to delete, and optionally export, the enrollment request logs older than the retention window.
+"""
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from openedx_external_enrollments.models import EnrollmentRequestLog
+from openedx_external_enrollments.request_logs import get_request_log_settings
+
+EXPORTED_FIELDS = (
+    'id',
+    'request_type',
+    'details',
+    'user_email_hash',
+    'course_id',
+    'http_status',
+    'success',
+    'duration',
+    'timings',
+    'created_at',
+)
+
+
+class Command(BaseCommand):
+    """
+    Prune the old enrollment request logs in bounded batches.
+
+    Example:
+        ./manage.py lms prune_enrollment_request_logs --days 90 --export /tmp/request_logs.jsonl
+    """
+    help = 'Delete the enrollment request logs older than the retention window.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=get_request_log_settings()['retention_days'],
+            help='Retention window in days, older logs are pruned.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of logs deleted per query.',
+        )
+        parser.add_argument(
+            '--export',
+            help='Append the pruned logs to this file as JSON lines before deleting them.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report the number of logs that would be pruned.',
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < 0 or options['batch_size'] < 1:
+            raise CommandError('--days must not be negative and --batch-size must be greater than 0.')
+
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        old_logs = EnrollmentRequestLog.objects.filter(created_at__lt=cutoff)  # pylint: disable=no-member
+
+        if options['dry_run']:
+            self.stdout.write('{} enrollment request logs would be pruned.'.format(old_logs.count()))
+            return
+
+        export_file = open(options['export'], 'a') if options['export'] else None
+        pruned = 0
+
+        try:
+            while True:
+                batch = list(old_logs.order_by('id')[:options['batch_size']])
+
+                if not batch:
+                    break
+
+                if export_file:
+                    self._export(export_file, batch)
+
+                EnrollmentRequestLog.objects.filter(  # pylint: disable=no-member
+                    id__in=[request_log.id for request_log in batch],
+                ).delete()
+                pruned += len(batch)
+        finally:
+            if export_file:
+                export_file.close()
+
+        self.stdout.write('{} enrollment request logs pruned.'.format(pruned))
+
+    @staticmethod
+    def _export(export_file, batch):
+        """
+        Write the logs of the batch as JSON lines.
+        """
+        for request_log in batch:
+            export_file.write(json.dumps(
+                {field: getattr(request_log, field) for field in EXPORTED_FIELDS},
+                cls=DjangoJSONEncoder,
+            ))
+            export_file.write('\n')
+
+        export_file.flush()
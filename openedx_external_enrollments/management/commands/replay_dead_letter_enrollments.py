@@ -0,0 +1,88 @@
+"""
+Command to enqueue again the enrollments that were dead-lettered after all their retries.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from openedx_external_enrollments import tasks
+from openedx_external_enrollments.models import EnrollmentDeadLetter
+
+REPLAY_TASKS = {
+    'salesforce': 'generate_salesforce_enrollment',
+}
+
+
+class Command(BaseCommand):
+    """
+    Replay the pending dead-lettered enrollments in batches.
+
+    Example:
+        ./manage.py lms replay_dead_letter_enrollments --request-type salesforce --batch-size 200
+    """
+    help = 'Enqueue again the dead-lettered enrollments that have not been replayed yet.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--request-type',
+            default='salesforce',
+            choices=sorted(REPLAY_TASKS),
+            help='Type of the dead-lettered enrollments to replay.',
+        )
+        parser.add_argument(
+            '--ids',
+            nargs='+',
+            type=int,
+            help='Replay only these dead letters.',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Maximum number of dead letters to replay.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Number of dead letters marked as replayed per query.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report the dead letters that would be replayed.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be greater than 0.')
+
+        replay_task = getattr(tasks, REPLAY_TASKS[options['request_type']])
+        dead_letters = EnrollmentDeadLetter.objects.filter(  # pylint: disable=no-member
+            request_type=options['request_type'],
+            replayed_at__isnull=True,
+        ).order_by('id')
+
+        if options['ids']:
+            dead_letters = dead_letters.filter(id__in=options['ids'])
+
+        if options['limit']:
+            dead_letters = dead_letters[:options['limit']]
+
+        pending = list(dead_letters.only('id', 'data'))
+
+        if options['dry_run']:
+            self.stdout.write('{} dead letters would be replayed.'.format(len(pending)))
+            return
+
+        replayed = 0
+
+        for start in range(0, len(pending), options['batch_size']):
+            batch = pending[start:start + options['batch_size']]
+
+            for dead_letter in batch:
+                replay_task.delay(dead_letter.data)
+
+            replayed += EnrollmentDeadLetter.objects.filter(  # pylint: disable=no-member
+                id__in=[dead_letter.id for dead_letter in batch],
+            ).update(replayed_at=timezone.now())
+
+        self.stdout.write('{} dead letters replayed.'.format(replayed))
@@ -0,0 +1,29 @@
+"""
+Command to relay again the outbox enrollment changes that failed after all their attempts.
+"""
+from django.core.management.base import BaseCommand
+
+from openedx_external_enrollments.outbox import retry_failed_entries
+
+
+class Command(BaseCommand):
+    """
+    Return the failed outbox enrollment changes to pending and schedule a relay.
+
+    Example:
+        ./manage.py lms retry_failed_outbox_entries --ids 12 15
+    """
+    help = 'Relay again the failed external enrollment outbox changes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ids',
+            nargs='+',
+            type=int,
+            help='Retry only these outbox entries.',
+        )
+
+    def handle(self, *args, **options):
+        retried = retry_failed_entries(options['ids'])
+
+        self.stdout.write('{} outbox entries will be relayed again.'.format(retried))
@@ -0,0 +1,263 @@
+"""
+Metrics of the external enrollment calls.
+
+The metrics are emitted through the backend configured in OEE_METRICS_BACKEND: noop, statsd or
+prometheus. Timings are histograms in seconds, counters are incremented by one and gauges are set
+to the given value, all tagged e.g. with the controller and the outcome. The statsd and prometheus
+backends need the statsd and prometheus_client packages, the noop backend is used when they can't
+be imported.
+
+Timings measured while collect_timings is active are also collected in milliseconds, so the
+enrollment controllers store them in the EnrollmentRequestLog of the enrollment.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from importlib import import_module
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+LOG = logging.getLogger(__name__)
+
+NOOP_BACKEND = 'noop'
+STATSD_BACKEND = 'statsd'
+PROMETHEUS_BACKEND = 'prometheus'
+
+_BACKENDS = {}
+_PROMETHEUS_METRICS = {}
+_DATA = threading.local()
+
+
+class NoopMetricsBackend(object):
+    """
+    Backend that discards the metrics.
+    """
+
+    def timing(self, name, seconds, tags):
+        """
+        Discard the timing.
+        """
+
+    def increment(self, name, tags):
+        """
+        Discard the counter increment.
+        """
+
+    def gauge(self, name, value, tags):
+        """
+        Discard the gauge value.
+        """
+
+
+class StatsdMetricsBackend(object):
+    """
+    Backend that sends the metrics to a statsd server, the tag values are appended to the metric name.
+    """
+
+    def __init__(self, host, port, prefix):
+        self.client = import_module('statsd').StatsClient(host, port, prefix=prefix)
+
+    def timing(self, name, seconds, tags):
+        """
+        Send the timing in milliseconds.
+        """
+        self.client.timing(self._get_stat(name, tags), seconds * 1000)
+
+    def increment(self, name, tags):
+        """
+        Send the counter increment.
+        """
+        self.client.incr(self._get_stat(name, tags))
+
+    def gauge(self, name, value, tags):
+        """
+        Send the gauge value.
+        """
+        self.client.gauge(self._get_stat(name, tags), value)
+
+    @staticmethod
+    def _get_stat(name, tags):
+        """
+        Return the stat name with the values of the tags sorted by tag name, e.g. http_time.greenfig.
+        """
+        return '.'.join([name] + [str(tags[tag]).replace('.', '_') for tag in sorted(tags)])
+
+
+class PrometheusMetricsBackend(object):
+    """
+    Backend that records the metrics in the prometheus_client default registry.
+
+    The metrics are shared by every instance, since the registry rejects duplicated names.
+    """
+
+    def __init__(self, prefix):
+        self.prometheus_client = import_module('prometheus_client')
+        self.prefix = prefix
+
+    def timing(self, name, seconds, tags):
+        """
+        Observe the timing in the histogram of the metric.
+        """
+        self._get_metric(self.prometheus_client.Histogram, '{}_seconds'.format(name), tags).observe(seconds)
+
+    def increment(self, name, tags):
+        """
+        Increment the counter of the metric.
+        """
+        self._get_metric(self.prometheus_client.Counter, name, tags).inc()
+
+    def gauge(self, name, value, tags):
+        """
+        Set the gauge of the metric.
+        """
+        self._get_metric(self.prometheus_client.Gauge, name, tags).set(value)
+
+    def _get_metric(self, metric_class, name, tags):
+        """
+        Return the metric child of the tag values, registering the metric on its first use.
+        """
+        full_name = '{}_{}'.format(self.prefix, name)
+        metric = _PROMETHEUS_METRICS.get(full_name)
+
+        if metric is None:
+            metric = _PROMETHEUS_METRICS.setdefault(
+                full_name,
+                metric_class(full_name, 'External enrollments {}.'.format(name), sorted(tags)),
+            )
+
+        return metric.labels(**{tag: str(value) for tag, value in tags.items()}) if tags else metric
+
+
+def get_metrics_backend():
+    """
+    Return the backend of the configured OEE_METRICS_BACKEND.
+    """
+    name = settings.OEE_METRICS_BACKEND
+    backend = _BACKENDS.get(name)
+
+    if backend is None:
+        options = settings.OEE_METRICS_SETTINGS
+
+        try:
+            if name == STATSD_BACKEND:
+                backend = StatsdMetricsBackend(
+                    options.get('statsd_host', 'localhost'),
+                    options.get('statsd_port', 8125),
+                    options.get('prefix', 'openedx_external_enrollments'),
+                )
+            elif name == PROMETHEUS_BACKEND:
+                backend = PrometheusMetricsBackend(options.get('prefix', 'openedx_external_enrollments'))
+            else:
+                backend = NoopMetricsBackend()
+        except ImportError as error:
+            LOG.error('Metrics backend %s is not available, metrics are discarded. Reason: %s', name, str(error))
+            backend = NoopMetricsBackend()
+
+        backend = _BACKENDS.setdefault(name, backend)
+
+    return backend
+
+
+def observe(name, seconds, **tags):
+    """
+    Emit the timing and add it to the timings being collected.
+    """
+    timings = _get_timings()
+
+    if timings is not None:
+        timings[name] = round(timings.get(name, 0) + seconds * 1000, 3)
+
+    try:
+        get_metrics_backend().timing(name, seconds, tags)
+    except Exception as error:  # pylint: disable=broad-except
+        LOG.warning('Failed to emit the %s metric. Reason: %s', name, str(error))
+
+
+def increment(name, **tags):
+    """
+    Emit a counter increment.
+    """
+    try:
+        get_metrics_backend().increment(name, tags)
+    except Exception as error:  # pylint: disable=broad-except
+        LOG.warning('Failed to emit the %s metric. Reason: %s', name, str(error))
+
+
+def gauge(name, value, **tags):
+    """
+    Emit a gauge value.
+    """
+    try:
+        get_metrics_backend().gauge(name, value, tags)
+    except Exception as error:  # pylint: disable=broad-except
+        LOG.warning('Failed to emit the %s metric. Reason: %s', name, str(error))
+
+
+@contextmanager
+def timed(name, **tags):
+    """
+    Measure the wrapped block and emit its timing, also when it raises.
+    """
+    start_time = time.time()
+
+    try:
+        yield
+    finally:
+        observe(name, time.time() - start_time, **tags)
+
+
+@contextmanager
+def collect_timings():
+    """
+    Collect the timings observed in the wrapped block.
+
+    Yields:
+        Dict with the collected timings in milliseconds by metric name.
+    """
+    scopes = _get_scopes()
+    scopes.append({})
+
+    try:
+        yield scopes[-1]
+    finally:
+        scopes.pop()
+
+
+def get_collected_timings():
+    """
+    Return a copy of the timings collected so far or None when no collection is active.
+    """
+    timings = _get_timings()
+
+    return dict(timings) if timings is not None else None
+
+
+def _get_timings():
+    """
+    Return the dict of the innermost collection or None.
+    """
+    scopes = _get_scopes()
+
+    return scopes[-1] if scopes else None
+
+
+def _get_scopes():
+    """
+    Return the stack of active collections of the current thread.
+    """
+    if not hasattr(_DATA, 'scopes'):
+        _DATA.scopes = []
+
+    return _DATA.scopes
+
+
+@receiver(setting_changed)
+def reset_metrics_backends(setting=None, **kwargs):  # pylint: disable=unused-argument
+    """
+    Drop the backends when their settings change, e.g. with override_settings.
+    """
+    if setting and setting.startswith('OEE_METRICS_'):
+        _BACKENDS.clear()
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-17 16:04
+"""Auto-generated migration file."""
+from __future__ import unicode_literals
+
+import uuid
+
+import jsonfield.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Auto-generated migration class."""
+
+    dependencies = [
+        ('openedx_external_enrollments', '0002_greenfigrosterline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExternalEnrollmentJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('controller', models.CharField(max_length=50)),
+                ('course_id', models.CharField(max_length=255)),
+                ('data', jsonfield.fields.JSONField(blank=True)),
+                ('status', models.CharField(
+                    choices=[
+                        ('pending', 'Pending'),
+                        ('running', 'Running'),
+                        ('succeeded', 'Succeeded'),
+                        ('failed', 'Failed'),
+                    ],
+                    default='pending',
+                    max_length=10,
+                )),
+                ('response', jsonfield.fields.JSONField(blank=True, null=True)),
+                ('response_status', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
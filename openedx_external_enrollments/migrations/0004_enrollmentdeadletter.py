@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-17 16:07
+"""Auto-generated migration file."""
+from __future__ import unicode_literals
+
+import jsonfield.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Auto-generated migration class."""
+
+    dependencies = [
+        ('openedx_external_enrollments', '0003_externalenrollmentjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EnrollmentDeadLetter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('request_type', models.CharField(db_index=True, max_length=10)),
+                ('data', jsonfield.fields.JSONField(blank=True)),
+                ('reason', models.TextField(blank=True)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('replayed_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-17 16:11
+"""Auto-generated migration file."""
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Auto-generated migration class."""
+
+    dependencies = [
+        ('openedx_external_enrollments', '0004_enrollmentdeadletter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enrollmentrequestlog',
+            name='course_id',
+            field=models.CharField(blank=True, db_index=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='enrollmentrequestlog',
+            name='duration',
+            field=models.FloatField(blank=True, help_text='Duration of the request in milliseconds.', null=True),
+        ),
+        migrations.AddField(
+            model_name='enrollmentrequestlog',
+            name='http_status',
+            field=models.PositiveSmallIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='enrollmentrequestlog',
+            name='success',
+            field=models.NullBooleanField(db_index=True),
+        ),
+        migrations.AddField(
+            model_name='enrollmentrequestlog',
+            name='user_email_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='enrollmentrequestlog',
+            index=models.Index(fields=['request_type', 'created_at'], name='oee_request_log_type_created'),
+        ),
+    ]
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""Backfill the extracted columns of the existing EnrollmentRequestLog rows."""
+from __future__ import unicode_literals
+
+import hashlib
+
+from django.db import migrations, models, transaction
+
+BACKFILL_BATCH_SIZE = 500
+BACKFILLED_COLUMNS = ('user_email_hash', 'course_id', 'success')
+
+
+def _get_user_email(request_payload):
+    """Return the email of the learner found in the request payload."""
+    if not isinstance(request_payload, dict):
+        return ''
+
+    enrollment = request_payload.get('enrollment')
+
+    if isinstance(enrollment, dict):
+        return enrollment.get('Email') or ''
+
+    return request_payload.get('user_email') or request_payload.get('email') or ''
+
+
+def _get_success(response):
+    """Return False when the logged response is an error and None when it's unknown."""
+    if response is None:
+        return None
+
+    return not (isinstance(response, dict) and 'error' in response)
+
+
+def _get_columns(details):
+    """Return the values of the new columns extracted from the details of a row."""
+    details = details if isinstance(details, dict) else {}
+    request_payload = details.get('request_payload')
+    email = _get_user_email(request_payload)
+    course_id = request_payload.get('course_id') if isinstance(request_payload, dict) else None
+
+    return {
+        'user_email_hash': hashlib.sha256(email.strip().lower().encode('utf-8')).hexdigest() if email else '',
+        'course_id': (course_id or '')[:255],
+        'success': _get_success(details.get('response')),
+    }
+
+
+def backfill_columns(apps, schema_editor):  # pylint: disable=unused-argument
+    """
+    Fill the new columns from details with a single UPDATE per batch of rows.
+
+    Every column is set with a CASE on the row id, the rows whose values are the column
+    defaults are left out of the update.
+    """
+    enrollment_request_log = apps.get_model('openedx_external_enrollments', 'EnrollmentRequestLog')
+    last_id = 0
+
+    while True:
+        rows = list(
+            enrollment_request_log.objects.filter(id__gt=last_id).order_by('id').only(
+                'id',
+                'details',
+            )[:BACKFILL_BATCH_SIZE]
+        )
+
+        if not rows:
+            return
+
+        whens = {column: [] for column in BACKFILLED_COLUMNS}
+        updated_ids = []
+
+        for row in rows:
+            columns = _get_columns(row.details)
+
+            if not any(value not in ('', None) for value in columns.values()):
+                continue
+
+            updated_ids.append(row.id)
+
+            for column, value in columns.items():
+                whens[column].append(models.When(id=row.id, then=models.Value(value)))
+
+        if updated_ids:
+            with transaction.atomic():
+                enrollment_request_log.objects.filter(id__in=updated_ids).update(**{
+                    column: models.Case(
+                        *column_whens,
+                        default=models.F(column),
+                        output_field=enrollment_request_log._meta.get_field(column)  # pylint: disable=protected-access
+                    )
+                    for column, column_whens in whens.items()
+                })
+
+        last_id = rows[-1].id
+
+
+class Migration(migrations.Migration):
+    """Data migration class."""
+
+    atomic = False
+
+    dependencies = [
+        ('openedx_external_enrollments', '0005_enrollmentrequestlog_columns'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_columns, migrations.RunPython.noop),
+    ]
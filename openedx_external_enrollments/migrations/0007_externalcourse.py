@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-17 18:42
+"""Auto-generated migration file."""
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Auto-generated migration class."""
+
+    dependencies = [
+        ('openedx_external_enrollments', '0006_backfill_enrollmentrequestlog_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExternalCourse',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('course_id', models.CharField(max_length=255, unique=True)),
+                ('external_platform_target', models.CharField(max_length=50)),
+                ('external_course_run_id', models.CharField(blank=True, max_length=255)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
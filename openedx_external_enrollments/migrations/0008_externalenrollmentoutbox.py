@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-17 19:20
+"""Auto-generated migration file."""
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Auto-generated migration class."""
+
+    dependencies = [
+        ('openedx_external_enrollments', '0007_externalcourse'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExternalEnrollmentOutbox',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('idempotency_key', models.CharField(max_length=64, unique=True)),
+                ('user_email', models.CharField(max_length=254)),
+                ('course_id', models.CharField(max_length=255)),
+                ('course_mode', models.CharField(blank=True, max_length=100)),
+                ('is_active', models.BooleanField()),
+                ('version', models.PositiveIntegerField()),
+                ('status', models.CharField(
+                    choices=[
+                        ('pending', 'Pending'),
+                        ('sending', 'Sending'),
+                        ('sent', 'Sent'),
+                        ('coalesced', 'Coalesced'),
+                        ('failed', 'Failed'),
+                    ],
+                    db_index=True,
+                    default='pending',
+                    max_length=10,
+                )),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='externalenrollmentoutbox',
+            index=models.Index(fields=['user_email', 'course_id', 'status'], name='oee_outbox_pair_status'),
+        ),
+    ]
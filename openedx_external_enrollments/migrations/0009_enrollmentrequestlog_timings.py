@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-17 20:05
+"""Auto-generated migration file."""
+from __future__ import unicode_literals
+
+import jsonfield.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Auto-generated migration class."""
+
+    dependencies = [
+        ('openedx_external_enrollments', '0008_externalenrollmentoutbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enrollmentrequestlog',
+            name='timings',
+            field=jsonfield.fields.JSONField(
+                blank=True,
+                help_text='Duration of every step of the enrollment in milliseconds.',
+                null=True,
+            ),
+        ),
+    ]
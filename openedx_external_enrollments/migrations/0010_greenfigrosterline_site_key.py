@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-17 21:40
+"""Auto-generated migration file."""
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Auto-generated migration class."""
+
+    dependencies = [
+        ('openedx_external_enrollments', '0009_enrollmentrequestlog_timings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='greenfigrosterline',
+            name='site_key',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -1,6 +1,9 @@
 """
 Model module
 """
+import hashlib
+import uuid
+
 from django.db import models
 from jsonfield.fields import JSONField
 
@@ -26,15 +29,223 @@ class ProgramSalesforceEnrollment(models.Model):
 class EnrollmentRequestLog(models.Model):
     """
     Model to persist enrollment requests
+
+    The request_type is the controller that sent the request, the remaining columns are
+    extracted from the request so the logs can be filtered without reading details.
     """
 
     request_type = models.CharField(max_length=10)
     details = JSONField(null=False, blank=True)
+    user_email_hash = models.CharField(max_length=64, blank=True, db_index=True)
+    course_id = models.CharField(max_length=255, blank=True, db_index=True)
+    http_status = models.PositiveSmallIntegerField(null=True, blank=True, db_index=True)
+    success = models.NullBooleanField(db_index=True)
+    duration = models.FloatField(null=True, blank=True, help_text='Duration of the request in milliseconds.')
+    timings = JSONField(null=True, blank=True, help_text='Duration of every step of the enrollment in milliseconds.')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta(object):
+        """
+        Model meta class.
+        """
+        app_label = "openedx_external_enrollments"
+        indexes = [
+            models.Index(fields=['request_type', 'created_at'], name='oee_request_log_type_created'),
+        ]
+
+    @staticmethod
+    def hash_email(email):
+        """
+        Return the value stored in user_email_hash for the email.
+        """
+        if not email:
+            return ''
+
+        return hashlib.sha256(email.strip().lower().encode('utf-8')).hexdigest()
+
+
+class GreenfigRosterLine(models.Model):
+    """
+    Model to persist the Greenfig roster lines waiting to be flushed to Dropbox.
+
+    The lines are flushed per site, with its dropbox settings, and file path.
+    """
+
+    site_key = models.CharField(max_length=64, blank=True, default='')
+    file_path = models.CharField(max_length=255, db_index=True)
+    line = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta(object):
+        """
+        Model meta class.
+        """
+        app_label = "openedx_external_enrollments"
+
+
+class ExternalEnrollmentJob(models.Model):
+    """
+    Model to persist the external enrollments executed asynchronously by the API.
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    )
+
+    job_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    controller = models.CharField(max_length=50)
+    course_id = models.CharField(max_length=255)
+    data = JSONField(null=False, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    response = JSONField(null=True, blank=True)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta(object):
+        """
+        Model meta class.
+        """
+        app_label = "openedx_external_enrollments"
+
+    def __unicode__(self):
+        return str(self.job_id)
+
+    def to_dict(self):
+        """
+        Return the job representation exposed by the API.
+        """
+        return {
+            'job_id': str(self.job_id),
+            'controller': self.controller,
+            'course_id': self.course_id,
+            'status': self.status,
+            'response': self.response,
+            'response_status': self.response_status,
+            'created_at': self.created_at.isoformat() if self.created_at else None,  # pylint: disable=no-member
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,  # pylint: disable=no-member
+        }
+
+
+class EnrollmentDeadLetter(models.Model):
+    """
+    Model to persist the enrollments that kept failing after all their retries.
+    """
+
+    request_type = models.CharField(max_length=10, db_index=True)
+    data = JSONField(null=False, blank=True)
+    reason = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    replayed_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta(object):
+        """
+        Model meta class.
+        """
+        app_label = "openedx_external_enrollments"
+
+
+class ExternalCourse(models.Model):
+    """
+    Model to persist the index of the courses with an external_platform_target.
+
+    The index is rebuilt when a course is published, so the signal receivers can skip the
+    internal courses without loading them from the modulestore.
+    """
+
+    course_id = models.CharField(max_length=255, unique=True)
+    external_platform_target = models.CharField(max_length=50)
+    external_course_run_id = models.CharField(max_length=255, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta(object):
+        """
+        Model meta class.
+        """
+        app_label = "openedx_external_enrollments"
+
+    def __unicode__(self):
+        return self.course_id
+
+
+class ExternalEnrollmentOutbox(models.Model):
+    """
+    Model to persist the enrollment changes waiting to be relayed to the external platforms.
+
+    The rows are written in the same transaction as the CourseEnrollment change, the
+    idempotency_key identifies the change so it's enqueued and delivered once. The version
+    numbers the changes of every user and course, the changes the provider couldn't process
+    are attempted again at next_attempt_at.
+    """
+
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    COALESCED = 'coalesced'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (SENDING, 'Sending'),
+        (SENT, 'Sent'),
+        (COALESCED, 'Coalesced'),
+        (FAILED, 'Failed'),
+    )
+
+    idempotency_key = models.CharField(max_length=64, unique=True)
+    user_email = models.CharField(max_length=254)
+    course_id = models.CharField(max_length=255)
+    course_mode = models.CharField(max_length=100, blank=True)
+    is_active = models.BooleanField()
+    version = models.PositiveIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
 
     class Meta(object):
         """
         Model meta class.
         """
         app_label = "openedx_external_enrollments"
+        unique_together = ('user_email', 'course_id', 'version')
+        indexes = [
+            models.Index(fields=['user_email', 'course_id', 'status'], name='oee_outbox_pair_status'),
+        ]
+
+    def __unicode__(self):
+        return self.idempotency_key
+
+    @staticmethod
+    def build_idempotency_key(user_email, course_id, is_active, course_mode, version):
+        """
+        Return the deterministic idempotency key of an enrollment change.
+        """
+        return hashlib.sha256(u'|'.join([
+            user_email or '',
+            str(course_id),
+            str(bool(is_active)),
+            course_mode or '',
+            str(version),
+        ]).encode('utf-8')).hexdigest()
+
+    def get_data(self):
+        """
+        Return the enrollment data expected by the enrollment controllers.
+        """
+        return {
+            'user_email': self.user_email,
+            'course_mode': self.course_mode,
+            'is_active': self.is_active,
+            'idempotency_key': self.idempotency_key,
+        }
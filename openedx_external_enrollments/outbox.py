@@ -0,0 +1,397 @@
+"""
+Outbox of the enrollment changes waiting to be relayed to the external platforms.
+
+The signal receivers write the changes in the same transaction as the CourseEnrollment change,
+so they survive worker crashes, and a relay task drains them in batches. The pending changes of
+the same user and course are coalesced into their final state, which is only delivered when it
+differs from the last state delivered for them.
+
+The changes the provider couldn't process for a transient reason stay pending and are attempted
+again with backoff, after max_attempts they are marked as failed and can be sent again with
+retry_failed_entries.
+"""
+import logging
+from collections import OrderedDict
+from datetime import timedelta
+
+from celery import current_app
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from opaque_keys.edx.keys import CourseKey
+
+from openedx_external_enrollments.edxapp_wrapper.get_courseware import get_course_by_id
+from openedx_external_enrollments.exceptions import RetryableEnrollmentError
+from openedx_external_enrollments.external_enrollments import get_enrollment_controller
+from openedx_external_enrollments.locks import acquire_lock, release_lock
+from openedx_external_enrollments.models import ExternalEnrollmentOutbox
+from openedx_external_enrollments.retries import get_retry_countdown
+
+LOG = logging.getLogger(__name__)
+
+OUTBOX_RELAY_LOCK_KEY = 'openedx_external_enrollments.outbox.lock'
+OUTBOX_RELAY_SCHEDULED_KEY = 'openedx_external_enrollments.outbox.scheduled'
+OUTBOX_RELAY_TASK = 'openedx_external_enrollments.tasks.relay_external_enrollment_outbox'
+# Times a change is written again with the next version when a concurrent change took its version.
+MAX_VERSION_ATTEMPTS = 3
+DEFAULT_OUTBOX_SETTINGS = {
+    'batch_size': 100,
+    'relay_delay': 5,
+    'relay_lock_timeout': 300,
+    'max_batches': 10,
+    'max_attempts': 5,
+    'retry_backoff': 5,
+    'retry_backoff_max': 600,
+}
+
+
+def add_to_outbox(data, course_key):
+    """
+    Persist the enrollment change and schedule the relay once the transaction is committed.
+
+    The version of the change is unique per user and course, when a concurrent change takes
+    it first the change is written again with the next one.
+
+    Args:
+        data: dict with the user_email, course_mode and is_active values.
+        course_key: key of the enrolled course.
+    Returns:
+        The ExternalEnrollmentOutbox of the change.
+    """
+    course_id = str(course_key)
+
+    for attempt in range(1, MAX_VERSION_ATTEMPTS + 1):
+        try:
+            with transaction.atomic():
+                version = _get_next_version(data['user_email'], course_id)
+                idempotency_key = ExternalEnrollmentOutbox.build_idempotency_key(
+                    data['user_email'],
+                    course_id,
+                    data['is_active'],
+                    data['course_mode'],
+                    version,
+                )
+                outbox_entry = ExternalEnrollmentOutbox.objects.create(  # pylint: disable=no-member
+                    idempotency_key=idempotency_key,
+                    user_email=data['user_email'],
+                    course_id=course_id,
+                    course_mode=data['course_mode'] or '',
+                    is_active=data['is_active'],
+                    version=version,
+                )
+        except IntegrityError:
+            outbox_entry = ExternalEnrollmentOutbox.objects.filter(  # pylint: disable=no-member
+                idempotency_key=idempotency_key,
+            ).first()
+
+            if outbox_entry is not None:
+                LOG.info('Enrollment change %s is already in the outbox.', idempotency_key)
+                break
+
+            if attempt == MAX_VERSION_ATTEMPTS:
+                raise
+
+            LOG.info('Version %s of %s in %s was taken by a concurrent change.', version, data['user_email'], course_id)
+        else:
+            break
+
+    schedule_outbox_relay()
+
+    return outbox_entry
+
+
+def schedule_outbox_relay(countdown=None):
+    """
+    Enqueue a relay of the outbox unless one is already scheduled.
+
+    The relay task clears the scheduled mark before relaying, so the changes added meanwhile
+    schedule the next relay. The mark expires on its own if the task is lost.
+
+    Args:
+        countdown: seconds to wait before the relay, relay_delay by default.
+    """
+    outbox_settings = get_outbox_settings()
+
+    if countdown is None:
+        countdown = outbox_settings['relay_delay']
+
+    if cache.add(OUTBOX_RELAY_SCHEDULED_KEY, True, countdown + outbox_settings['relay_lock_timeout']):
+        transaction.on_commit(lambda: current_app.send_task(OUTBOX_RELAY_TASK, countdown=countdown))
+
+
+def clear_scheduled_relay():
+    """
+    Remove the scheduled mark of the relay, so a new relay can be scheduled.
+    """
+    cache.delete(OUTBOX_RELAY_SCHEDULED_KEY)
+
+
+def relay_outbox():
+    """
+    Deliver the pending enrollment changes that are due in batches.
+
+    At most max_batches batches are relayed per run, so the run ends well before the lock
+    expires, the changes left are relayed by the next run.
+
+    Returns:
+        Number of delivered changes.
+    """
+    outbox_settings = get_outbox_settings()
+    lock_token = acquire_lock(OUTBOX_RELAY_LOCK_KEY, outbox_settings['relay_lock_timeout'])
+
+    if lock_token is None:
+        LOG.info('The external enrollment outbox is already being relayed.')
+        return 0
+
+    try:
+        _release_stale_claims(outbox_settings['relay_lock_timeout'])
+        delivered = 0
+
+        for _ in range(outbox_settings['max_batches']):
+            pending_entries = list(
+                _get_due_entries().order_by('id')[:outbox_settings['batch_size']]
+            )
+
+            if not pending_entries:
+                return delivered
+
+            delivered += _relay_entries(pending_entries, outbox_settings)
+
+        if _get_due_entries().exists():
+            schedule_outbox_relay(countdown=0)
+
+        return delivered
+    finally:
+        release_lock(OUTBOX_RELAY_LOCK_KEY, lock_token)
+
+
+def get_next_relay_countdown():
+    """
+    Return the seconds until the next pending enrollment change is due, or None when there are none.
+    """
+    next_entry = ExternalEnrollmentOutbox.objects.filter(  # pylint: disable=no-member
+        status=ExternalEnrollmentOutbox.PENDING,
+    ).order_by(F('next_attempt_at').asc(nulls_first=True)).values_list('next_attempt_at', flat=True)[:1]
+
+    if not next_entry:
+        return None
+
+    if next_entry[0] is None:
+        return get_outbox_settings()['relay_delay']
+
+    return max(int((next_entry[0] - timezone.now()).total_seconds()), 0) + 1
+
+
+def retry_failed_entries(ids=None):
+    """
+    Return to pending the failed enrollment changes, or the failed ones of ids, and schedule a relay.
+
+    Returns:
+        Number of changes to be sent again.
+    """
+    failed_entries = ExternalEnrollmentOutbox.objects.filter(  # pylint: disable=no-member
+        status=ExternalEnrollmentOutbox.FAILED,
+    )
+
+    if ids is not None:
+        failed_entries = failed_entries.filter(id__in=ids)
+
+    retried = failed_entries.update(
+        status=ExternalEnrollmentOutbox.PENDING,
+        attempts=0,
+        next_attempt_at=None,
+        updated_at=timezone.now(),
+    )
+
+    if retried:
+        schedule_outbox_relay()
+
+    return retried
+
+
+def get_outbox_settings():
+    """
+    Return the outbox settings merged over the default ones.
+    """
+    outbox_settings = dict(DEFAULT_OUTBOX_SETTINGS)
+    outbox_settings.update(settings.OEE_OUTBOX_SETTINGS)
+
+    return outbox_settings
+
+
+def _get_next_version(user_email, course_id):
+    """
+    Return the next version of the changes of the user and course.
+
+    The last version is read with a locking read, so it sees the changes committed after the
+    transaction started.
+    """
+    last_version = ExternalEnrollmentOutbox.objects.select_for_update().filter(  # pylint: disable=no-member
+        user_email=user_email,
+        course_id=course_id,
+    ).order_by('-version').values_list('version', flat=True).first()
+
+    return (last_version or 0) + 1
+
+
+def _get_due_entries():
+    """
+    Return the pending entries that can be attempted now.
+    """
+    return ExternalEnrollmentOutbox.objects.filter(  # pylint: disable=no-member
+        Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=timezone.now()),
+        status=ExternalEnrollmentOutbox.PENDING,
+    )
+
+
+def _relay_entries(pending_entries, outbox_settings):
+    """
+    Coalesce the pending entries of every user and course of the batch into their final state and deliver it.
+    """
+    delivered = 0
+    pairs = OrderedDict.fromkeys((entry.user_email, entry.course_id) for entry in pending_entries)
+
+    for user_email, course_id in pairs:
+        entries = list(
+            ExternalEnrollmentOutbox.objects.filter(  # pylint: disable=no-member
+                user_email=user_email,
+                course_id=course_id,
+                status=ExternalEnrollmentOutbox.PENDING,
+            ).order_by('id')
+        )
+
+        if not entries:
+            continue
+
+        final_entry = entries[-1]
+        superseded_ids = [entry.id for entry in entries[:-1]]
+
+        if superseded_ids:
+            ExternalEnrollmentOutbox.objects.filter(  # pylint: disable=no-member
+                id__in=superseded_ids,
+                status=ExternalEnrollmentOutbox.PENDING,
+            ).update(status=ExternalEnrollmentOutbox.COALESCED, updated_at=timezone.now())
+
+        last_sent = ExternalEnrollmentOutbox.objects.filter(  # pylint: disable=no-member
+            user_email=user_email,
+            course_id=course_id,
+            status=ExternalEnrollmentOutbox.SENT,
+        ).order_by('-id').first()
+
+        # A retried change older than the last delivered one is stale as well.
+        if last_sent and (last_sent.id > final_entry.id or _has_same_state(last_sent, final_entry)):
+            _set_status(final_entry, ExternalEnrollmentOutbox.PENDING, ExternalEnrollmentOutbox.COALESCED)
+            continue
+
+        if not _set_status(final_entry, ExternalEnrollmentOutbox.PENDING, ExternalEnrollmentOutbox.SENDING):
+            continue
+
+        try:
+            accepted = _send_entry(final_entry)
+        except RetryableEnrollmentError as error:
+            _defer_entry(final_entry, outbox_settings, error.retry_after)
+            continue
+        except Exception as error:  # pylint: disable=broad-except
+            LOG.error('Failed to relay enrollment change %s. Reason: %s', final_entry.idempotency_key, str(error))
+            accepted = False
+
+        if not accepted:
+            _set_status(final_entry, ExternalEnrollmentOutbox.SENDING, ExternalEnrollmentOutbox.FAILED)
+            continue
+
+        _set_status(
+            final_entry,
+            ExternalEnrollmentOutbox.SENDING,
+            ExternalEnrollmentOutbox.SENT,
+            sent_at=timezone.now(),
+        )
+        delivered += 1
+
+    return delivered
+
+
+def _has_same_state(outbox_entry, other_entry):
+    """
+    Return whether both entries enroll the user in the same state.
+    """
+    return (
+        outbox_entry.is_active == other_entry.is_active
+        and outbox_entry.course_mode == other_entry.course_mode
+    )
+
+
+def _send_entry(outbox_entry):
+    """
+    Send the enrollment change to the controller of its course.
+
+    Returns:
+        Whether the provider accepted the change.
+    Raises:
+        RetryableEnrollmentError: the change wasn't processed for a transient reason, e.g. the
+            controller is throttled, its circuit is open or the provider answered with a 5xx.
+    """
+    course = get_course_by_id(CourseKey.from_string(outbox_entry.course_id))
+    enrollment_controller = get_enrollment_controller(course)
+
+    if enrollment_controller is None:
+        return False
+
+    _, request_status = enrollment_controller._post_enrollment(  # pylint: disable=protected-access
+        outbox_entry.get_data(),
+        course.other_course_settings,
+        raise_on_retryable=True,
+    )
+
+    return bool(request_status and request_status < 400)
+
+
+def _defer_entry(outbox_entry, outbox_settings, retry_after=None):
+    """
+    Return the entry to pending to be attempted again with backoff, or mark it as failed after max_attempts.
+    """
+    attempts = outbox_entry.attempts + 1
+
+    if attempts >= outbox_settings['max_attempts']:
+        LOG.error('Enrollment change %s failed after %s attempts.', outbox_entry.idempotency_key, attempts)
+        _set_status(outbox_entry, ExternalEnrollmentOutbox.SENDING, ExternalEnrollmentOutbox.FAILED, attempts=attempts)
+        return
+
+    countdown = get_retry_countdown(
+        attempts - 1,
+        outbox_settings['retry_backoff'],
+        outbox_settings['retry_backoff_max'],
+        retry_after,
+    )
+    LOG.info('Enrollment change %s deferred for %s seconds.', outbox_entry.idempotency_key, countdown)
+    _set_status(
+        outbox_entry,
+        ExternalEnrollmentOutbox.SENDING,
+        ExternalEnrollmentOutbox.PENDING,
+        attempts=attempts,
+        next_attempt_at=timezone.now() + timedelta(seconds=countdown),
+    )
+
+
+def _set_status(outbox_entry, current_status, new_status, **fields):
+    """
+    Move the entry from current_status to new_status, return False if another worker moved it first.
+    """
+    return bool(ExternalEnrollmentOutbox.objects.filter(  # pylint: disable=no-member
+        id=outbox_entry.id,
+        status=current_status,
+    ).update(status=new_status, updated_at=timezone.now(), **fields))
+
+
+def _release_stale_claims(lock_timeout):
+    """
+    Return to pending the entries claimed by a relay that didn't finish them, e.g. after a crash.
+    """
+    released = ExternalEnrollmentOutbox.objects.filter(  # pylint: disable=no-member
+        status=ExternalEnrollmentOutbox.SENDING,
+        updated_at__lt=timezone.now() - timedelta(seconds=lock_timeout),
+    ).update(status=ExternalEnrollmentOutbox.PENDING, updated_at=timezone.now())
+
+    if released:
+        LOG.warning('%s external enrollment outbox entries were released after an interrupted relay.', released)
@@ -0,0 +1,95 @@
+"""
+Cache of the ProgramSalesforceEnrollment metadata by bundle_id.
+
+The metadata is read through the Django cache for OEE_PROGRAM_METADATA_CACHE_TIMEOUT seconds and
+every caller gets its own copy, so it can be changed without touching the cached value. The keys
+are tagged with a version stored in the Django cache, saving or deleting a ProgramSalesforceEnrollment
+changes it, so every cached metadata is dropped, also the one of a renamed bundle_id.
+"""
+from copy import deepcopy
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+
+from openedx_external_enrollments.models import ProgramSalesforceEnrollment
+
+PROGRAM_METADATA_VERSION_CACHE_KEY = 'openedx_external_enrollments.program_metadata_version'
+PROGRAM_METADATA_CACHE_KEY = 'openedx_external_enrollments.program_metadata.{version}.{bundle_id}'
+
+
+def get_program_metadata(bundle_id):
+    """
+    Return a copy of the meta of the program.
+
+    Raises:
+        ProgramSalesforceEnrollment.DoesNotExist: there's no program with the bundle_id.
+    """
+    timeout = settings.OEE_PROGRAM_METADATA_CACHE_TIMEOUT
+
+    if not timeout:
+        return _get_program(bundle_id).meta
+
+    key = PROGRAM_METADATA_CACHE_KEY.format(version=_get_version(), bundle_id=bundle_id)
+    meta = cache.get(key)
+
+    if meta is None:
+        meta = _get_program(bundle_id).meta
+        cache.set(key, meta, timeout)
+
+    return deepcopy(meta)
+
+
+def preload_program_metadata(bundle_ids=None):
+    """
+    Cache the meta of the programs with the given bundle_ids, or of every program, e.g. before a sale.
+
+    Returns:
+        Number of cached programs.
+    """
+    timeout = settings.OEE_PROGRAM_METADATA_CACHE_TIMEOUT
+
+    if not timeout:
+        return 0
+
+    programs = ProgramSalesforceEnrollment.objects.all()  # pylint: disable=no-member
+
+    if bundle_ids is not None:
+        programs = programs.filter(bundle_id__in=bundle_ids)
+
+    version = _get_version()
+    cache.set_many({
+        PROGRAM_METADATA_CACHE_KEY.format(version=version, bundle_id=program.bundle_id): program.meta
+        for program in programs
+    }, timeout)
+
+    return len(programs)
+
+
+def invalidate_program_metadata():
+    """
+    Change the version of the cache, so the meta of every program is read again.
+    """
+    cache.set(PROGRAM_METADATA_VERSION_CACHE_KEY, uuid4().hex, None)
+
+
+def _get_program(bundle_id):
+    """
+    Return the ProgramSalesforceEnrollment of the bundle_id.
+    """
+    return ProgramSalesforceEnrollment.objects.get(bundle_id=bundle_id)  # pylint: disable=no-member
+
+
+def _get_version():
+    """
+    Return the current version of the cache.
+    """
+    version = cache.get(PROGRAM_METADATA_VERSION_CACHE_KEY)
+
+    if version is None:
+        version = uuid4().hex
+
+        if not cache.add(PROGRAM_METADATA_VERSION_CACHE_KEY, version, None):
+            version = cache.get(PROGRAM_METADATA_VERSION_CACHE_KEY, version)
+
+    return version
@@ -0,0 +1,59 @@
+"""
+Recording of the calls made through the edxapp wrappers, i.e. the modulestore reads and the
+student lookups, which run their own queries in the platform.
+
+record_edxapp_call is a no-op unless a recording is active, the query budget tests and the
+benchmarks open one with record_edxapp_calls to compare the calls with their budgets.
+"""
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+_DATA = threading.local()
+_ACTIVE = {'recordings': 0}
+_ACTIVE_LOCK = threading.Lock()
+
+
+@contextmanager
+def record_edxapp_calls():
+    """
+    Count the edxapp calls of the wrapped block made in the current thread.
+
+    Yields:
+        Counter of the calls by name.
+    """
+    calls = Counter()
+    recordings = _get_recordings()
+    recordings.append(calls)
+
+    with _ACTIVE_LOCK:
+        _ACTIVE['recordings'] += 1
+
+    try:
+        yield calls
+    finally:
+        with _ACTIVE_LOCK:
+            _ACTIVE['recordings'] -= 1
+
+        recordings.remove(calls)
+
+
+def record_edxapp_call(name):
+    """
+    Count the edxapp call in every active recording.
+    """
+    if not _ACTIVE['recordings']:
+        return
+
+    for calls in _get_recordings():
+        calls[name] += 1
+
+
+def _get_recordings():
+    """
+    Return the active recordings of the current thread.
+    """
+    if not hasattr(_DATA, 'recordings'):
+        _DATA.recordings = []
+
+    return _DATA.recordings
@@ -0,0 +1,194 @@
+"""
+Rate limits for the enrollment requests sent to every external platform.
+
+Every provider has a token bucket that refills rate tokens per second up to burst tokens, and
+a cap of max_in_flight concurrent requests. Both are shared by all the workers through the
+Django cache. The bucket is updated under a short lock. Every in-flight request holds one of the
+max_in_flight slot keys, each with its own timeout, so the slot of a worker that dies mid-request
+is freed after in_flight_timeout seconds without affecting the other slots. A rate or
+max_in_flight of None disables that limit.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from openedx_external_enrollments.locks import acquire_lock, release_lock
+
+LOG = logging.getLogger(__name__)
+
+RATE_LIMIT_CACHE_KEY = 'openedx_external_enrollments.rate_limit.{provider}.{name}'
+LOCK_TIMEOUT = 1
+LOCK_WAIT_INTERVAL = 0.005
+LOCK_MAX_WAIT = 0.05
+
+DEFAULT_RATE_LIMIT_SETTINGS = {
+    'rate': None,
+    'burst': 10,
+    'max_in_flight': None,
+    'in_flight_timeout': 60,
+    'in_flight_retry_after': 1,
+}
+
+
+class RateLimiter(object):
+    """
+    Rate limiter of a provider, e.g. RateLimiter(str(controller)).
+    """
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.settings = get_rate_limit_settings(provider)
+        self._slots = []
+
+    def acquire(self):
+        """
+        Take a token and an in-flight slot.
+
+        Returns:
+            0 when the request can be sent, otherwise the seconds to wait before trying again. The
+            slot must be freed with release() once the request finishes.
+        """
+        if not self._acquire_slot():
+            return self.settings['in_flight_retry_after']
+
+        wait = self._take_token()
+
+        if wait:
+            self.release()
+
+        return wait
+
+    def release(self):
+        """
+        Free the in-flight slot taken by acquire().
+
+        The slot is only freed while it's still held by this rate limiter, after in_flight_timeout
+        it may have been taken by another request.
+        """
+        if self._slots:
+            release_lock(*self._slots.pop())
+
+    def get_stats(self):
+        """
+        Return the tokens left and the requests in flight.
+        """
+        bucket = cache.get(self._get_key('bucket'))
+
+        return {
+            'provider': self.provider,
+            'rate': self.settings['rate'],
+            'burst': self.settings['burst'],
+            'tokens': self._refill(bucket, time.time()),
+            'max_in_flight': self.settings['max_in_flight'],
+            'in_flight': len(cache.get_many(self._get_slot_keys())),
+        }
+
+    def _acquire_slot(self):
+        """
+        Take a free in-flight slot, False when the max_in_flight slots are taken.
+        """
+        if not self.settings['max_in_flight']:
+            return True
+
+        for slot_key in self._get_slot_keys():
+            slot_token = acquire_lock(slot_key, self.settings['in_flight_timeout'])
+
+            if slot_token is not None:
+                self._slots.append((slot_key, slot_token))
+                return True
+
+        return False
+
+    def _take_token(self):
+        """
+        Take a token from the bucket and return 0, or the seconds until a token is available.
+        """
+        if not self.settings['rate']:
+            return 0
+
+        rate = float(self.settings['rate'])
+
+        lock_key = self._get_key('lock')
+        lock_token = self._lock(lock_key)
+
+        if lock_token is None:
+            # Other workers are updating the bucket, so it's being drained quickly.
+            return 1.0 / rate
+
+        try:
+            now = time.time()
+            bucket_key = self._get_key('bucket')
+            tokens = self._refill(cache.get(bucket_key), now)
+            wait = 0
+
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+
+            cache.set(bucket_key, {'tokens': tokens, 'updated_at': now}, int(self.settings['burst'] / rate) + 60)
+        finally:
+            release_lock(lock_key, lock_token)
+
+        if wait:
+            LOG.info('Enrollment requests to %s throttled for %.2f seconds.', self.provider, wait)
+
+        return wait
+
+    def _refill(self, bucket, now):
+        """
+        Return the tokens of the bucket after refilling it up to now.
+        """
+        if not bucket:
+            return self.settings['burst']
+
+        return min(
+            self.settings['burst'],
+            bucket['tokens'] + (now - bucket['updated_at']) * self.settings['rate'],
+        )
+
+    @staticmethod
+    def _lock(lock_key):
+        """
+        Take the bucket lock, waiting at most LOCK_MAX_WAIT seconds.
+
+        Returns:
+            The token of the lock, or None when it couldn't be taken.
+        """
+        deadline = time.time() + LOCK_MAX_WAIT
+        lock_token = acquire_lock(lock_key, LOCK_TIMEOUT)
+
+        while lock_token is None:
+            if time.time() >= deadline:
+                return None
+
+            time.sleep(LOCK_WAIT_INTERVAL)
+            lock_token = acquire_lock(lock_key, LOCK_TIMEOUT)
+
+        return lock_token
+
+    def _get_slot_keys(self):
+        """
+        Return the cache keys of the in-flight slots.
+        """
+        return [self._get_key('in_flight.{}'.format(slot)) for slot in range(self.settings['max_in_flight'] or 0)]
+
+    def _get_key(self, name):
+        """
+        Return the cache key of a value of the rate limiter.
+        """
+        return RATE_LIMIT_CACHE_KEY.format(provider=self.provider, name=name)
+
+
+def get_rate_limit_settings(provider):
+    """
+    Return the rate limit settings of the provider merged over the default ones.
+    """
+    configured_settings = settings.OEE_RATE_LIMIT_SETTINGS
+    rate_limit_settings = dict(DEFAULT_RATE_LIMIT_SETTINGS)
+    rate_limit_settings.update(configured_settings.get('default', {}))
+    rate_limit_settings.update(configured_settings.get(provider, {}))
+
+    return rate_limit_settings
@@ -0,0 +1,88 @@
+"""
+Cache scoped to the current unit of work, a web request or a celery task.
+
+Values are kept in a thread local that is reset when the request or the task starts
+and ends. Outside of a unit of work nothing is cached, unless the caller opens one with
+request_cache_scope, e.g. in a management command.
+"""
+import threading
+from contextlib import contextmanager
+
+from celery.signals import task_postrun, task_prerun
+from django.core.signals import request_finished, request_started
+
+_DATA = threading.local()
+
+
+def get_request_cache(namespace):
+    """
+    Return the dict of the namespace for the current unit of work or None when there is no active one.
+    """
+    scopes = _get_scopes()
+
+    if not scopes:
+        return None
+
+    return scopes[-1].setdefault(namespace, {})
+
+
+def start_request(**kwargs):  # pylint: disable=unused-argument
+    """
+    Start the cache of a new request, discarding anything left by a previous one.
+    """
+    _DATA.scopes = [{}]
+
+
+def end_request(**kwargs):  # pylint: disable=unused-argument
+    """
+    Drop the cache of the finished request.
+    """
+    _DATA.scopes = []
+
+
+def start_task(**kwargs):  # pylint: disable=unused-argument
+    """
+    Open a nested cache for a task, eager tasks must not clear the cache of the request running them.
+    """
+    _get_scopes().append({})
+
+
+def end_task(**kwargs):  # pylint: disable=unused-argument
+    """
+    Close the cache of the finished task.
+    """
+    scopes = _get_scopes()
+
+    if scopes:
+        scopes.pop()
+
+
+@contextmanager
+def request_cache_scope():
+    """
+    Context manager that opens a unit of work outside of a request or a task.
+    """
+    start_task()
+
+    try:
+        yield
+    finally:
+        end_task()
+
+
+def _get_scopes():
+    """
+    Return the stack of open scopes of the current thread.
+    """
+    scopes = getattr(_DATA, 'scopes', None)
+
+    if scopes is None:
+        scopes = _DATA.scopes = []
+
+    return scopes
+
+
+request_started.connect(start_request, dispatch_uid='oee_request_cache_start_request')
+request_finished.connect(end_request, dispatch_uid='oee_request_cache_end_request')
+task_prerun.connect(start_task, dispatch_uid='oee_request_cache_start_task')
+task_postrun.connect(end_task, dispatch_uid='oee_request_cache_end_task')
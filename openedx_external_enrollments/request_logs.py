@@ -0,0 +1,187 @@
+"""
+Sinks that persist the EnrollmentRequestLog records of the enrollment controllers.
+
+The sync sink inserts every record right away. The buffered sink accumulates the records
+of the process and writes them with bulk_create when the buffer_size of OEE_REQUEST_LOG_SETTINGS
+is reached, when the oldest one is older than its flush_interval in seconds, or when the
+current request or celery task ends. Buffered records not flushed yet are lost if
+the process dies.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from celery.signals import task_postrun
+from django.conf import settings
+from django.core.signals import request_finished, setting_changed
+from django.dispatch import receiver
+
+from openedx_external_enrollments.models import EnrollmentRequestLog
+
+LOG = logging.getLogger(__name__)
+
+SYNC_MODE = 'sync'
+BUFFERED_MODE = 'buffered'
+DEFAULT_REQUEST_LOG_SETTINGS = {
+    'mode': SYNC_MODE,
+    'buffer_size': 100,
+    'flush_interval': 5,
+    'retention_days': 90,
+}
+
+_SINKS = {}
+
+
+class SyncRequestLogSink(object):
+    """
+    Sink that inserts every record in its own query.
+    """
+
+    def write(self, request_type, details, **fields):
+        """
+        Persist the record.
+        """
+        EnrollmentRequestLog.objects.create(  # pylint: disable=no-member
+            request_type=request_type,
+            details=details,
+            **fields
+        )
+
+    def flush(self):
+        """
+        Nothing is kept in memory.
+        """
+        return 0
+
+
+class BufferedRequestLogSink(object):
+    """
+    Sink that keeps the records in memory and inserts them in batches.
+    """
+
+    def __init__(self, buffer_size, flush_interval):
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._records = []
+        self._oldest_record_time = None
+        self._lock = threading.Lock()
+
+    def write(self, request_type, details, **fields):
+        """
+        Buffer the record and flush the buffer when a threshold is reached.
+        """
+        with self._lock:
+            if not self._records:
+                self._oldest_record_time = time.time()
+
+            self._records.append(EnrollmentRequestLog(request_type=request_type, details=details, **fields))
+            should_flush = (
+                len(self._records) >= self.buffer_size
+                or time.time() - self._oldest_record_time >= self.flush_interval
+            )
+
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        """
+        Insert the pending records in a single query.
+
+        Returns:
+            Number of written records.
+        """
+        with self._lock:
+            records, self._records = self._records, []
+
+        if not records:
+            return 0
+
+        try:
+            EnrollmentRequestLog.objects.bulk_create(records)  # pylint: disable=no-member
+        except Exception as error:  # pylint: disable=broad-except
+            LOG.error('Failed to write %s enrollment request logs. Reason: %s', len(records), str(error))
+            return 0
+
+        return len(records)
+
+
+def get_request_log_sink():
+    """
+    Return the sink of the configured request log mode.
+    """
+    request_log_settings = get_request_log_settings()
+    mode = request_log_settings['mode']
+    sink = _SINKS.get(mode)
+
+    if sink is None:
+        if mode == BUFFERED_MODE:
+            sink = BufferedRequestLogSink(
+                buffer_size=request_log_settings['buffer_size'],
+                flush_interval=request_log_settings['flush_interval'],
+            )
+        else:
+            sink = SyncRequestLogSink()
+
+        sink = _SINKS.setdefault(mode, sink)
+
+    return sink
+
+
+def get_request_log_settings():
+    """
+    Return the request log settings merged over the default ones.
+    """
+    request_log_settings = dict(DEFAULT_REQUEST_LOG_SETTINGS)
+    request_log_settings.update(settings.OEE_REQUEST_LOG_SETTINGS)
+
+    return request_log_settings
+
+
+def log_enrollment_request(request_type, details, user_email=None, course_id=None, http_status=None,
+                           success=None, duration=None, timings=None):
+    """
+    Persist an enrollment request record through the configured sink.
+
+    Args:
+        request_type: controller that sent the request.
+        details: dict with the request and the response.
+        user_email: email of the learner, only its hash is stored.
+        course_id: id of the enrolled course.
+        http_status: status code of the provider response.
+        success: whether the provider accepted the request.
+        duration: duration of the request in milliseconds.
+        timings: dict with the duration of every step of the enrollment in milliseconds.
+    """
+    get_request_log_sink().write(
+        request_type,
+        details,
+        user_email_hash=EnrollmentRequestLog.hash_email(user_email),
+        course_id=(course_id or '')[:255],
+        http_status=http_status,
+        success=success,
+        duration=duration,
+        timings=timings,
+    )
+
+
+def flush_request_logs(**kwargs):  # pylint: disable=unused-argument
+    """
+    Write the records pending in every sink.
+    """
+    return sum(sink.flush() for sink in list(_SINKS.values()))
+
+
+@receiver(setting_changed)
+def reset_request_log_sinks(setting=None, **kwargs):  # pylint: disable=unused-argument
+    """
+    Flush and drop the sinks when their settings change, e.g. with override_settings.
+    """
+    if setting == 'OEE_REQUEST_LOG_SETTINGS':
+        flush_request_logs()
+        _SINKS.clear()
+
+
+request_finished.connect(flush_request_logs, dispatch_uid='oee_flush_request_logs_request_finished')
+task_postrun.connect(flush_request_logs, dispatch_uid='oee_flush_request_logs_task_postrun')
+atexit.register(flush_request_logs)
@@ -0,0 +1,90 @@
+"""
+Decoding of the provider responses.
+
+The body is read once, at most OEE_RESPONSE_MAX_SIZE bytes of it, and the response is
+classified so the controllers can log it and return the real upstream status.
+"""
+import json
+from collections import namedtuple
+
+from django.conf import settings
+from rest_framework import status
+
+SUCCESS = 'success'
+CLIENT_ERROR = 'client_error'
+SERVER_ERROR = 'server_error'
+NON_JSON = 'non_json'
+
+READ_CHUNK_SIZE = 8192
+
+DecodedResponse = namedtuple('DecodedResponse', ['status_code', 'body', 'classification', 'truncated'])
+
+
+def decode_response(response, max_size=None):
+    """
+    Read and decode the body of the response.
+
+    Args:
+        response: requests response, ideally sent with stream=True so the body isn't loaded at once.
+        max_size: maximum number of bytes read from the body, defaults to OEE_RESPONSE_MAX_SIZE.
+    Returns:
+        DecodedResponse with the parsed JSON body, or the truncated text when the body isn't JSON.
+    """
+    max_size = settings.OEE_RESPONSE_MAX_SIZE if max_size is None else max_size
+    content, truncated = _read_content(response, max_size)
+    text = content.decode(response.encoding or 'utf-8', 'replace')
+    body = text
+    is_json = False
+
+    if not truncated and text:
+        try:
+            body = json.loads(text)
+            is_json = True
+        except ValueError:
+            pass
+
+    return DecodedResponse(
+        status_code=response.status_code,
+        body=body,
+        classification=classify_response(response.status_code, is_json),
+        truncated=truncated,
+    )
+
+
+def classify_response(status_code, is_json=True):
+    """
+    Return the classification of a response, error statuses take precedence over the body format.
+    """
+    if status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR:
+        return SERVER_ERROR
+
+    if status_code >= status.HTTP_400_BAD_REQUEST:
+        return CLIENT_ERROR
+
+    if not is_json:
+        return NON_JSON
+
+    return SUCCESS
+
+
+def _read_content(response, max_size):
+    """
+    Return at most max_size bytes of the body and whether it was truncated.
+    """
+    chunks = []
+    size = 0
+    truncated = False
+
+    try:
+        for chunk in response.iter_content(chunk_size=READ_CHUNK_SIZE):
+            if size + len(chunk) > max_size:
+                chunks.append(chunk[:max_size - size])
+                truncated = True
+                break
+
+            chunks.append(chunk)
+            size += len(chunk)
+    finally:
+        response.close()
+
+    return b''.join(chunks), truncated
@@ -0,0 +1,57 @@
+"""
+Helpers to retry the enrollments that failed for a transient reason.
+"""
+import random
+from email.utils import mktime_tz, parsedate_tz
+from time import time
+
+from rest_framework import status
+
+RETRYABLE_STATUS_CODES = frozenset([status.HTTP_429_TOO_MANY_REQUESTS])
+
+
+def is_retryable_status(status_code):
+    """
+    True when the provider answered with a rate limit or a server error.
+    """
+    return status_code in RETRYABLE_STATUS_CODES or status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR
+
+
+def parse_retry_after(value):
+    """
+    Return the seconds to wait from a Retry-After header, given as seconds or as an HTTP date.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0, int(value))
+    except ValueError:
+        parsed_date = parsedate_tz(value)
+
+    if not parsed_date:
+        return None
+
+    return max(0, int(mktime_tz(parsed_date) - time()))
+
+
+def get_retry_countdown(retries, backoff, backoff_max, retry_after=None):
+    """
+    Return the seconds to wait before the next attempt.
+
+    The Retry-After value of the provider is honored, capped by backoff_max. Otherwise the delay is a
+    random value between the half and the whole exponential backoff, so a burst of failures isn't
+    retried at once.
+
+    Args:
+        retries: number of retries already executed.
+        backoff: delay of the first retry in seconds.
+        backoff_max: maximum delay in seconds.
+        retry_after: seconds requested by the provider.
+    """
+    if retry_after is not None:
+        return min(retry_after, backoff_max)
+
+    delay = min(backoff_max, backoff * 2 ** retries)
+
+    return delay / 2.0 + random.uniform(0, delay / 2.0)
@@ -55,14 +55,95 @@ def plugin_settings(settings):
     settings.EDX_ENTERPRISE_API_BASE_URL = "https://api.edx.org/enterprise/v1"
     settings.EDX_ENTERPRISE_API_CUSTOMER_UUID = "customer-id"
     settings.EDX_ENTERPRISE_API_CATALOG_UUID = "catalog-id"
+    settings.EDX_ENTERPRISE_API_BULK_CHUNK_SIZE = 100
     settings.SALESFORCE_API_TOKEN_URL = "salesforce-api-url"
     settings.SALESFORCE_API_CLIENT_ID = "salesforce-client-id"
     settings.SALESFORCE_API_CLIENT_SECRET = "salesforce-client-secret"
     settings.SALESFORCE_API_USERNAME = "salesforce-username"
     settings.SALESFORCE_API_PASSWORD = "salesforce-password"
     settings.SALESFORCE_ENROLLMENT_API_PATH = "services/apexrest/Applications_API"
+    settings.SALESFORCE_ENROLLMENT_RETRY_BACKOFF = 5
+    settings.SALESFORCE_ENROLLMENT_RETRY_BACKOFF_MAX = 600
     settings.DROPBOX_API_ARG_DOWNLOAD = '{"path":"%s"}'
     settings.DROPBOX_API_DOWNLOAD_URL = "/files/download"
     settings.DROPBOX_API_ARG_UPLOAD = '{"path":"%s","mode":{".tag":"overwrite"}}'
     settings.DROPBOX_API_UPLOAD_URL = "/files/upload"
     settings.DROPBOX_DATE_FORMAT = "%m-%d-%Y %H:%M:%S"
+    settings.DROPBOX_API_ARG_UPDATE = '{"path":"%s","mode":{".tag":"update","update":"%s"}}'
+    settings.DROPBOX_API_ARG_ADD = '{"path":"%s","mode":{".tag":"add"}}'
+    settings.GREENFIG_ROSTER_SETTINGS = {
+        "buffered": True,
+        "flush_interval": 60,
+        "flush_lock_timeout": 300,
+        "flush_batch_size": 5000,
+        "flush_max_attempts": 5,
+    }
+    settings.EXTERNAL_ENROLLMENTS_DISPATCH_MODE = "sync"
+    settings.EXTERNAL_ENROLLMENTS_API_DEFAULT_MODE = "sync"
+    settings.EXTERNAL_ENROLLMENTS_BULK_MAX_SIZE = 1000
+    settings.OEE_COURSE_SETTINGS_CACHE_TIMEOUT = 0
+    settings.OEE_ENROLLMENT_DEBOUNCE_WINDOW = 5
+    settings.OEE_EXTERNAL_COURSE_INDEX_SETTINGS = {
+        "enabled": False,
+        "check_interval": 5,
+        "reload_interval": 300,
+    }
+    settings.OEE_OUTBOX_SETTINGS = {
+        "batch_size": 100,
+        "relay_delay": 5,
+        "relay_lock_timeout": 300,
+        "max_batches": 10,
+        "max_attempts": 5,
+        "retry_backoff": 5,
+        "retry_backoff_max": 600,
+    }
+    settings.OEE_PROGRAM_METADATA_CACHE_TIMEOUT = 3600
+    settings.OEE_METRICS_BACKEND = "noop"
+    settings.OEE_METRICS_SETTINGS = {
+        "prefix": "openedx_external_enrollments",
+        "statsd_host": "localhost",
+        "statsd_port": 8125,
+    }
+    settings.OEE_TRACING_ENABLED = False
+    settings.OEE_REQUEST_LOG_SETTINGS = {
+        "mode": "sync",
+        "buffer_size": 100,
+        "flush_interval": 5,
+        "retention_days": 90,
+    }
+    settings.OEE_RESPONSE_MAX_SIZE = 64 * 1024
+    settings.OEE_SITE_VERSION_CHECK_INTERVAL = 5
+    settings.OEE_TOKEN_CACHE_SETTINGS = {
+        "default_timeout": 900,
+        "refresh_margin": 120,
+        "lock_timeout": 10,
+    }
+    settings.OEE_HTTP_SESSION_SETTINGS = {
+        "default": {
+            "pool_size": 10,
+            "connect_timeout": 5,
+            "read_timeout": 30,
+            "max_retries": 2,
+            "backoff_factor": 0.5,
+        },
+    }
+    settings.OEE_CIRCUIT_BREAKER_SETTINGS = {
+        "default": {
+            "enabled": True,
+            "failure_threshold": 5,
+            "failure_rate": 0.5,
+            "min_requests": 20,
+            "window": 60,
+            "reset_timeout": 30,
+            "open_action": "fail_fast",
+        },
+    }
+    settings.OEE_RATE_LIMIT_SETTINGS = {
+        "default": {
+            "rate": None,
+            "burst": 10,
+            "max_in_flight": None,
+            "in_flight_timeout": 60,
+            "in_flight_retry_after": 1,
+        },
+    }
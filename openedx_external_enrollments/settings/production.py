@@ -26,6 +26,10 @@ def plugin_settings(settings):
         'EDX_ENTERPRISE_API_CATALOG_UUID',
         settings.EDX_ENTERPRISE_API_CATALOG_UUID
     )
+    settings.EDX_ENTERPRISE_API_BULK_CHUNK_SIZE = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EDX_ENTERPRISE_API_BULK_CHUNK_SIZE',
+        settings.EDX_ENTERPRISE_API_BULK_CHUNK_SIZE
+    )
     settings.SALESFORCE_API_TOKEN_URL = getattr(settings, 'ENV_TOKENS', {}).get(
         'SALESFORCE_API_TOKEN_URL',
         settings.SALESFORCE_API_TOKEN_URL
@@ -46,6 +50,14 @@ def plugin_settings(settings):
         'SALESFORCE_API_PASSWORD',
         settings.SALESFORCE_API_PASSWORD
     )
+    settings.SALESFORCE_ENROLLMENT_RETRY_BACKOFF = getattr(settings, 'ENV_TOKENS', {}).get(
+        'SALESFORCE_ENROLLMENT_RETRY_BACKOFF',
+        settings.SALESFORCE_ENROLLMENT_RETRY_BACKOFF
+    )
+    settings.SALESFORCE_ENROLLMENT_RETRY_BACKOFF_MAX = getattr(settings, 'ENV_TOKENS', {}).get(
+        'SALESFORCE_ENROLLMENT_RETRY_BACKOFF_MAX',
+        settings.SALESFORCE_ENROLLMENT_RETRY_BACKOFF_MAX
+    )
     settings.DROPBOX_API_ARG_DOWNLOAD = getattr(settings, 'ENV_TOKENS', {}).get(
         'DROPBOX_API_ARG_DOWNLOAD',
         settings.DROPBOX_API_ARG_DOWNLOAD
@@ -66,3 +78,87 @@ def plugin_settings(settings):
         'DROPBOX_DATE_FORMAT',
         settings.DROPBOX_DATE_FORMAT
     )
+    settings.DROPBOX_API_ARG_UPDATE = getattr(settings, 'ENV_TOKENS', {}).get(
+        'DROPBOX_API_ARG_UPDATE',
+        settings.DROPBOX_API_ARG_UPDATE
+    )
+    settings.DROPBOX_API_ARG_ADD = getattr(settings, 'ENV_TOKENS', {}).get(
+        'DROPBOX_API_ARG_ADD',
+        settings.DROPBOX_API_ARG_ADD
+    )
+    settings.GREENFIG_ROSTER_SETTINGS = getattr(settings, 'ENV_TOKENS', {}).get(
+        'GREENFIG_ROSTER_SETTINGS',
+        settings.GREENFIG_ROSTER_SETTINGS
+    )
+    settings.EXTERNAL_ENROLLMENTS_DISPATCH_MODE = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EXTERNAL_ENROLLMENTS_DISPATCH_MODE',
+        settings.EXTERNAL_ENROLLMENTS_DISPATCH_MODE
+    )
+    settings.EXTERNAL_ENROLLMENTS_API_DEFAULT_MODE = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EXTERNAL_ENROLLMENTS_API_DEFAULT_MODE',
+        settings.EXTERNAL_ENROLLMENTS_API_DEFAULT_MODE
+    )
+    settings.EXTERNAL_ENROLLMENTS_BULK_MAX_SIZE = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EXTERNAL_ENROLLMENTS_BULK_MAX_SIZE',
+        settings.EXTERNAL_ENROLLMENTS_BULK_MAX_SIZE
+    )
+    settings.OEE_COURSE_SETTINGS_CACHE_TIMEOUT = getattr(settings, 'ENV_TOKENS', {}).get(
+        'OEE_COURSE_SETTINGS_CACHE_TIMEOUT',
+        settings.OEE_COURSE_SETTINGS_CACHE_TIMEOUT
+    )
+    settings.OEE_ENROLLMENT_DEBOUNCE_WINDOW = getattr(settings, 'ENV_TOKENS', {}).get(
+        'OEE_ENROLLMENT_DEBOUNCE_WINDOW',
+        settings.OEE_ENROLLMENT_DEBOUNCE_WINDOW
+    )
+    settings.OEE_EXTERNAL_COURSE_INDEX_SETTINGS = getattr(settings, 'ENV_TOKENS', {}).get(
+        'OEE_EXTERNAL_COURSE_INDEX_SETTINGS',
+        settings.OEE_EXTERNAL_COURSE_INDEX_SETTINGS
+    )
+    settings.OEE_OUTBOX_SETTINGS = getattr(settings, 'ENV_TOKENS', {}).get(
+        'OEE_OUTBOX_SETTINGS',
+        settings.OEE_OUTBOX_SETTINGS
+    )
+    settings.OEE_PROGRAM_METADATA_CACHE_TIMEOUT = getattr(settings, 'ENV_TOKENS', {}).get(
+        'OEE_PROGRAM_METADATA_CACHE_TIMEOUT',
+        settings.OEE_PROGRAM_METADATA_CACHE_TIMEOUT
+    )
+    settings.OEE_METRICS_BACKEND = getattr(settings, 'ENV_TOKENS', {}).get(
+        'OEE_METRICS_BACKEND',
+        settings.OEE_METRICS_BACKEND
+    )
+    settings.OEE_METRICS_SETTINGS = getattr(settings, 'ENV_TOKENS', {}).get(
+        'OEE_METRICS_SETTINGS',
+        settings.OEE_METRICS_SETTINGS
+    )
+    settings.OEE_TRACING_ENABLED = getattr(settings, 'ENV_TOKENS', {}).get(
+        'OEE_TRACING_ENABLED',
+        settings.OEE_TRACING_ENABLED
+    )
+    settings.OEE_REQUEST_LOG_SETTINGS = getattr(settings, 'ENV_TOKENS', {}).get(
+        'OEE_REQUEST_LOG_SETTINGS',
+        settings.OEE_REQUEST_LOG_SETTINGS
+    )
+    settings.OEE_RESPONSE_MAX_SIZE = getattr(settings, 'ENV_TOKENS', {}).get(
+        'OEE_RESPONSE_MAX_SIZE',
+        settings.OEE_RESPONSE_MAX_SIZE
+    )
+    settings.OEE_TOKEN_CACHE_SETTINGS = getattr(settings, 'ENV_TOKENS', {}).get(
+        'OEE_TOKEN_CACHE_SETTINGS',
+        settings.OEE_TOKEN_CACHE_SETTINGS
+    )
+    settings.OEE_HTTP_SESSION_SETTINGS = getattr(settings, 'ENV_TOKENS', {}).get(
+        'OEE_HTTP_SESSION_SETTINGS',
+        settings.OEE_HTTP_SESSION_SETTINGS
+    )
+    settings.OEE_CIRCUIT_BREAKER_SETTINGS = getattr(settings, 'ENV_TOKENS', {}).get(
+        'OEE_CIRCUIT_BREAKER_SETTINGS',
+        settings.OEE_CIRCUIT_BREAKER_SETTINGS
+    )
+    settings.OEE_RATE_LIMIT_SETTINGS = getattr(settings, 'ENV_TOKENS', {}).get(
+        'OEE_RATE_LIMIT_SETTINGS',
+        settings.OEE_RATE_LIMIT_SETTINGS
+    )
+    settings.OEE_SITE_VERSION_CHECK_INTERVAL = getattr(settings, 'ENV_TOKENS', {}).get(
+        'OEE_SITE_VERSION_CHECK_INTERVAL',
+        settings.OEE_SITE_VERSION_CHECK_INTERVAL
+    )
@@ -27,6 +27,7 @@ EDX_ENTERPRISE_API_CLIENT_SECRET = 'edx-test-api-client-secret'
 EDX_ENTERPRISE_API_TOKEN_URL = 'edx-test-api-token'
 EDX_ENTERPRISE_API_CUSTOMER_UUID = 'edx-test-api-customer-uuid'
 EDX_ENTERPRISE_API_BASE_URL = 'edx-test-api-base-url'
+EDX_ENTERPRISE_API_BULK_CHUNK_SIZE = 2
 
 SALESFORCE_API_CLIENT_ID = 'salesforce-test-api-client-id'
 SALESFORCE_API_CLIENT_SECRET = 'salesforce-test-api-client-secret'
@@ -34,9 +35,38 @@ SALESFORCE_API_PASSWORD = 'salesforce-test-password'
 SALESFORCE_API_USERNAME = 'salesforce-test-username'
 SALESFORCE_API_TOKEN_URL = 'salesforce-test-api-token'
 SALESFORCE_ENROLLMENT_API_PATH = 'salesforce-enrollment-api-path'
+SALESFORCE_ENROLLMENT_RETRY_BACKOFF = 5
+SALESFORCE_ENROLLMENT_RETRY_BACKOFF_MAX = 600
 
 DROPBOX_API_ARG_DOWNLOAD = '%s-download'
 DROPBOX_API_DOWNLOAD_URL = 'dropbox-tets-api-download-url'
 DROPBOX_API_ARG_UPLOAD = '%s-upload'
 DROPBOX_API_UPLOAD_URL = 'dropbox-tets-api-upload-url'
 DROPBOX_DATE_FORMAT = '%m-%d-%Y %H:%M:%S'
+DROPBOX_API_ARG_UPDATE = '%s-update-%s'
+DROPBOX_API_ARG_ADD = '%s-add'
+
+GREENFIG_ROSTER_SETTINGS = {'flush_batch_size': 2, 'flush_max_attempts': 3}
+
+EXTERNAL_ENROLLMENTS_DISPATCH_MODE = 'sync'
+EXTERNAL_ENROLLMENTS_API_DEFAULT_MODE = 'sync'
+EXTERNAL_ENROLLMENTS_BULK_MAX_SIZE = 3
+OEE_COURSE_SETTINGS_CACHE_TIMEOUT = 0
+OEE_ENROLLMENT_DEBOUNCE_WINDOW = 0
+OEE_EXTERNAL_COURSE_INDEX_SETTINGS = {'enabled': False, 'check_interval': 0}
+OEE_OUTBOX_SETTINGS = {'batch_size': 2}
+OEE_PROGRAM_METADATA_CACHE_TIMEOUT = 0
+OEE_METRICS_BACKEND = 'noop'
+OEE_METRICS_SETTINGS = {}
+OEE_TRACING_ENABLED = False
+OEE_REQUEST_LOG_SETTINGS = {}
+OEE_RESPONSE_MAX_SIZE = 64 * 1024
+OEE_SITE_VERSION_CHECK_INTERVAL = 0
+
+OEE_TOKEN_CACHE_SETTINGS = {'lock_timeout': 1}
+
+OEE_HTTP_SESSION_SETTINGS = {}
+OEE_RATE_LIMIT_SETTINGS = {}
+
+# Enabled by the circuit breaker tests only, so failures of other tests don't open the circuits.
+OEE_CIRCUIT_BREAKER_SETTINGS = {'default': {'enabled': False}}
@@ -1,16 +1,43 @@
 """Openedx external enrollments receivers file."""
-from openedx_external_enrollments.edxapp_wrapper.get_courseware import get_course_by_id
-from openedx_external_enrollments.edxapp_wrapper.get_site_configuration import configuration_helpers
+from django.conf import settings
+from django.db import transaction
+
+from openedx_external_enrollments.course_index import index_course, is_external_course
+from openedx_external_enrollments.edxapp_wrapper.get_courseware import (
+    get_course_by_id,
+    invalidate_other_course_settings,
+)
+from openedx_external_enrollments.enrollment_changes import (
+    debounce_enrollment_change,
+    get_enrollment_state,
+    get_remembered_enrollment_state,
+    remember_enrollment_state,
+)
 from openedx_external_enrollments.external_enrollments import execute_external_enrollment
+from openedx_external_enrollments.outbox import add_to_outbox
+from openedx_external_enrollments.program_metadata import invalidate_program_metadata
+from openedx_external_enrollments.site_cache import get_site_settings, invalidate_site
+from openedx_external_enrollments.tasks import process_external_enrollment
+from openedx_external_enrollments.tracing import traced
+
+ASYNC_DISPATCH_MODE = 'async'
+OUTBOX_DISPATCH_MODE = 'outbox'
 
 
+@traced('update_external_enrollment')
 def update_external_enrollment(sender, created, instance, **kwargs):  # pylint: disable=unused-argument
     """
     This receiver is called when the django.db.models.signals.post_save signal is sent,
     it will execute an enrollment or unenrollment based on the value of instance.is_active.
+    Saves that don't change is_active nor mode are ignored.
     """
-    if (not configuration_helpers.get_value('ENABLE_EXTERNAL_ENROLLMENTS', False)
-            or (created and not instance.is_active)):
+    previous_state = None if created else get_remembered_enrollment_state(instance)
+    remember_enrollment_state(instance)
+
+    if (not get_site_settings().enabled
+            or (created and not instance.is_active)
+            or previous_state == get_enrollment_state(instance)
+            or not is_external_course(instance.course_id)):
         return
 
     data = {
@@ -19,15 +46,16 @@ def update_external_enrollment(sender, created, instance, **kwargs):  # pylint:
         'is_active': instance.is_active,
     }
 
-    execute_external_enrollment(data=data, course=get_course_by_id(instance.course.id))
+    _dispatch_external_enrollment(data, instance.course_id, previous_state)
 
 
+@traced('delete_external_enrollment')
 def delete_external_enrollment(sender, instance, **kwargs):  # pylint: disable=unused-argument
     """
     This receiver is called when the django.db.models.signals.post_delete signal is sent,
     it will always execute an unenrollment.
     """
-    if not configuration_helpers.get_value('ENABLE_EXTERNAL_ENROLLMENTS', False):
+    if not get_site_settings().enabled or not is_external_course(instance.course_id):
         return
 
     data = {
@@ -36,4 +64,74 @@ def delete_external_enrollment(sender, instance, **kwargs):  # pylint: disable=u
         'is_active': False,
     }
 
-    execute_external_enrollment(data=data, course=get_course_by_id(instance.course.id))
+    _dispatch_external_enrollment(data, instance.course_id)
+
+
+def track_enrollment_state(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    This receiver is called when the django.db.models.signals.post_init signal is sent,
+    it remembers the is_active and mode values the CourseEnrollment was loaded with.
+    """
+    remember_enrollment_state(instance)
+
+
+def invalidate_course_settings_cache(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    This receiver is called when a course is published,
+    it removes the cached other_course_settings of the course.
+    """
+    invalidate_other_course_settings(course_key)
+
+
+def update_external_course_index(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    This receiver is called when a course is published,
+    it updates the entry of the course in the index of external courses.
+    """
+    index_course(course_key, get_course_by_id(course_key).other_course_settings)
+
+
+def invalidate_site_configuration_cache(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    This receiver is called when a SiteConfiguration is saved,
+    the values built from the configuration of its site are built again on their next use.
+    """
+    invalidate_site(str(instance.site_id))
+
+
+def invalidate_program_metadata_cache(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    This receiver is called when a ProgramSalesforceEnrollment is saved or deleted,
+    the cached program metadata is read again on its next use.
+    """
+    invalidate_program_metadata()
+
+
+def _dispatch_external_enrollment(data, course_key, previous_state=None):
+    """
+    Execute the external enrollment in the current thread or, when the async dispatch mode
+    is enabled, enqueue it once the CourseEnrollment transaction has been committed.
+    The outbox dispatch mode persists it in the CourseEnrollment transaction instead.
+
+    In the async dispatch mode the enrollment is delayed by the debounce window, so only the
+    latest change of the user and course within the window is executed.
+    """
+    if settings.EXTERNAL_ENROLLMENTS_DISPATCH_MODE == OUTBOX_DISPATCH_MODE:
+        add_to_outbox(data, course_key)
+        return
+
+    if settings.EXTERNAL_ENROLLMENTS_DISPATCH_MODE == ASYNC_DISPATCH_MODE:
+        course_id = str(course_key)
+        debounce_token = debounce_enrollment_change(data, course_id, previous_state)
+
+        if debounce_token:
+            transaction.on_commit(lambda: process_external_enrollment.apply_async(
+                args=(course_id, data),
+                kwargs={'debounce_token': debounce_token},
+                countdown=settings.OEE_ENROLLMENT_DEBOUNCE_WINDOW,
+            ))
+        else:
+            transaction.on_commit(lambda: process_external_enrollment.delay(course_id, data))
+        return
+
+    execute_external_enrollment(data=data, course=get_course_by_id(course_key))
@@ -0,0 +1,124 @@
+"""
+Per-site cache of the plugin values stored in the site configuration.
+
+Every process caches locally the values of a site, and what it builds from them, tagged with
+the version of the site stored in the Django cache. Saving the SiteConfiguration of the site
+changes its version, so every process builds them again on their next use. The shared version
+is read at most once every OEE_SITE_VERSION_CHECK_INTERVAL seconds per process.
+
+The values of another site than the current one, e.g. in a celery task, are read from its
+SiteConfiguration.
+"""
+import time
+from collections import namedtuple
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+
+from openedx_external_enrollments.edxapp_wrapper.get_site_configuration import (
+    configuration_helpers,
+    get_site_configuration_model,
+)
+from openedx_external_enrollments.tracing import start_span
+
+SITE_VERSION_CACHE_KEY = 'openedx_external_enrollments.site_version.{site}'
+DEFAULT_SITE_KEY = 'default'
+
+SiteSettings = namedtuple('SiteSettings', [
+    'enabled',
+    'valid_targets',
+    'dropbox_api_url',
+    'dropbox_file_path',
+    'dropbox_token',
+    'site_key',
+])
+
+_SITE_VERSIONS = {}
+_SITE_SETTINGS = {}
+
+
+def get_current_site_key():
+    """
+    Return the key of the site of the current request, or the default one outside of a site.
+    """
+    site_configuration = configuration_helpers.get_current_site_configuration()
+
+    if not site_configuration:
+        return DEFAULT_SITE_KEY
+
+    return str(site_configuration.site_id)
+
+
+def get_site_settings(site_key=None):
+    """
+    Return the SiteSettings of the given site key or of the current site.
+    """
+    current_site_key = get_current_site_key()
+    site_key = site_key or current_site_key
+    version = get_site_version(site_key)
+    cached_settings = _SITE_SETTINGS.get(site_key)
+
+    if cached_settings and cached_settings[0] == version:
+        return cached_settings[1]
+
+    with start_span('load_site_settings', site=site_key):
+        get_value = configuration_helpers.get_value if site_key == current_site_key else _get_site_getter(site_key)
+        site_settings = SiteSettings(
+            enabled=bool(get_value('ENABLE_EXTERNAL_ENROLLMENTS', False)),
+            valid_targets=frozenset(get_value('VALID_EXTERNAL_TARGETS', []) or []),
+            dropbox_api_url=get_value('DROPBOX_API_URL', 'https://content.dropboxapi.com/2'),
+            dropbox_file_path=get_value('DROPBOX_FILE_PATH', '/courses.txt'),
+            dropbox_token=get_value('DROPBOX_TOKEN', 'token'),
+            site_key=site_key,
+        )
+    _SITE_SETTINGS[site_key] = (version, site_settings)
+
+    return site_settings
+
+
+def get_site_version(site_key):
+    """
+    Return the current version of the site.
+    """
+    now = time.time()
+    local_version = _SITE_VERSIONS.get(site_key)
+
+    if local_version and now < local_version[1]:
+        return local_version[0]
+
+    key = SITE_VERSION_CACHE_KEY.format(site=site_key)
+    version = cache.get(key)
+
+    if version is None:
+        version = uuid4().hex
+
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+
+    _SITE_VERSIONS[site_key] = (version, now + settings.OEE_SITE_VERSION_CHECK_INTERVAL)
+
+    return version
+
+
+def _get_site_getter(site_key):
+    """
+    Return the get_value function of the SiteConfiguration of the site, the defaults are used without one.
+    """
+    site_configuration = None
+
+    if site_key != DEFAULT_SITE_KEY:
+        site_configuration = get_site_configuration_model().objects.filter(site_id=site_key).first()
+
+    if site_configuration is None:
+        return lambda name, default=None: default
+
+    return site_configuration.get_value
+
+
+def invalidate_site(site_key):
+    """
+    Change the version of the site, so its values are built again.
+    """
+    cache.set(SITE_VERSION_CACHE_KEY.format(site=site_key), uuid4().hex, None)
+    _SITE_VERSIONS.pop(site_key, None)
@@ -1,13 +1,39 @@
 """Openedx external enrollments task file."""
+import logging
+
 from celery import task
+from django.conf import settings
+from opaque_keys.edx.keys import CourseKey
 
+from openedx_external_enrollments.edxapp_wrapper.get_courseware import get_course_by_id, get_other_course_settings
+from openedx_external_enrollments.enrollment_changes import is_latest_enrollment_change
+from openedx_external_enrollments.exceptions import RetryableEnrollmentError, ThrottledEnrollmentError
+from openedx_external_enrollments.external_enrollments import execute_external_enrollment
+from openedx_external_enrollments.external_enrollments.greenfig_external_enrollment import (
+    GreenfigInstanceExternalEnrollment,
+)
 from openedx_external_enrollments.external_enrollments.salesforce_external_enrollment import SalesforceEnrollment
+from openedx_external_enrollments.factory import ExternalEnrollmentFactory
+from openedx_external_enrollments.models import EnrollmentDeadLetter, ExternalEnrollmentJob
+from openedx_external_enrollments.outbox import (
+    clear_scheduled_relay,
+    get_next_relay_countdown,
+    relay_outbox,
+    schedule_outbox_relay,
+)
+from openedx_external_enrollments.retries import get_retry_countdown
+
+LOG = logging.getLogger(__name__)
 
 
-@task(default_retry_delay=5, max_retries=5)  # pylint: disable=not-callable
-def generate_salesforce_enrollment(data, *args, **kwargs):  # pylint: disable=unused-argument
+@task(bind=True, default_retry_delay=5, max_retries=5)  # pylint: disable=not-callable
+def generate_salesforce_enrollment(self, data, *args, **kwargs):  # pylint: disable=unused-argument
     """
     Handles the enrollment process at Salesforce.
+
+    Transient failures are retried with exponential backoff and jitter, honoring the Retry-After
+    header of the rate limited responses. The payload is dead-lettered when the retries run out.
+    Enrollments throttled by the local rate limits are enqueued again without using a retry.
     Args:
         data: request data
     """
@@ -16,7 +42,116 @@ def generate_salesforce_enrollment(data, *args, **kwargs):  # pylint: disable=un
         # Getting the corresponding enrollment controller
         enrollment_controller = SalesforceEnrollment()
     except Exception:  # pylint: disable=broad-except
-        pass
-    else:
+        return
+
+    try:
         # Calling the controller enrollment method
-        enrollment_controller._post_enrollment(data)  # pylint: disable=protected-access
+        enrollment_controller._post_enrollment(data, raise_on_retryable=True)  # pylint: disable=protected-access
+    except ThrottledEnrollmentError as error:
+        LOG.info('Salesforce enrollment throttled, enqueuing it for %s seconds.', error.retry_after)
+        self.apply_async(args=(data,), countdown=error.retry_after)
+    except RetryableEnrollmentError as error:
+        retries = self.request.retries
+
+        if retries >= self.max_retries:
+            LOG.error('Salesforce enrollment failed after %s attempts, dead-lettering it.', retries + 1)
+            EnrollmentDeadLetter.objects.create(  # pylint: disable=no-member
+                request_type=str(enrollment_controller),
+                data=data,
+                reason=str(error),
+                attempts=retries + 1,
+            )
+            return
+
+        countdown = get_retry_countdown(
+            retries,
+            settings.SALESFORCE_ENROLLMENT_RETRY_BACKOFF,
+            settings.SALESFORCE_ENROLLMENT_RETRY_BACKOFF_MAX,
+            retry_after=error.retry_after,
+        )
+        LOG.info('Salesforce enrollment failed, retrying in %s seconds. Reason: %s', countdown, str(error))
+        raise self.retry(exc=error, countdown=countdown)
+
+
+@task()  # pylint: disable=not-callable
+def process_external_enrollment(course_id, data, *args, **kwargs):  # pylint: disable=unused-argument
+    """
+    Executes an external enrollment dispatched by the CourseEnrollment signal receivers.
+    Args:
+        course_id: string representation of the course key.
+        data: dict with the user_email, course_mode and is_active values.
+        debounce_token: optional keyword, token of the change. The enrollment is skipped when a
+            later change of the user and course was dispatched within the debounce window.
+    """
+    debounce_token = kwargs.get('debounce_token')
+
+    if debounce_token and not is_latest_enrollment_change(data, course_id, debounce_token):
+        LOG.info('Skipping the enrollment of %s superseded by a later change.', course_id)
+        return
+
+    course = get_course_by_id(CourseKey.from_string(course_id))
+    execute_external_enrollment(data=data, course=course)
+
+
+@task()  # pylint: disable=not-callable
+def relay_external_enrollment_outbox(*args, **kwargs):  # pylint: disable=unused-argument
+    """
+    Delivers the pending outbox enrollment changes and schedules another relay while changes remain,
+    once the next deferred change is due.
+    """
+    clear_scheduled_relay()
+    relay_outbox()
+    countdown = get_next_relay_countdown()
+
+    if countdown is not None:
+        schedule_outbox_relay(countdown)
+
+
+@task()  # pylint: disable=not-callable
+def flush_greenfig_roster(*args, **kwargs):  # pylint: disable=unused-argument
+    """
+    Uploads the buffered Greenfig roster lines and schedules another flush while lines remain.
+    Args:
+        site_key: key of the site whose dropbox settings are used, given as a keyword argument.
+        file_path: dropbox file path of the roster lines, given as a keyword argument.
+    """
+    enrollment_controller = GreenfigInstanceExternalEnrollment(
+        site_key=kwargs.get('site_key'),
+        file_path=kwargs.get('file_path'),
+    )
+    enrollment_controller.clear_scheduled_flush()
+    enrollment_controller.flush_roster()
+
+    if enrollment_controller.has_pending_lines():
+        enrollment_controller._schedule_roster_flush()  # pylint: disable=protected-access
+
+
+@task()  # pylint: disable=not-callable
+def process_external_enrollment_job(job_id, *args, **kwargs):  # pylint: disable=unused-argument
+    """
+    Executes an external enrollment requested through the API in async mode.
+    Args:
+        job_id: string representation of the ExternalEnrollmentJob job_id.
+    """
+    job = ExternalEnrollmentJob.objects.get(job_id=job_id)  # pylint: disable=no-member
+    job.status = ExternalEnrollmentJob.RUNNING
+    job.save()
+
+    try:
+        enrollment_controller = ExternalEnrollmentFactory.get_enrollment_controller(job.controller)
+        response, request_status = enrollment_controller._post_enrollment(  # pylint: disable=protected-access
+            job.data,
+            get_other_course_settings(CourseKey.from_string(job.course_id)),
+        )
+    except Exception as error:  # pylint: disable=broad-except
+        LOG.error('External enrollment job %s failed. Reason: %s', job_id, str(error))
+        response, request_status = {'error': str(error)}, None
+
+    job.response = response
+    job.response_status = request_status
+    job.status = (
+        ExternalEnrollmentJob.SUCCEEDED
+        if request_status and request_status < 400
+        else ExternalEnrollmentJob.FAILED
+    )
+    job.save()
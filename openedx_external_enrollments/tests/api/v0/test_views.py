@@ -1 +1,236 @@
 """Tests api.v0.views file."""
+import json
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from mock import Mock, patch
+from rest_framework import status
+
+from openedx_external_enrollments.api.v0.views import (
+    BulkExternalEnrollment,
+    CircuitBreakerView,
+    ExternalEnrollment,
+    ExternalEnrollmentJobView,
+)
+from openedx_external_enrollments.circuit_breakers import CLOSED, OPEN, CircuitBreaker
+from openedx_external_enrollments.models import ExternalEnrollmentJob
+
+MODULE = 'openedx_external_enrollments.api.v0.views'
+
+
+class ExternalEnrollmentTest(TestCase):
+    """Test class for ExternalEnrollment view."""
+
+    def setUp(self):
+        """Set the view, the request and the course."""
+        self.view = ExternalEnrollment()
+        self.request = Mock()
+        self.request.path = '/api/v0/external-enrollment'
+        self.request.query_params = {}
+        self.request.data = {
+            'user_email': 'test-email',
+            'course_id': 'course-v1:test+CS102+2019_T3',
+        }
+        self.course = Mock()
+        self.course.id = 'course-v1:test+CS102+2019_T3'
+        self.course.other_course_settings = {'external_platform_target': 'edX'}
+
+    @patch('{}.ExternalEnrollmentFactory'.format(MODULE))
+    @patch.object(ExternalEnrollment, '_get_course')
+    def test_post_sync(self, get_course_mock, factory_mock):
+        """Testing the sync mode returns the controller response."""
+        get_course_mock.return_value = self.course
+        controller_mock = factory_mock.get_enrollment_controller.return_value
+        controller_mock._post_enrollment.return_value = ({'test': 'response'}, 200)  # pylint: disable=protected-access
+
+        response = self.view.post(self.request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content.decode('utf-8')), {'test': 'response'})
+        self.assertFalse(ExternalEnrollmentJob.objects.exists())  # pylint: disable=no-member
+
+    @patch('{}.process_external_enrollment_job'.format(MODULE))
+    @patch('{}.ExternalEnrollmentFactory'.format(MODULE))
+    @patch.object(ExternalEnrollment, '_get_course')
+    def test_post_async(self, get_course_mock, factory_mock, task_mock):
+        """Testing the async mode returns the job and enqueues it."""
+        get_course_mock.return_value = self.course
+        self.request.query_params = {'mode': 'async'}
+
+        with patch('{}.transaction.on_commit'.format(MODULE), side_effect=lambda func: func()):
+            response = self.view.post(self.request)
+
+        job = ExternalEnrollmentJob.objects.get()  # pylint: disable=no-member
+        content = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(content['job_id'], str(job.job_id))
+        self.assertEqual(content['status'], ExternalEnrollmentJob.PENDING)
+        self.assertEqual(content['status_url'], '/api/v0/external-enrollment/jobs/{}'.format(job.job_id))
+        self.assertEqual(job.controller, 'edX')
+        self.assertEqual(job.data, self.request.data)
+        task_mock.delay.assert_called_once_with(str(job.job_id))
+        factory_mock.get_enrollment_controller.return_value._post_enrollment.assert_not_called()  # noqa pylint: disable=protected-access
+
+
+class ExternalEnrollmentJobViewTest(TestCase):
+    """Test class for ExternalEnrollmentJobView view."""
+
+    def test_get(self):
+        """Testing the job status is returned."""
+        job = ExternalEnrollmentJob.objects.create(  # pylint: disable=no-member
+            controller='edX',
+            course_id='course-v1:test+CS102+2019_T3',
+            data={},
+            status=ExternalEnrollmentJob.SUCCEEDED,
+            response={'test': 'response'},
+            response_status=200,
+        )
+
+        response = ExternalEnrollmentJobView().get(Mock(), str(job.job_id))
+        content = json.loads(response.content.decode('utf-8'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(content['status'], ExternalEnrollmentJob.SUCCEEDED)
+        self.assertEqual(content['response'], {'test': 'response'})
+        self.assertEqual(content['response_status'], 200)
+
+    def test_get_not_found(self):
+        """Testing unknown jobs return 404."""
+        response = ExternalEnrollmentJobView().get(Mock(), '00000000-0000-0000-0000-000000000000')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(ExternalEnrollmentJobView().get(Mock(), 'bad-id').status_code, status.HTTP_404_NOT_FOUND)
+
+
+class BulkExternalEnrollmentTest(TestCase):
+    """Test class for BulkExternalEnrollment view."""
+
+    def setUp(self):
+        """Set the view and the courses."""
+        self.view = BulkExternalEnrollment()
+        self.edx_course_settings = {'external_platform_target': 'edX'}
+        self.courses_settings = {
+            'edx-course': self.edx_course_settings,
+            'internal-course': {},
+        }
+
+    @patch('{}.ExternalEnrollmentFactory'.format(MODULE))
+    @patch.object(BulkExternalEnrollment, '_get_course_settings')
+    def test_execute_bulk_enrollment(self, get_course_settings_mock, factory_mock):
+        """Testing enrollments are grouped by controller and reported per row."""
+        get_course_settings_mock.side_effect = self.courses_settings.get
+        controller_mock = Mock()
+        controller_mock._post_bulk_enrollment.return_value = [  # pylint: disable=protected-access
+            ({'first': 'response'}, status.HTTP_200_OK),
+            ({'second': 'response'}, status.HTTP_200_OK),
+        ]
+        factory_mock.get_enrollment_controller.return_value = controller_mock
+        enrollments = [
+            {'user_email': 'first-email', 'course_id': 'edx-course'},
+            {'user_email': 'second-email', 'course_id': 'missing-course'},
+            {'user_email': 'third-email', 'course_id': 'internal-course'},
+            {'user_email': 'fourth-email', 'course_id': 'edx-course'},
+        ]
+
+        results = self.view._execute_bulk_enrollment(enrollments)  # pylint: disable=protected-access
+
+        factory_mock.get_enrollment_controller.assert_called_once_with('edx')
+        controller_mock._post_bulk_enrollment.assert_called_once_with([  # pylint: disable=protected-access
+            (enrollments[0], self.edx_course_settings),
+            (enrollments[3], self.edx_course_settings),
+        ])
+        self.assertEqual(get_course_settings_mock.call_count, 3)
+        self.assertEqual(
+            [(result['user_email'], result['status']) for result in results],
+            [
+                ('first-email', status.HTTP_200_OK),
+                ('second-email', status.HTTP_400_BAD_REQUEST),
+                ('third-email', status.HTTP_200_OK),
+                ('fourth-email', status.HTTP_200_OK),
+            ],
+        )
+        self.assertEqual(results[0]['response'], {'first': 'response'})
+        self.assertEqual(results[2]['response'], {'info': 'Course internal-course not configured as external'})
+        self.assertEqual(results[3]['response'], {'second': 'response'})
+
+    @patch.object(BulkExternalEnrollment, '_execute_bulk_enrollment')
+    def test_post_invalid_enrollments(self, execute_mock):
+        """Testing requests with too many enrollments or with invalid rows are rejected."""
+        request = Mock(data=[{'user_email': 'email', 'course_id': 'edx-course'}] * 4)
+
+        response = self.view.post(request)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('at most 3 enrollments', json.loads(response.content.decode('utf-8'))['error'])
+
+        request.data = {'enrollments': ['email', {'user_email': 'email'}, {'user_email': 'email', 'course_id': 'id'}]}
+
+        response = self.view.post(request)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            [error['index'] for error in json.loads(response.content.decode('utf-8'))['errors']],
+            [0, 1],
+        )
+        execute_mock.assert_not_called()
+
+    @patch.object(BulkExternalEnrollment, '_get_course_settings')
+    def test_execute_bulk_enrollment_unknown_target(self, get_course_settings_mock):
+        """Testing enrollments of courses with an unknown target are reported as errors."""
+        get_course_settings_mock.return_value = {'external_platform_target': 'unknown'}
+
+        results = self.view._execute_bulk_enrollment([  # pylint: disable=protected-access
+            {'user_email': 'first-email', 'course_id': 'unknown-course'},
+        ])
+
+        self.assertEqual(results[0]['status'], status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(results[0]['response'], {'error': 'Unknown external platform target: unknown'})
+
+    @patch('{}.get_other_course_settings'.format(MODULE))
+    def test_get_course_settings(self, get_settings_mock):
+        """Testing courses that can't be loaded are reported as missing."""
+        get_settings_mock.return_value = self.edx_course_settings
+
+        self.assertEqual(
+            self.view._get_course_settings('course-v1:test+CS102+2019_T3'),  # pylint: disable=protected-access
+            self.edx_course_settings,
+        )
+        self.assertIsNone(self.view._get_course_settings('invalid-course-id'))  # pylint: disable=protected-access
+
+        get_settings_mock.side_effect = Exception('test-exception')
+        self.assertIsNone(
+            self.view._get_course_settings('course-v1:test+CS102+2019_T3'),  # pylint: disable=protected-access
+        )
+
+
+@override_settings(OEE_CIRCUIT_BREAKER_SETTINGS={'default': {'enabled': True}})
+class CircuitBreakerViewTest(TestCase):
+    """Test class for CircuitBreakerView view."""
+
+    def setUp(self):
+        """Clear the cache."""
+        cache.clear()
+        self.view = CircuitBreakerView()
+
+    def test_get(self):
+        """Testing the state of every circuit is returned."""
+        CircuitBreaker('salesforce').open()
+
+        response = self.view.get(Mock())
+        content = json.loads(response.content.decode('utf-8'))
+        states = {circuit['provider']: circuit['state'] for circuit in content['results']}
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(states['salesforce'], OPEN)
+        self.assertEqual(states['edX'], CLOSED)
+
+    def test_post(self):
+        """Testing the circuit of a provider can be closed by the staff."""
+        CircuitBreaker('salesforce').open()
+        request = Mock(data={'action': 'close'})
+
+        response = self.view.post(request, 'salesforce')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content.decode('utf-8'))['state'], CLOSED)
+        self.assertEqual(self.view.post(Mock(data={'action': 'delete'}), 'salesforce').status_code, 400)
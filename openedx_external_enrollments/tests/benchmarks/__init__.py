@@ -0,0 +1,7 @@
+"""
+Benchmarks of the enrollment pipeline against stub external platforms.
+
+They are not collected by the test runner, run them with
+
+    python -m openedx_external_enrollments.tests.benchmarks --help
+"""
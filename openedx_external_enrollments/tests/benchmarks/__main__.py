@@ -0,0 +1,6 @@
+"""Run the enrollment benchmarks with python -m openedx_external_enrollments.tests.benchmarks."""
+import sys
+
+from openedx_external_enrollments.tests.benchmarks.runner import main
+
+sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+Edxapp backends of the benchmarks.
+
+The courses, learners and site configuration are kept in memory, so the benchmarks measure
+the plugin code and the stub platforms, not the modulestore nor the edxapp models.
+"""
+import datetime
+
+from opaque_keys.edx.keys import CourseKey
+
+from openedx_external_enrollments.tests.tests_backends import course_published
+
+COURSES = {}
+SITE_CONFIGURATION = {}
+
+
+class StubObject(object):
+    """
+    Object with the given attributes.
+    """
+
+    def __init__(self, **attributes):
+        self.__dict__.update(attributes)
+
+
+class StubUser(StubObject):
+    """
+    User with its profile.
+    """
+
+    def __init__(self, profile, **attributes):
+        super(StubUser, self).__init__(**attributes)
+        self.profile = profile
+
+
+class StubQuerySet(list):
+    """
+    List returned by the stub managers.
+    """
+
+
+class StubEnrollmentManager(object):
+    """
+    Manager of the StubCourseEnrollment.
+    """
+
+    @staticmethod
+    def filter(user__in=(), course_id__in=(), **kwargs):  # pylint: disable=unused-argument
+        """
+        Return the enrollments of the users in the courses.
+        """
+        return StubQuerySet(
+            StubCourseEnrollment.get_enrollment(user, course_key)
+            for user in user__in
+            for course_key in course_id__in
+        )
+
+
+class StubCourseEnrollment(object):
+    """
+    CourseEnrollment of the benchmarks, every learner is enrolled in every course.
+    """
+    objects = StubEnrollmentManager()
+
+    @staticmethod
+    def get_enrollment(user, course_key):
+        """
+        Return the enrollment of the user in the course.
+        """
+        return StubObject(
+            user_id=user.id,
+            course_id=course_key,
+            created=datetime.datetime(2020, 1, 1),
+            is_active=True,
+            mode='verified',
+        )
+
+
+class StubConfigurationHelpers(object):
+    """
+    configuration_helpers reading the values from SITE_CONFIGURATION.
+    """
+
+    @staticmethod
+    def get_value(name, default=None):
+        """
+        Return the configured value or the default.
+        """
+        return SITE_CONFIGURATION.get(name, default)
+
+    @staticmethod
+    def get_current_site_configuration():
+        """
+        Return None, the benchmarks run on the default site.
+        """
+        return None
+
+
+def add_course(course_id, other_course_settings):
+    """
+    Register the course with the given other_course_settings.
+    """
+    course_key = CourseKey.from_string(course_id)
+    COURSES[course_key] = StubObject(
+        id=course_key,
+        display_name='Benchmark {}'.format(course_key.course),
+        other_course_settings=other_course_settings,
+        start=datetime.datetime(2020, 1, 1),
+        end=datetime.datetime(2030, 1, 1),
+        self_paced=True,
+    )
+
+    return COURSES[course_key]
+
+
+def get_learner(email):
+    """
+    Return the learner of the email, with its profile.
+    """
+    username = email.split('@')[0]
+    profile = StubObject(name='{} Learner'.format(username.capitalize()))
+
+    return StubUser(
+        profile,
+        id=abs(hash(email)) % 1000000,
+        email=email,
+        username=username,
+        first_name=username.capitalize(),
+        last_name='Learner',
+    )
+
+
+def get_course_by_id_backend(course_key, *args, **kwargs):  # pylint: disable=unused-argument
+    """
+    Return the registered course.
+    """
+    return COURSES[course_key]
+
+
+def get_courses_backend():
+    """
+    Return every registered course.
+    """
+    return list(COURSES.values())
+
+
+def get_course_published_signal_backend():
+    """
+    Return the course_published signal of the test backends.
+    """
+    return course_published
+
+
+def get_configuration_helpers():
+    """
+    Return the configuration_helpers of the benchmarks.
+    """
+    return StubConfigurationHelpers()
+
+
+def get_user_backend(email=None, **kwargs):  # pylint: disable=unused-argument
+    """
+    Return the (user, profile) tuple of the email.
+    """
+    user = get_learner(email)
+
+    return user, user.profile
+
+
+def get_users_by_email_backend(emails):
+    """
+    Return the users of the emails.
+    """
+    return [get_learner(email) for email in emails]
+
+
+def get_course_enrollment_backend():
+    """
+    Return the CourseEnrollment of the benchmarks.
+    """
+    return StubCourseEnrollment
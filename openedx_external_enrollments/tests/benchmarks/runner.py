@@ -0,0 +1,317 @@
+"""
+Runner of the enrollment benchmarks.
+
+Every scenario runs against its own stub platform in an in-memory test database. The timed pass
+reports the throughput and latency percentiles, a separate profiling pass reports the database
+queries, edxapp calls and memory allocations per operation, since capturing them slows the
+operations down. The results can be stored as JSON and compared with the results of another commit, e.g.
+
+    python -m openedx_external_enrollments.tests.benchmarks --output after.json --compare before.json
+"""
+from __future__ import print_function
+
+import argparse
+import datetime
+import json
+import logging
+import math
+import os
+import platform
+import subprocess
+from contextlib import contextmanager
+from importlib import import_module
+from timeit import default_timer
+
+SETTINGS_MODULE = 'openedx_external_enrollments.tests.benchmarks.settings'
+COMPARED_METRICS = (
+    # (metric, True when higher values are better)
+    ('ops_per_sec', True),
+    ('p95_ms', False),
+    ('queries_per_op', False),
+)
+
+
+def parse_args(argv=None):
+    """
+    Return the options of the run.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the external enrollment pipeline.')
+    parser.add_argument('--scenario', action='append', dest='scenarios',
+                        help='Scenario to run, can be repeated. All of them by default.')
+    parser.add_argument('--iterations', type=int, default=200, help='Timed operations per scenario.')
+    parser.add_argument('--warmup', type=int, default=10, help='Untimed operations before the timed ones.')
+    parser.add_argument('--profile-iterations', type=int, default=20,
+                        help='Operations of the pass counting queries and allocations.')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds the stub platforms wait to answer.')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Maximum seconds added to the latency.')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests failed with a 503.')
+    parser.add_argument('--roster-lines', type=int, default=1000, help='Lines of the stub greenfig roster.')
+    parser.add_argument('--order-lines', type=int, default=3, help='Courses of the salesforce order.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the stub latency and failures.')
+    parser.add_argument('--output', help='File where the JSON results are written.')
+    parser.add_argument('--compare', help='JSON results of a previous run to compare with.')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Relative change of ops_per_sec or p95_ms reported as a regression.')
+    parser.add_argument('--verbose', action='store_true', help='Show the logs of the plugin.')
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Run the benchmarks, return 1 when a regression is found in the compared results.
+    """
+    options = parse_args(argv)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', SETTINGS_MODULE)
+    os.environ.setdefault('OAUTHLIB_INSECURE_TRANSPORT', '1')
+
+    if not options.verbose:
+        logging.disable(logging.CRITICAL)
+
+    import_module('django').setup()
+    results = run_benchmarks(options)
+    report = {
+        'commit': get_commit(),
+        'created': datetime.datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'options': {
+            name: value for name, value in vars(options).items()
+            if name not in ('output', 'compare', 'verbose')
+        },
+        'results': results,
+    }
+    print_results(results)
+
+    if options.output:
+        with open(options.output, 'w') as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+
+    if options.compare:
+        with open(options.compare) as baseline:
+            regressions = compare_results(json.load(baseline)['results'], results, options.threshold)
+
+        return 1 if regressions else 0
+
+    return 0
+
+
+def run_benchmarks(options):
+    """
+    Run the selected scenarios in a test database.
+
+    Returns:
+        Dict with the results of every scenario.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    from openedx_external_enrollments.tests.benchmarks.scenarios import SCENARIOS
+    from openedx_external_enrollments.tests.benchmarks.stub_servers import StubProviderServer
+
+    names = options.scenarios or list(SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+
+    if unknown:
+        raise SystemExit('Unknown scenarios: {}. Available: {}.'.format(
+            ', '.join(sorted(unknown)),
+            ', '.join(SCENARIOS),
+        ))
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    results = {}
+
+    try:
+        for name in names:
+            with StubProviderServer(
+                    latency=options.latency,
+                    jitter=options.jitter,
+                    error_rate=options.error_rate,
+                    roster_lines=options.roster_lines,
+                    seed=options.seed,
+            ) as server:
+                results[name] = run_scenario(SCENARIOS[name], server, options)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    return results
+
+
+def run_scenario(setup, server, options):
+    """
+    Measure the operation of the scenario.
+    """
+    from django.core.cache import cache
+
+    from openedx_external_enrollments.models import EnrollmentRequestLog
+    from openedx_external_enrollments.tests.query_profiling import profile_queries
+
+    cache.clear()
+    operation = setup(server, vars(options))
+
+    for iteration in range(options.warmup):
+        call_operation(operation, iteration)
+
+    durations = []
+    errors = 0
+    failed_logs = EnrollmentRequestLog.objects.filter(success=False)  # pylint: disable=no-member
+    failed_before = failed_logs.count()
+    started = default_timer()
+
+    for iteration in range(options.warmup, options.warmup + options.iterations):
+        operation_started = default_timer()
+        errors += call_operation(operation, iteration)
+        durations.append(default_timer() - operation_started)
+
+    elapsed = default_timer() - started
+    failed_requests = failed_logs.count() - failed_before
+    first_profiled = options.warmup + options.iterations
+    profiled = max(options.profile_iterations, 1)
+
+    with profile_queries() as profile, trace_allocations() as allocations:
+        for iteration in range(first_profiled, first_profiled + profiled):
+            call_operation(operation, iteration)
+
+    return {
+        'iterations': options.iterations,
+        'errors': errors,
+        'failed_requests': failed_requests,
+        'ops_per_sec': round(len(durations) / elapsed, 2) if elapsed else None,
+        'mean_ms': round(sum(durations) * 1000 / len(durations), 3) if durations else None,
+        'p50_ms': percentile(durations, 50),
+        'p95_ms': percentile(durations, 95),
+        'p99_ms': percentile(durations, 99),
+        'queries_per_op': round(profile.query_count / float(profiled), 2),
+        'edxapp_calls_per_op': {
+            name: round(calls / float(profiled), 2) for name, calls in profile.edxapp_calls.items()
+        },
+        'peak_memory_kb': allocations.get('peak_kb'),
+        'allocated_kb_per_op': (
+            round(allocations['allocated_kb'] / profiled, 2) if 'allocated_kb' in allocations else None
+        ),
+        'allocated_blocks_per_op': (
+            round(allocations['allocated_blocks'] / float(profiled), 2) if 'allocated_blocks' in allocations else None
+        ),
+    }
+
+
+def call_operation(operation, iteration):
+    """
+    Call the operation in its own unit of work, return 1 when it raises.
+    """
+    from openedx_external_enrollments.request_cache import request_cache_scope
+
+    try:
+        with request_cache_scope():
+            operation(iteration)
+    except Exception:  # pylint: disable=broad-except
+        logging.getLogger(__name__).exception('Benchmark operation %s failed.', iteration)
+        return 1
+
+    return 0
+
+
+@contextmanager
+def trace_allocations():
+    """
+    Trace the memory allocated in the wrapped block with tracemalloc, when it's available.
+
+    Yields:
+        Dict filled on exit with the peak traced memory and the memory and blocks allocated
+        by the block that were still alive at its end.
+    """
+    allocations = {}
+
+    try:
+        tracemalloc = import_module('tracemalloc')
+    except ImportError:
+        yield allocations
+        return
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+
+    try:
+        yield allocations
+    finally:
+        after = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        growth = [stat for stat in after.compare_to(before, 'lineno') if stat.size_diff > 0]
+        allocations.update(
+            peak_kb=round(peak / 1024.0, 2),
+            allocated_kb=sum(stat.size_diff for stat in growth) / 1024.0,
+            allocated_blocks=sum(stat.count_diff for stat in growth if stat.count_diff > 0),
+        )
+
+
+def percentile(durations, percent):
+    """
+    Return the nearest-rank percentile of the durations in milliseconds.
+    """
+    if not durations:
+        return None
+
+    ordered = sorted(durations)
+    index = max(int(math.ceil(percent / 100.0 * len(ordered))) - 1, 0)
+
+    return round(ordered[index] * 1000, 3)
+
+
+def compare_results(baseline, results, threshold):
+    """
+    Print the changes of the compared metrics, return the regressions found.
+    """
+    regressions = []
+    print('\nChanges against the baseline:')
+
+    for name in sorted(set(baseline) & set(results)):
+        for metric, higher_is_better in COMPARED_METRICS:
+            before = baseline[name].get(metric)
+            after = results[name].get(metric)
+
+            if before is None or after is None:
+                continue
+
+            change = (after - before) / float(before) if before else (1.0 if after else 0.0)
+            worse = change < -threshold if higher_is_better else change > threshold
+
+            if metric == 'queries_per_op':
+                worse = after > before
+
+            if worse:
+                regressions.append((name, metric, before, after))
+
+            print('  {:<30} {:<16} {:>12} -> {:<12} {:+.1%}{}'.format(
+                name, metric, before, after, change, '  REGRESSION' if worse else '',
+            ))
+
+    return regressions
+
+
+def print_results(results):
+    """
+    Print a table with the results of every scenario.
+    """
+    columns = (
+        'ops_per_sec', 'p50_ms', 'p95_ms', 'p99_ms', 'queries_per_op', 'allocated_kb_per_op', 'failed_requests',
+    )
+    print('{:<30}'.format('scenario') + ''.join('{:>20}'.format(column) for column in columns))
+
+    for name, result in results.items():
+        print('{:<30}'.format(name) + ''.join('{:>20}'.format(str(result[column])) for column in columns))
+
+
+def get_commit():
+    """
+    Return the commit of the working tree or None outside of a git checkout.
+    """
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.STDOUT,
+        ).decode('utf-8').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
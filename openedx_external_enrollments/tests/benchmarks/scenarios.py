@@ -0,0 +1,155 @@
+"""
+Scenarios of the enrollment benchmarks.
+
+Every scenario is set up against a stub platform and returns the operation measured by the
+runner, called with the number of the iteration so every operation enrolls a new learner.
+"""
+from collections import OrderedDict
+
+from opaque_keys.edx.keys import CourseKey
+
+from openedx_external_enrollments.api.v0.views import ExternalEnrollment
+from openedx_external_enrollments.edxapp_wrapper.get_courseware import get_course_by_id
+from openedx_external_enrollments.external_enrollments import execute_external_enrollment
+from openedx_external_enrollments.external_enrollments.greenfig_external_enrollment import (
+    GreenfigInstanceExternalEnrollment,
+)
+from openedx_external_enrollments.external_enrollments.salesforce_external_enrollment import SalesforceEnrollment
+from openedx_external_enrollments.models import ProgramSalesforceEnrollment
+from openedx_external_enrollments.site_cache import get_current_site_key, invalidate_site
+from openedx_external_enrollments.tests.benchmarks.backends import SITE_CONFIGURATION, StubObject, add_course
+
+OPENEDX_COURSE_ID = 'course-v1:benchmark+openedx+2020'
+GREENFIG_COURSE_ID = 'course-v1:benchmark+greenfig+2020'
+SALESFORCE_COURSE_ID = 'course-v1:benchmark+salesforce{}+2020'
+SALESFORCE_BUNDLE_ID = 'benchmark-program'
+
+
+def configure_site(server):
+    """
+    Enable the external enrollments of every target, with dropbox pointing to the server.
+    """
+    SITE_CONFIGURATION.clear()
+    SITE_CONFIGURATION.update({
+        'ENABLE_EXTERNAL_ENROLLMENTS': True,
+        'VALID_EXTERNAL_TARGETS': ['openedx', 'greenfig', 'salesforce'],
+        'DROPBOX_API_URL': server.url,
+        'DROPBOX_FILE_PATH': '/courses.txt',
+        'DROPBOX_TOKEN': 'benchmark-token',
+    })
+    invalidate_site(get_current_site_key())
+
+
+def get_enrollment_data(iteration):
+    """
+    Return the enrollment data of the learner of the iteration.
+    """
+    return {
+        'user_email': 'learner{}@example.com'.format(iteration),
+        'course_mode': 'verified',
+        'is_active': True,
+    }
+
+
+def setup_execute_external_enrollment(server, options):  # pylint: disable=unused-argument
+    """
+    Enroll in an openedx course through execute_external_enrollment.
+    """
+    configure_site(server)
+    add_course(OPENEDX_COURSE_ID, {
+        'external_platform_target': 'openedx',
+        'external_course_run_id': 'course-v1:external+openedx+2020',
+        'external_enrollment_api_url': '{}/api/enrollment/v1/enrollment'.format(server.url),
+    })
+    course_key = CourseKey.from_string(OPENEDX_COURSE_ID)
+
+    def operation(iteration):
+        """
+        Execute the enrollment of the learner.
+        """
+        execute_external_enrollment(get_enrollment_data(iteration), get_course_by_id(course_key))
+
+    return operation
+
+
+def setup_external_enrollment_view(server, options):
+    """
+    Enroll in an openedx course through the ExternalEnrollment view in sync mode.
+    """
+    setup_execute_external_enrollment(server, options)
+    view = ExternalEnrollment()
+
+    def operation(iteration):
+        """
+        Post the enrollment of the learner to the view.
+        """
+        data = dict(get_enrollment_data(iteration), course_id=OPENEDX_COURSE_ID)
+        view.post(StubObject(data=data, query_params={}, path='/api/v0/external-enrollment'))
+
+    return operation
+
+
+def setup_salesforce_enrollment_data(server, options):
+    """
+    Build the Salesforce payload of a program order with options.order_lines courses.
+    """
+    configure_site(server)
+    ProgramSalesforceEnrollment.objects.update_or_create(  # pylint: disable=no-member
+        bundle_id=SALESFORCE_BUNDLE_ID,
+        defaults={'meta': {
+            'Program_of_Interest': 'Benchmark program',
+            'Institution_Hidden': 'Benchmark',
+            'Lead_Source': 'Open edX API',
+        }},
+    )
+    course_ids = [SALESFORCE_COURSE_ID.format(number) for number in range(options['order_lines'])]
+
+    for course_id in course_ids:
+        add_course(course_id, {'salesforce_data': {'Program_Name': 'Benchmark program'}})
+
+    controller = SalesforceEnrollment()
+
+    def operation(iteration):
+        """
+        Build the payload of the order of the learner.
+        """
+        email = 'learner{}@example.com'.format(iteration)
+        controller._get_enrollment_data({  # pylint: disable=protected-access
+            'program': {'uuid': SALESFORCE_BUNDLE_ID},
+            'paid_amount': 100,
+            'currency': 'USD',
+            'supported_lines': [{'user_email': email, 'course_id': course_id} for course_id in course_ids],
+        }, {})
+
+    return operation
+
+
+def setup_greenfig_roster(server, options):  # pylint: disable=unused-argument
+    """
+    Enroll in a greenfig course, downloading the roster and uploading it with the new line.
+    """
+    configure_site(server)
+    course = add_course(GREENFIG_COURSE_ID, {
+        'external_platform_target': 'greenfig',
+        'external_course_run_id': 'GF-2020',
+    })
+    controller = GreenfigInstanceExternalEnrollment()
+
+    def operation(iteration):
+        """
+        Upload the roster with the line of the learner.
+        """
+        controller._post_enrollment(  # pylint: disable=protected-access
+            get_enrollment_data(iteration),
+            course.other_course_settings,
+        )
+
+    return operation
+
+
+SCENARIOS = OrderedDict([
+    ('execute_external_enrollment', setup_execute_external_enrollment),
+    ('external_enrollment_view', setup_external_enrollment_view),
+    ('salesforce_enrollment_data', setup_salesforce_enrollment_data),
+    ('greenfig_roster', setup_greenfig_roster),
+])
@@ -0,0 +1,35 @@
+"""
+Django settings of the enrollment benchmarks.
+"""
+
+from __future__ import unicode_literals
+
+from openedx_external_enrollments.settings.test import *  # pylint: disable=wildcard-import,unused-wildcard-import
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+}
+
+OEE_COURSEWARE_BACKEND = 'openedx_external_enrollments.tests.benchmarks.backends'
+OEE_SITE_CONFIGURATION_BACKEND = 'openedx_external_enrollments.tests.benchmarks.backends'
+OEE_STUDENT_BACKEND = 'openedx_external_enrollments.tests.benchmarks.backends'
+
+DROPBOX_API_DOWNLOAD_URL = '/files/download'
+DROPBOX_API_UPLOAD_URL = '/files/upload'
+DROPBOX_API_ARG_DOWNLOAD = '{"path": "%s"}'
+DROPBOX_API_ARG_UPLOAD = '{"path": "%s", "mode": "overwrite"}'
+
+SALESFORCE_ENROLLMENT_API_PATH = 'services/apexrest/enrollment'
+
+# The stub platforms fail on purpose, the circuits must stay closed to measure every request.
+OEE_CIRCUIT_BREAKER_SETTINGS = {'default': {'enabled': False}}
+OEE_HTTP_SESSION_SETTINGS = {'default': {'max_retries': 0}}
+
+# The production default, so the Salesforce scenarios read the program metadata from the cache.
+OEE_PROGRAM_METADATA_CACHE_TIMEOUT = 3600
+
+# The greenfig_roster scenario measures the direct roster upload, not the queued lines.
+GREENFIG_ROSTER_SETTINGS = dict(GREENFIG_ROSTER_SETTINGS, buffered=False)
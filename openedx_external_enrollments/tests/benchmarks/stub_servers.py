@@ -0,0 +1,163 @@
+"""
+Local HTTP servers standing in for the external platforms during the benchmarks.
+
+Every server answers the POST requests after the configured latency and fails the configured
+fraction of them with a 503, the random failures are seeded so runs are comparable.
+"""
+import json
+import random
+import threading
+import time
+
+from six.moves import BaseHTTPServer, socketserver
+
+DOWNLOAD_PATH = '/files/download'
+UPLOAD_PATH = '/files/upload'
+TOKEN_PATH = '/oauth2/token'
+
+
+class ThreadedHTTPServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """
+    HTTP server handling every request in its own thread.
+    """
+    daemon_threads = True
+
+
+class StubProviderHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """
+    Request handler answering like the external platforms.
+
+    The connections are kept alive, so the headers and the body are buffered and sent in one
+    write, flushed when the request is handled, with Nagle's algorithm disabled. Otherwise the
+    delayed ACK of the client adds a ~40ms floor to every response.
+    """
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    wbufsize = -1
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """
+        Answer the request after the latency of the server.
+        """
+        length = int(self.headers.get('Content-Length') or 0)
+
+        if length:
+            self.rfile.read(length)
+
+        stub = self.server.stub
+        time.sleep(stub.get_latency())
+
+        if stub.should_fail():
+            self._send_json(503, {'error': 'Service unavailable.'})
+        elif self.path.startswith(DOWNLOAD_PATH):
+            self._send(200, stub.roster.encode('utf-8'), 'application/octet-stream', {
+                'Dropbox-API-Result': json.dumps({'rev': 'benchmark-rev'}),
+            })
+        elif self.path.startswith(UPLOAD_PATH):
+            self._send_json(200, {'rev': 'benchmark-rev', 'path_display': '/courses.txt'})
+        elif self.path.startswith(TOKEN_PATH):
+            self._send_json(200, {
+                'access_token': 'benchmark-token',
+                'token_type': 'Bearer',
+                'expires_in': 3600,
+                'instance_url': stub.url,
+            })
+        else:
+            self._send_json(200, {'is_active': True, 'mode': 'verified'})
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """
+        Don't log the requests.
+        """
+
+    def _send_json(self, status_code, body):
+        """
+        Send the JSON body.
+        """
+        self._send(status_code, json.dumps(body).encode('utf-8'), 'application/json')
+
+    def _send(self, status_code, body, content_type, headers=None):
+        """
+        Send the response.
+        """
+        self.send_response(status_code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubProviderServer(object):
+    """
+    Stub of an external platform listening on a free local port.
+
+    Args:
+        latency: seconds waited before answering every request.
+        jitter: maximum seconds randomly added to the latency.
+        error_rate: fraction of the requests answered with a 503.
+        roster_lines: number of lines of the roster returned by the dropbox download.
+        seed: seed of the random latency and failures.
+    """
+
+    def __init__(self, latency=0, jitter=0, error_rate=0, roster_lines=0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.roster = u''.join(
+            u'01-01-2020 00:00:00, Learner {0}, Learner, {0}, learner{0}@example.com, GF-{0}, true\n'.format(number)
+            for number in range(roster_lines)
+        )
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadedHTTPServer(('127.0.0.1', 0), StubProviderHandler)
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        """
+        Root url of the server.
+        """
+        return 'http://127.0.0.1:{}'.format(self._server.server_address[1])
+
+    def get_latency(self):
+        """
+        Return the seconds to wait before answering the next request.
+        """
+        with self._lock:
+            return self.latency + self._random.uniform(0, self.jitter)
+
+    def should_fail(self):
+        """
+        Return whether the next request must fail.
+        """
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def start(self):
+        """
+        Serve the requests in a background thread.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+
+        return self
+
+    def stop(self):
+        """
+        Stop serving and release the port.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
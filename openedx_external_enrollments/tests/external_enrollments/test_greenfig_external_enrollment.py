@@ -1,20 +1,32 @@
 """Tests EdxInstanceExternalEnrollment class file."""
 from django.conf import settings
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from mock import Mock, patch
+from rest_framework import status
 
 from openedx_external_enrollments.external_enrollments.greenfig_external_enrollment import (
+    ROSTER_FLUSH_LOCK_KEY,
     GreenfigInstanceExternalEnrollment,
+    get_roster_settings,
 )
+from openedx_external_enrollments.models import EnrollmentRequestLog, GreenfigRosterLine
+
+MODULE = 'openedx_external_enrollments.external_enrollments.greenfig_external_enrollment'
 
 
 class GreenfigInstanceExternalEnrollmentTest(TestCase):
     """Test class for GreenfigInstanceExternalEnrollment."""
 
-    @patch('openedx_external_enrollments.external_enrollments.greenfig_external_enrollment.configuration_helpers')
-    def setUp(self, configuration_helpers_mock):  # pylint: disable=arguments-differ
+    @patch('openedx_external_enrollments.external_enrollments.greenfig_external_enrollment.get_site_settings')
+    def setUp(self, site_settings_mock):  # pylint: disable=arguments-differ
         """setUp."""
-        configuration_helpers_mock.get_value.return_value = 'setting_value'
+        site_settings_mock.return_value = Mock(
+            dropbox_api_url='setting_value',
+            dropbox_file_path='setting_value',
+            dropbox_token='setting_value',
+            site_key='1',
+        )
         self.base = GreenfigInstanceExternalEnrollment()
 
     @patch('openedx_external_enrollments.external_enrollments.greenfig_external_enrollment.get_user')
@@ -74,8 +86,8 @@ class GreenfigInstanceExternalEnrollmentTest(TestCase):
         }
         self.assertEqual(self.base._get_download_headers(), expected_headers)  # pylint: disable=protected-access
 
-    @patch('openedx_external_enrollments.external_enrollments.greenfig_external_enrollment.requests.post')
-    def test_execute_post(self, mock_post):
+    @patch('openedx_external_enrollments.external_enrollments.greenfig_external_enrollment.get_session')
+    def test_execute_post(self, get_session_mock):
         """Testing _execute_post method."""
         url = 'test_url'
         data = 'data'
@@ -89,10 +101,12 @@ class GreenfigInstanceExternalEnrollmentTest(TestCase):
             json_data=json_data,
         )
 
-        mock_post.assert_called_with(
+        get_session_mock.assert_called_with('greenfig')
+        get_session_mock.return_value.post.assert_called_with(
             url=url,
             data=json_data,
             headers=headers,
+            timeout=(5, 30),
         )
 
     def test_str(self):
@@ -104,3 +118,121 @@ class GreenfigInstanceExternalEnrollmentTest(TestCase):
             'greenfig',
             self.base.__str__(),
         )
+
+    @override_settings(GREENFIG_ROSTER_SETTINGS={'buffered': True})
+    @patch('{}.transaction'.format(MODULE))
+    @patch.object(GreenfigInstanceExternalEnrollment, '_get_roster_line')
+    def test_post_enrollment_buffered(self, get_roster_line_mock, transaction_mock):
+        """Test _post_enrollment queues the roster line and schedules a single flush."""
+        cache.clear()
+        get_roster_line_mock.return_value = 'test-line\n'
+
+        response = self.base._post_enrollment({}, {})  # pylint: disable=protected-access
+        self.base._post_enrollment({}, {})  # pylint: disable=protected-access
+
+        self.assertEqual(response[1], status.HTTP_202_ACCEPTED)
+        self.assertEqual(
+            list(GreenfigRosterLine.objects.values_list('site_key', 'file_path', 'line')),  # pylint: disable=no-member
+            [('1', 'setting_value', 'test-line\n'), ('1', 'setting_value', 'test-line\n')],
+        )
+        transaction_mock.on_commit.assert_called_once()
+
+        with patch('{}.current_app'.format(MODULE)) as current_app_mock:
+            transaction_mock.on_commit.call_args[0][0]()
+
+        current_app_mock.send_task.assert_called_once_with(
+            'openedx_external_enrollments.tasks.flush_greenfig_roster',
+            kwargs={'site_key': '1', 'file_path': 'setting_value'},
+            countdown=get_roster_settings()['flush_interval'],
+        )
+
+        self.base.clear_scheduled_flush()
+        self.base._post_enrollment({}, {})  # pylint: disable=protected-access
+
+        self.assertEqual(transaction_mock.on_commit.call_count, 2)
+
+    @patch.object(GreenfigInstanceExternalEnrollment, '_execute_post')
+    @patch.object(GreenfigInstanceExternalEnrollment, '_get_course_list')
+    def test_flush_roster(self, get_course_list_mock, post_mock):
+        """Test flush_roster uploads the pending lines of its site once, retrying on revision conflicts."""
+        for index in range(3):
+            GreenfigRosterLine.objects.create(  # pylint: disable=no-member
+                site_key='1',
+                file_path='setting_value',
+                line=u'line-{}\n'.format(index),
+            )
+
+        GreenfigRosterLine.objects.create(  # pylint: disable=no-member
+            site_key='2',
+            file_path='setting_value',
+            line=u'other-site\n',
+        )
+
+        first_download = Mock(status_code=status.HTTP_200_OK, text=u'old\n', headers={
+            'Dropbox-API-Result': '{"rev": "rev-1"}',
+        })
+        second_download = Mock(status_code=status.HTTP_200_OK, text=u'old\nother\n', headers={
+            'Dropbox-API-Result': '{"rev": "rev-2"}',
+        })
+        get_course_list_mock.side_effect = [first_download, second_download]
+        post_mock.side_effect = [
+            Mock(ok=False, status_code=status.HTTP_409_CONFLICT),
+            Mock(ok=True, status_code=status.HTTP_200_OK, **{'json.return_value': {'rev': 'rev-3'}}),
+        ]
+
+        self.assertEqual(self.base.flush_roster(), 2)
+
+        self.assertEqual(post_mock.call_count, 2)
+        last_upload = post_mock.call_args[1]
+        self.assertEqual(last_upload['json_data'], b'old\nother\nline-0\nline-1\n')
+        self.assertEqual(
+            last_upload['headers']['Dropbox-API-Arg'],
+            settings.DROPBOX_API_ARG_UPDATE % ('setting_value', 'rev-2'),
+        )
+        self.assertEqual(
+            list(GreenfigRosterLine.objects.values_list('line', flat=True)),  # pylint: disable=no-member
+            [u'line-2\n', u'other-site\n'],
+        )
+        self.assertTrue(self.base.has_pending_lines())
+        self.assertEqual(EnrollmentRequestLog.objects.count(), 1)  # pylint: disable=no-member
+
+    @patch.object(GreenfigInstanceExternalEnrollment, '_execute_post')
+    @patch.object(GreenfigInstanceExternalEnrollment, '_get_course_list')
+    def test_flush_roster_new_file(self, get_course_list_mock, post_mock):
+        """Test flush_roster creates the roster when it doesn't exist and keeps the lines on errors."""
+        GreenfigRosterLine.objects.create(  # pylint: disable=no-member
+            site_key='1',
+            file_path='setting_value',
+            line=u'line\n',
+        )
+        get_course_list_mock.return_value = Mock(
+            status_code=status.HTTP_409_CONFLICT,
+            text=u'{"error_summary": "path/not_found/"}',
+        )
+        post_mock.return_value = Mock(ok=False, status_code=status.HTTP_400_BAD_REQUEST, text='test-error')
+
+        self.assertEqual(self.base.flush_roster(), 0)
+
+        self.assertEqual(
+            post_mock.call_args[1]['headers']['Dropbox-API-Arg'],
+            settings.DROPBOX_API_ARG_ADD % 'setting_value',
+        )
+        self.assertEqual(GreenfigRosterLine.objects.count(), 1)  # pylint: disable=no-member
+
+    @patch.object(GreenfigInstanceExternalEnrollment, '_flush_roster_lines')
+    def test_flush_roster_lock_taken_over(self, flush_lines_mock):
+        """Test a flush whose lock expired keeps the lock of the flush that took it over."""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        lock_key = ROSTER_FLUSH_LOCK_KEY.format(site='1', file_path='setting_value')
+
+        def take_over_lock():
+            """Replace the lock as another flush would after it expired."""
+            cache.set(lock_key, 'other-flush')
+            return 1
+
+        flush_lines_mock.side_effect = take_over_lock
+
+        self.assertEqual(self.base.flush_roster(), 1)
+        self.assertEqual(cache.get(lock_key), 'other-flush')
+        self.assertEqual(self.base.flush_roster(), 0)
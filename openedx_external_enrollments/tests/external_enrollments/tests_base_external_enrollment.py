@@ -1,27 +1,46 @@
 """Tests BaseExternalEnrollment class file."""
+import io
+import json
 import logging
 
+import requests
 from django.test import TestCase
 from mock import patch
 from rest_framework import status
 from testfixtures import LogCapture
 
+from openedx_external_enrollments.exceptions import CircuitOpenError, RetryableEnrollmentError, ThrottledEnrollmentError
 from openedx_external_enrollments.external_enrollments.base_external_enrollment import BaseExternalEnrollment
 from openedx_external_enrollments.models import EnrollmentRequestLog
 
 module = 'openedx_external_enrollments.external_enrollments.base_external_enrollment'
 
 
+def build_response(status_code, body, headers=None):
+    """Return a streamed response with the given JSON object or raw bytes body."""
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response.raw = io.BytesIO(body if isinstance(body, bytes) else json.dumps(body).encode('utf-8'))
+    return response
+
+
+class TestExternalEnrollment(BaseExternalEnrollment):  # pylint: disable=abstract-method
+    """Controller with a fixed name, the rest of the methods are the base ones."""
+
+    def __str__(self):
+        return 'test-class'
+
+
 class BaseExternalEnrollmentTest(TestCase):
     """Test class for BaseExternalEnrollment class."""
 
     def setUp(self):
         """Set test database."""
-        self.base = BaseExternalEnrollment()
-        self.base.__str__ = lambda: 'test-class'
+        self.base = TestExternalEnrollment()
 
-    @patch('openedx_external_enrollments.external_enrollments.base_external_enrollment.requests.post')
-    def test_execute_post(self, mock_post):
+    @patch('openedx_external_enrollments.external_enrollments.base_external_enrollment.get_session')
+    def test_execute_post(self, get_session_mock):
         """Testing _execute_post method."""
         url = 'test_url'
         data = 'data'
@@ -34,11 +53,14 @@ class BaseExternalEnrollmentTest(TestCase):
             headers=headers,
             json_data=json_data,
         )
-        mock_post.assert_called_with(
+        get_session_mock.assert_called_with(str(self.base))
+        get_session_mock.return_value.post.assert_called_with(
             url=url,
             data=data,
             headers=headers,
             json=json_data,
+            timeout=(5, 30),
+            stream=True,
         )
 
     @patch.object(BaseExternalEnrollment, '_get_enrollment_url')
@@ -53,7 +75,7 @@ class BaseExternalEnrollmentTest(TestCase):
         course_settings = {'course': 'settings'}
         url_mock.return_value = url
         data_mock.return_value = data
-        post_mock.return_value.json.return_value = data
+        post_mock.side_effect = lambda **kwargs: build_response(status.HTTP_200_OK, data)
         headers_mock.return_value = headers
 
         log1 = 'calling enrollment for [{}] with data: {}'.format(self.base.__str__(), data)
@@ -62,7 +84,7 @@ class BaseExternalEnrollmentTest(TestCase):
 
         with LogCapture(level=logging.INFO) as log_capture:
             response = self.base._post_enrollment(data, course_settings)  # pylint: disable=protected-access
-            log4 = 'External enrollment response for [{}] -- {}'.format(self.base.__str__(), data)
+            log4 = 'External enrollment response for [{}] -- {}'.format(self.base.__str__(), response[0])
             log_capture.check(
                 (module, 'INFO', log1),
                 (module, 'INFO', log2),
@@ -91,6 +113,9 @@ class BaseExternalEnrollmentTest(TestCase):
             details=log_details,
         )
         self.assertEqual(len(request_log), 1)
+        self.assertEqual(request_log[0].http_status, status.HTTP_200_OK)
+        self.assertTrue(request_log[0].success)
+        self.assertIsNotNone(request_log[0].duration)
 
         headers_mock.side_effect = NotImplementedError('My test error')
 
@@ -111,6 +136,96 @@ class BaseExternalEnrollmentTest(TestCase):
         )
         self.assertEqual(len(request_log), 1)
 
+    @patch('{}.increment'.format(module))
+    @patch.object(BaseExternalEnrollment, '_get_enrollment_url')
+    @patch.object(BaseExternalEnrollment, '_get_enrollment_headers')
+    @patch.object(BaseExternalEnrollment, '_get_enrollment_data')
+    @patch.object(BaseExternalEnrollment, '_execute_post')
+    def test_post_enrollment_metrics(self, post_mock, data_mock, headers_mock, url_mock, increment_mock):
+        """Testing the timings of every step are stored in the request log and the outcome is counted."""
+        url_mock.return_value = 'https://fake-testing.com'
+        data_mock.return_value = {'test': 'data'}
+        headers_mock.return_value = {'headers': 'test'}
+        post_mock.side_effect = lambda **kwargs: build_response(status.HTTP_200_OK, {'test': 'data'})
+
+        self.base._post_enrollment({'user_email': 'test@email.com'})  # pylint: disable=protected-access
+
+        request_log = EnrollmentRequestLog.objects.get()  # pylint: disable=no-member
+        self.assertEqual(sorted(request_log.timings), ['auth_time', 'http_time', 'payload_build_time'])
+        increment_mock.assert_called_once_with('enrollment_requests', controller='test-class', outcome='success')
+
+    @patch.object(BaseExternalEnrollment, '_invalidate_auth_token')
+    @patch.object(BaseExternalEnrollment, '_get_enrollment_url')
+    @patch.object(BaseExternalEnrollment, '_get_enrollment_headers')
+    @patch.object(BaseExternalEnrollment, '_get_enrollment_data')
+    @patch.object(BaseExternalEnrollment, '_execute_post')
+    def test_post_enrollment_unauthorized(self, post_mock, data_mock, headers_mock, url_mock, invalidate_mock):
+        """Testing _post_enrollment renews the token once after a 401 response."""
+        data = {'test': 'data'}
+        url_mock.return_value = 'https://fake-testing.com'
+        data_mock.return_value = data
+        headers_mock.return_value = {'headers': 'test'}
+        post_mock.side_effect = lambda **kwargs: build_response(status.HTTP_401_UNAUTHORIZED, data)
+        invalidate_mock.return_value = True
+
+        self.base._post_enrollment(data, {})  # pylint: disable=protected-access
+
+        invalidate_mock.assert_called_once_with()
+        self.assertEqual(post_mock.call_count, 2)
+        self.assertEqual(headers_mock.call_count, 2)
+
+        invalidate_mock.return_value = False
+        post_mock.reset_mock()
+
+        self.base._post_enrollment(data, {})  # pylint: disable=protected-access
+
+        post_mock.assert_called_once()
+
+    @patch.object(BaseExternalEnrollment, '_get_enrollment_url')
+    @patch.object(BaseExternalEnrollment, '_get_enrollment_headers')
+    @patch.object(BaseExternalEnrollment, '_get_enrollment_data')
+    @patch.object(BaseExternalEnrollment, '_execute_post')
+    def test_post_enrollment_retryable(self, post_mock, data_mock, headers_mock, url_mock):  # noqa pylint: disable=unused-argument
+        """Testing transient failures raise RetryableEnrollmentError only when requested."""
+        url_mock.return_value = 'https://fake-testing.com'
+        data_mock.return_value = {'test': 'data'}
+        post_mock.return_value = build_response(
+            status.HTTP_429_TOO_MANY_REQUESTS,
+            b'rate limited',
+            headers={'Retry-After': '30'},
+        )
+
+        with self.assertRaises(RetryableEnrollmentError) as context:
+            self.base._post_enrollment({}, {}, raise_on_retryable=True)  # pylint: disable=protected-access
+
+        self.assertEqual(context.exception.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(context.exception.retry_after, 30)
+
+        post_mock.return_value = build_response(status.HTTP_503_SERVICE_UNAVAILABLE, b'<html>down</html>')
+
+        with self.assertRaises(RetryableEnrollmentError) as context:
+            self.base._post_enrollment({}, {}, raise_on_retryable=True)  # pylint: disable=protected-access
+
+        self.assertIsNone(context.exception.retry_after)
+
+        post_mock.side_effect = requests.ConnectionError('test-connection-error')
+
+        with self.assertRaises(RetryableEnrollmentError):
+            self.base._post_enrollment({}, {}, raise_on_retryable=True)  # pylint: disable=protected-access
+
+        self.assertEqual(
+            self.base._post_enrollment({}, {}),  # pylint: disable=protected-access
+            ('test-connection-error', status.HTTP_400_BAD_REQUEST),
+        )
+
+        post_mock.side_effect = ValueError('test-error')
+
+        self.assertEqual(
+            self.base._post_enrollment({}, {}, raise_on_retryable=True),  # pylint: disable=protected-access
+            ('test-error', status.HTTP_400_BAD_REQUEST),
+        )
+        self.assertEqual(EnrollmentRequestLog.objects.count(), 5)  # pylint: disable=no-member
+
     def test_get_enrollment_data(self):
         """Testing _get_enrollment_data method."""
         with self.assertRaises(NotImplementedError):
@@ -124,3 +239,145 @@ class BaseExternalEnrollmentTest(TestCase):
         """Testing _get_enrollment_url method."""
         with self.assertRaises(NotImplementedError):
             self.base._get_enrollment_url({})  # pylint: disable=protected-access
+
+    @patch.object(BaseExternalEnrollment, '_get_enrollment_url')
+    @patch.object(BaseExternalEnrollment, '_get_enrollment_headers')
+    @patch.object(BaseExternalEnrollment, '_get_enrollment_data')
+    @patch.object(BaseExternalEnrollment, '_execute_post')
+    def test_post_enrollment_log_fields(self, post_mock, data_mock, headers_mock, url_mock):  # noqa pylint: disable=unused-argument
+        """Testing the learner, the course and the outcome are stored in the indexed columns."""
+        data = {'user_email': 'Test@Email.com ', 'course_id': 'course-v1:test+CS102+2019_T3'}
+        url_mock.return_value = 'https://fake-testing.com'
+        data_mock.return_value = data
+        post_mock.return_value = build_response(status.HTTP_404_NOT_FOUND, {})
+
+        self.base._post_enrollment(data, {})  # pylint: disable=protected-access
+
+        request_log = EnrollmentRequestLog.objects.get()  # pylint: disable=no-member
+        self.assertEqual(request_log.user_email_hash, EnrollmentRequestLog.hash_email('test@email.com'))
+        self.assertEqual(request_log.course_id, 'course-v1:test+CS102+2019_T3')
+        self.assertEqual(request_log.http_status, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(request_log.success)
+
+    @patch.object(BaseExternalEnrollment, '_get_enrollment_url')
+    @patch.object(BaseExternalEnrollment, '_get_enrollment_headers')
+    @patch.object(BaseExternalEnrollment, '_get_enrollment_data')
+    @patch.object(BaseExternalEnrollment, '_execute_post')
+    def test_post_enrollment_idempotency_key(self, post_mock, data_mock, headers_mock, url_mock):
+        """Testing the idempotency key of the enrollment is sent in the request headers."""
+        url_mock.return_value = 'https://fake-testing.com'
+        data_mock.return_value = {'test': 'data'}
+        headers_mock.return_value = {'headers': 'test'}
+        post_mock.return_value = build_response(status.HTTP_200_OK, {})
+
+        self.base._post_enrollment({'idempotency_key': 'test-key'}, {})  # pylint: disable=protected-access
+
+        post_mock.assert_called_once_with(
+            url='https://fake-testing.com',
+            headers={'headers': 'test', 'Idempotency-Key': 'test-key'},
+            json_data={'test': 'data'},
+        )
+        self.assertEqual(headers_mock.return_value, {'headers': 'test'})
+
+    @patch.object(BaseExternalEnrollment, '_get_enrollment_url')
+    @patch.object(BaseExternalEnrollment, '_get_enrollment_headers')
+    @patch.object(BaseExternalEnrollment, '_get_enrollment_data')
+    @patch.object(BaseExternalEnrollment, '_execute_post')
+    def test_post_enrollment_server_error(self, post_mock, data_mock, headers_mock, url_mock):  # noqa pylint: disable=unused-argument
+        """Testing error pages are logged truncated and their status is returned."""
+        url_mock.return_value = 'https://fake-testing.com'
+        data_mock.return_value = {}
+        post_mock.return_value = build_response(status.HTTP_502_BAD_GATEWAY, b'<html>' + b'x' * 100 + b'</html>')
+
+        with self.settings(OEE_RESPONSE_MAX_SIZE=10):
+            response = self.base._post_enrollment({}, {})  # pylint: disable=protected-access
+
+        self.assertEqual(response, ('<html>xxxx', status.HTTP_502_BAD_GATEWAY))
+        request_log = EnrollmentRequestLog.objects.get()  # pylint: disable=no-member
+        self.assertEqual(request_log.details['response'], '<html>xxxx')
+        self.assertTrue(request_log.details['response_truncated'])
+        self.assertEqual(request_log.http_status, status.HTTP_502_BAD_GATEWAY)
+        self.assertFalse(request_log.success)
+
+    @patch('{}.CircuitBreaker'.format(module))
+    @patch.object(BaseExternalEnrollment, '_get_enrollment_headers')
+    @patch.object(BaseExternalEnrollment, '_execute_post')
+    def test_send_enrollment_request_circuit_open(self, post_mock, headers_mock, circuit_breaker_mock):  # noqa pylint: disable=unused-argument
+        """Testing the requests are rejected without reaching the provider while the circuit is open."""
+        circuit_breaker = circuit_breaker_mock.return_value
+        circuit_breaker.allow_request.return_value = False
+        circuit_breaker.get_retry_after.return_value = 12
+
+        response = self.base._send_enrollment_request('https://fake-testing.com', {})  # noqa pylint: disable=protected-access
+
+        self.assertEqual(response[1], status.HTTP_503_SERVICE_UNAVAILABLE)
+        post_mock.assert_not_called()
+        self.assertFalse(EnrollmentRequestLog.objects.get().success)  # pylint: disable=no-member
+
+        with self.assertRaises(CircuitOpenError) as context:
+            self.base._send_enrollment_request(  # pylint: disable=protected-access
+                'https://fake-testing.com',
+                {},
+                raise_on_retryable=True,
+            )
+
+        self.assertEqual(context.exception.retry_after, 12)
+
+    @patch('{}.CircuitBreaker'.format(module))
+    @patch.object(BaseExternalEnrollment, '_get_enrollment_headers')
+    @patch.object(BaseExternalEnrollment, '_execute_post')
+    def test_send_enrollment_request_circuit_outcome(self, post_mock, headers_mock, circuit_breaker_mock):  # noqa pylint: disable=unused-argument
+        """Testing retryable responses and connection errors count as failures, the rest as successes."""
+        circuit_breaker = circuit_breaker_mock.return_value
+        circuit_breaker.allow_request.return_value = True
+        url = 'https://fake-testing.com'
+
+        post_mock.return_value = build_response(status.HTTP_400_BAD_REQUEST, {'error': 'invalid'})
+        self.base._send_enrollment_request(url, {})  # pylint: disable=protected-access
+        circuit_breaker.record_success.assert_called_once_with()
+
+        post_mock.return_value = build_response(status.HTTP_503_SERVICE_UNAVAILABLE, b'down')
+        self.base._send_enrollment_request(url, {})  # pylint: disable=protected-access
+        post_mock.side_effect = requests.ConnectionError('refused')
+        self.base._send_enrollment_request(url, {})  # pylint: disable=protected-access
+        self.assertEqual(circuit_breaker.record_failure.call_count, 2)
+
+    @patch('{}.RateLimiter'.format(module))
+    @patch.object(BaseExternalEnrollment, '_execute_post')
+    def test_send_enrollment_request_throttled(self, post_mock, rate_limiter_mock):
+        """Testing throttled requests aren't sent and don't release a slot they didn't take."""
+        rate_limiter = rate_limiter_mock.return_value
+        rate_limiter.acquire.return_value = 0.5
+
+        response = self.base._send_enrollment_request('https://fake-testing.com', {})  # noqa pylint: disable=protected-access
+
+        self.assertEqual(response[1], status.HTTP_429_TOO_MANY_REQUESTS)
+
+        with self.assertRaises(ThrottledEnrollmentError) as context:
+            self.base._send_enrollment_request(  # pylint: disable=protected-access
+                'https://fake-testing.com',
+                {},
+                raise_on_retryable=True,
+            )
+
+        self.assertEqual(context.exception.retry_after, 0.5)
+        post_mock.assert_not_called()
+        rate_limiter.release.assert_not_called()
+
+    @patch('{}.RateLimiter'.format(module))
+    @patch.object(BaseExternalEnrollment, '_get_enrollment_headers')
+    @patch.object(BaseExternalEnrollment, '_execute_post')
+    def test_send_enrollment_request_releases_slot(self, post_mock, headers_mock, rate_limiter_mock):  # noqa pylint: disable=unused-argument
+        """Testing the in-flight slot is released once the request finishes."""
+        rate_limiter = rate_limiter_mock.return_value
+        rate_limiter.acquire.return_value = 0
+        post_mock.return_value = build_response(status.HTTP_503_SERVICE_UNAVAILABLE, b'down')
+
+        with self.assertRaises(RetryableEnrollmentError):
+            self.base._send_enrollment_request(  # pylint: disable=protected-access
+                'https://fake-testing.com',
+                {},
+                raise_on_retryable=True,
+            )
+
+        rate_limiter.release.assert_called_once_with()
@@ -3,8 +3,9 @@ import logging
 from collections import OrderedDict
 
 from django.conf import settings
+from django.core.cache import cache
 from django.test import TestCase
-from mock import patch
+from mock import call, patch
 from testfixtures import LogCapture
 
 from openedx_external_enrollments.external_enrollments.edx_enterprise_external_enrollment import (
@@ -20,6 +21,7 @@ class EdxEnterpriseExternalEnrollmentTest(TestCase):
     def setUp(self):
         """Set test database."""
         self.base = EdxEnterpriseExternalEnrollment()
+        cache.clear()
 
     def test_get_enrollment_data(self):
         """Testing _get_enrollment_data method."""
@@ -89,6 +91,10 @@ class EdxEnterpriseExternalEnrollmentTest(TestCase):
         self.assertEqual(self.base._get_enrollment_headers(), expected_headers)  # pylint: disable=protected-access
         post_mock.assert_called_with(settings.EDX_ENTERPRISE_API_TOKEN_URL, data)
 
+        self.assertEqual(self.base._get_enrollment_headers(), expected_headers)  # pylint: disable=protected-access
+        post_mock.assert_called_once()
+
+        self.base._invalidate_auth_token()  # pylint: disable=protected-access
         post_mock.return_value.ok = False
         self.assertIsNone(self.base._get_enrollment_headers())  # pylint: disable=protected-access
 
@@ -99,6 +105,77 @@ class EdxEnterpriseExternalEnrollmentTest(TestCase):
                 (module, 'ERROR', 'Failed to get token: test-exception'),
             )
 
+    @patch.object(EdxEnterpriseExternalEnrollment, '_send_enrollment_request')
+    def test_post_bulk_enrollment(self, send_mock):
+        """Testing _post_bulk_enrollment sends the enrollments in chunks."""
+        course_settings = {'external_course_run_id': 'test_course_run_id'}
+        enrollments = [
+            ({'user_email': 'email-{}'.format(index), 'course_mode': 'audit'}, course_settings)
+            for index in range(3)
+        ]
+        send_mock.side_effect = [
+            ('first-chunk', 200),
+            ('second-chunk', 200),
+        ]
+
+        results = self.base._post_bulk_enrollment(enrollments)  # pylint: disable=protected-access
+
+        self.assertEqual(results, [('first-chunk', 200), ('first-chunk', 200), ('second-chunk', 200)])
+        self.assertEqual(send_mock.call_count, 2)
+        url, first_payload = send_mock.call_args_list[0][0]
+        self.assertEqual(url, self.base._get_enrollment_url(course_settings={}))  # pylint: disable=protected-access
+        self.assertEqual([item['user_email'] for item in first_payload], ['email-0', 'email-1'])
+        self.assertEqual([item['user_email'] for item in send_mock.call_args_list[1][0][1]], ['email-2'])
+        self.assertEqual(send_mock.call_args_list[0][1], {'log_fields': {'course_id': None}})
+        self.assertEqual(
+            send_mock.call_args_list[1][1],
+            {'log_fields': {'user_email': 'email-2', 'course_id': None}},
+        )
+
+    @patch.object(EdxEnterpriseExternalEnrollment, '_post_enrollment')
+    @patch.object(EdxEnterpriseExternalEnrollment, '_send_enrollment_request')
+    def test_post_bulk_enrollment_rows(self, send_mock, post_enrollment_mock):
+        """Testing the result of every row is read from the response, and rejected chunks are sent row by row."""
+        course_settings = {'external_course_run_id': 'test_course_run_id'}
+        enrollments = [
+            ({'user_email': 'email-{}'.format(index), 'course_id': 'course'}, course_settings)
+            for index in range(4)
+        ]
+        send_mock.side_effect = [
+            ([{'user_email': 'email-0'}, {'user_email': 'email-1'}], 201),
+            ([{}, {'user_email': ['Enter a valid email address.']}], 400),
+        ]
+        post_enrollment_mock.side_effect = [
+            ({'user_email': 'email-2'}, 201),
+            ({'user_email': ['Enter a valid email address.']}, 400),
+        ]
+
+        results = self.base._post_bulk_enrollment(enrollments)  # pylint: disable=protected-access
+
+        self.assertEqual(results, [
+            ({'user_email': 'email-0'}, 201),
+            ({'user_email': 'email-1'}, 201),
+            ({'user_email': 'email-2'}, 201),
+            ({'user_email': ['Enter a valid email address.']}, 400),
+        ])
+        self.assertEqual(send_mock.call_args_list[0][1], {'log_fields': {'course_id': 'course'}})
+        post_enrollment_mock.assert_has_calls([
+            call(enrollments[2][0], course_settings),
+            call(enrollments[3][0], course_settings),
+        ])
+
+    @patch.object(EdxEnterpriseExternalEnrollment, '_post_enrollment')
+    @patch.object(EdxEnterpriseExternalEnrollment, '_send_enrollment_request')
+    def test_post_bulk_enrollment_failed_chunk(self, send_mock, post_enrollment_mock):
+        """Testing chunks failed by the connection or the provider are not sent row by row."""
+        enrollments = [({'user_email': 'email-{}'.format(index)}, {}) for index in range(2)]
+        send_mock.return_value = ('Connection refused', 400)
+
+        results = self.base._post_bulk_enrollment(enrollments)  # pylint: disable=protected-access
+
+        self.assertEqual(results, [('Connection refused', 400)] * 2)
+        post_enrollment_mock.assert_not_called()
+
     def test_get_enrollment_url(self):
         """Testing _get_enrollment_url method."""
         expected_url = '{}/enterprise-customer/{}/course-enrollments'.format(
@@ -1,11 +1,18 @@
 """Tests External enrollments file."""
 import logging
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from mock import Mock, patch
 from testfixtures import LogCapture
 
-from openedx_external_enrollments.external_enrollments import execute_external_enrollment
+from openedx_external_enrollments.circuit_breakers import CircuitBreaker
+from openedx_external_enrollments.exceptions import CircuitOpenError, ThrottledEnrollmentError
+from openedx_external_enrollments.external_enrollments import (
+    EXTERNAL_ENROLLMENT_TASK,
+    HALF_OPEN_RETRY_DELAY,
+    execute_external_enrollment,
+)
 
 MODULE = 'openedx_external_enrollments.external_enrollments'
 
@@ -13,14 +20,14 @@ MODULE = 'openedx_external_enrollments.external_enrollments'
 class ExecuteExternalEnrollmentTest(TestCase):
     """Test class for execute_external_enrollment method."""
 
-    @patch('openedx_external_enrollments.external_enrollments.configuration_helpers')
-    def test_execute_external_enrollment(self, configuration_helpers_mock):
+    @patch('{}.get_site_settings'.format(MODULE))
+    def test_execute_external_enrollment(self, site_settings_mock):
         """Testing execute_external_enrollment method."""
         course = Mock()
         course.id = 'test-course-id'
         data = {'fake': 'data'}
         course.other_course_settings.get.return_value = 'edx'
-        configuration_helpers_mock.get_value.return_value = ['openedx']
+        site_settings_mock.return_value.valid_targets = frozenset(['openedx'])
 
         with LogCapture(level=logging.WARNING) as log_capture:
             execute_external_enrollment(data, course)
@@ -42,6 +49,7 @@ class ExecuteExternalEnrollmentTest(TestCase):
             controller_mock._post_enrollment.assert_called_once_with(  # pylint: disable=protected-access
                 data,
                 course.other_course_settings,
+                raise_on_retryable=True,
             )
             factory_mock.get_enrollment_controller.assert_called_once_with(
                 controller='openedx',
@@ -55,3 +63,78 @@ class ExecuteExternalEnrollmentTest(TestCase):
             log_capture.check(
                 (MODULE, 'ERROR', log),
             )
+
+    @override_settings(OEE_CIRCUIT_BREAKER_SETTINGS={'default': {'enabled': True, 'open_action': 'queue'}})
+    @patch('{}.current_app'.format(MODULE))
+    @patch('{}.ExternalEnrollmentFactory'.format(MODULE))
+    @patch('{}.get_site_settings'.format(MODULE))
+    def test_execute_external_enrollment_queued(self, site_settings_mock, factory_mock, app_mock):
+        """Testing the enrollment is enqueued while the circuit of the controller is open."""
+        cache.clear()
+        course = Mock(id='test-course-id', other_course_settings={'external_platform_target': 'openedx'})
+        data = {'fake': 'data'}
+        site_settings_mock.return_value.valid_targets = frozenset(['openedx'])
+        controller_mock = factory_mock.get_enrollment_controller.return_value
+        controller_mock.__str__ = lambda _: 'openedX'
+        CircuitBreaker('openedX').open()
+
+        execute_external_enrollment(data, course)
+
+        controller_mock._post_enrollment.assert_not_called()  # pylint: disable=protected-access
+        app_mock.send_task.assert_called_once_with(
+            EXTERNAL_ENROLLMENT_TASK,
+            args=('test-course-id', data),
+            countdown=30,
+        )
+
+    @patch('{}.current_app'.format(MODULE))
+    @patch('{}.ExternalEnrollmentFactory'.format(MODULE))
+    @patch('{}.get_site_settings'.format(MODULE))
+    def test_execute_external_enrollment_rejected(self, site_settings_mock, factory_mock, app_mock):
+        """Testing enrollments rejected by a half-open circuit are enqueued only with the queue open_action."""
+        cache.clear()
+        course = Mock(id='test-course-id', other_course_settings={'external_platform_target': 'openedx'})
+        data = {'fake': 'data'}
+        site_settings_mock.return_value.valid_targets = frozenset(['openedx'])
+        controller_mock = factory_mock.get_enrollment_controller.return_value
+        controller_mock.__str__ = lambda _: 'openedX'
+        controller_mock._post_enrollment.side_effect = CircuitOpenError(  # pylint: disable=protected-access
+            'half-open',
+            retry_after=0,
+        )
+
+        with override_settings(OEE_CIRCUIT_BREAKER_SETTINGS={'default': {'enabled': True}}):
+            execute_external_enrollment(data, course)
+
+        app_mock.send_task.assert_not_called()
+
+        with override_settings(OEE_CIRCUIT_BREAKER_SETTINGS={'default': {'enabled': True, 'open_action': 'queue'}}):
+            execute_external_enrollment(data, course)
+
+        app_mock.send_task.assert_called_once_with(
+            EXTERNAL_ENROLLMENT_TASK,
+            args=('test-course-id', data),
+            countdown=HALF_OPEN_RETRY_DELAY,
+        )
+
+    @patch('{}.current_app'.format(MODULE))
+    @patch('{}.ExternalEnrollmentFactory'.format(MODULE))
+    @patch('{}.get_site_settings'.format(MODULE))
+    def test_execute_external_enrollment_throttled(self, site_settings_mock, factory_mock, app_mock):
+        """Testing throttled enrollments are enqueued instead of dropped."""
+        course = Mock(id='test-course-id', other_course_settings={'external_platform_target': 'openedx'})
+        data = {'fake': 'data'}
+        site_settings_mock.return_value.valid_targets = frozenset(['openedx'])
+        controller_mock = factory_mock.get_enrollment_controller.return_value
+        controller_mock._post_enrollment.side_effect = ThrottledEnrollmentError(  # noqa pylint: disable=protected-access
+            'throttled',
+            retry_after=0.5,
+        )
+
+        execute_external_enrollment(data, course)
+
+        app_mock.send_task.assert_called_once_with(
+            EXTERNAL_ENROLLMENT_TASK,
+            args=('test-course-id', data),
+            countdown=0.5,
+        )
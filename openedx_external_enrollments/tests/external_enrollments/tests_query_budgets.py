@@ -0,0 +1,139 @@
+"""Tests the query budgets of the enrollment controllers."""
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from mock import Mock, patch
+from rest_framework import status
+
+from openedx_external_enrollments.external_enrollments.edx_enterprise_external_enrollment import (
+    EdxEnterpriseExternalEnrollment,
+)
+from openedx_external_enrollments.external_enrollments.edx_instance_external_enrollment import (
+    EdxInstanceExternalEnrollment,
+)
+from openedx_external_enrollments.external_enrollments.greenfig_external_enrollment import (
+    GreenfigInstanceExternalEnrollment,
+)
+from openedx_external_enrollments.external_enrollments.salesforce_external_enrollment import SalesforceEnrollment
+from openedx_external_enrollments.models import ProgramSalesforceEnrollment
+from openedx_external_enrollments.tests.benchmarks import backends
+from openedx_external_enrollments.tests.external_enrollments.tests_base_external_enrollment import build_response
+from openedx_external_enrollments.tests.query_budgets import (
+    SALESFORCE_ORDER_LINES,
+    QueryBudgetMixin,
+    profile_post_enrollment,
+)
+
+BACKENDS = 'openedx_external_enrollments.tests.benchmarks.backends'
+MODULE = 'openedx_external_enrollments.external_enrollments'
+TOKEN = {
+    'access_token': 'test-access-token',
+    'token_type': 'Bearer',
+    'expires_in': 3600,
+    'instance_url': 'https://salesforce.test',
+}
+
+
+@override_settings(OEE_COURSEWARE_BACKEND=BACKENDS, OEE_STUDENT_BACKEND=BACKENDS)
+@patch('{}.greenfig_external_enrollment.get_session'.format(MODULE))
+@patch('{}.base_external_enrollment.get_session'.format(MODULE))
+class QueryBudgetsTest(QueryBudgetMixin, TestCase):
+    """Test class for the query budgets of every controller."""
+
+    def setUp(self):
+        """Clear the cached tokens and set the enrollment data."""
+        cache.clear()
+        self.data = {
+            'user_email': 'learner@example.com',
+            'course_mode': 'verified',
+            'is_active': True,
+        }
+        self.course_settings = {'external_course_run_id': 'course-v1:external+run+2020'}
+
+    def tearDown(self):
+        """Drop the courses of the stub backends."""
+        backends.COURSES.clear()
+
+    def set_sessions(self, *session_mocks):
+        """Answer every provider request with a successful response."""
+        for session_mock in session_mocks:
+            session_mock.return_value.post.side_effect = lambda *args, **kwargs: build_response(
+                status.HTTP_200_OK,
+                TOKEN,
+            )
+
+    def test_edx_enterprise(self, base_session_mock, greenfig_session_mock):
+        """Testing the edX enterprise enrollment stays within its budget."""
+        self.set_sessions(base_session_mock, greenfig_session_mock)
+
+        _, profile = profile_post_enrollment(EdxEnterpriseExternalEnrollment(), self.data, self.course_settings)
+
+        self.assertWithinQueryBudget('edX', profile)
+
+    def test_edx_instance(self, base_session_mock, greenfig_session_mock):
+        """Testing the Open edX instance enrollment stays within its budget."""
+        self.set_sessions(base_session_mock, greenfig_session_mock)
+        self.course_settings['external_enrollment_api_url'] = 'https://openedx.test/api/enrollment/v1/enrollment'
+
+        _, profile = profile_post_enrollment(EdxInstanceExternalEnrollment(), self.data, self.course_settings)
+
+        self.assertWithinQueryBudget('openedX', profile)
+
+    @patch('{}.greenfig_external_enrollment.get_site_settings'.format(MODULE))
+    def test_greenfig(self, site_settings_mock, base_session_mock, greenfig_session_mock):
+        """Testing the greenfig roster upload stays within its budget, buffered or not."""
+        self.set_sessions(base_session_mock, greenfig_session_mock)
+        site_settings_mock.return_value = Mock(
+            dropbox_api_url='https://dropbox.test',
+            dropbox_file_path='/courses.txt',
+            dropbox_token='test-token',
+            site_key='default',
+        )
+        controller = GreenfigInstanceExternalEnrollment()
+
+        with override_settings(GREENFIG_ROSTER_SETTINGS={'buffered': False}):
+            _, profile = profile_post_enrollment(controller, self.data, self.course_settings)
+
+        self.assertWithinQueryBudget('greenfig', profile)
+
+        _, profile = profile_post_enrollment(controller, self.data, self.course_settings)
+
+        self.assertWithinQueryBudget('greenfig_buffered', profile)
+
+    @patch('{}.salesforce_external_enrollment.CourseEnrollment'.format(MODULE), backends.StubCourseEnrollment)
+    @patch.object(SalesforceEnrollment, '_get_auth_token')
+    def test_salesforce_order(self, get_auth_token_mock, base_session_mock, greenfig_session_mock):
+        """Testing a multi-line Salesforce program order stays within its budget."""
+        self.set_sessions(base_session_mock, greenfig_session_mock)
+        get_auth_token_mock.return_value = dict(TOKEN)
+        ProgramSalesforceEnrollment.objects.create(  # pylint: disable=no-member
+            bundle_id='test-program',
+            meta={'Program_of_Interest': 'Test program'},
+        )
+        course_ids = ['course-v1:test+CS{}+2020'.format(number) for number in range(SALESFORCE_ORDER_LINES)]
+
+        for course_id in course_ids:
+            backends.add_course(course_id, {'salesforce_data': {'Program_Name': 'Test program'}})
+
+        (response, _), profile = profile_post_enrollment(SalesforceEnrollment(), {
+            'program': {'uuid': 'test-program'},
+            'paid_amount': 100,
+            'currency': 'USD',
+            'supported_lines': [
+                {'user_email': self.data['user_email'], 'course_id': course_id} for course_id in course_ids
+            ],
+        })
+
+        self.assertEqual(response, TOKEN)
+        self.assertEqual(profile.edxapp_calls['get_course_by_id'], SALESFORCE_ORDER_LINES)
+        self.assertWithinQueryBudget('salesforce_order', profile)
+
+    def test_budget_exceeded(self, base_session_mock, greenfig_session_mock):  # pylint: disable=unused-argument
+        """Testing the assertion lists the queries and calls over the budget."""
+        profile = Mock(query_count=2, queries=['INSERT 1', 'INSERT 2'], edxapp_calls={'get_user': 2})
+
+        with self.assertRaises(AssertionError) as context:
+            self.assertWithinQueryBudget('openedX', profile)
+
+        self.assertIn('2 queries, the budget is 1', str(context.exception))
+        self.assertIn('2 get_user calls, the budget is 1', str(context.exception))
+        self.assertIn('INSERT 2', str(context.exception))
@@ -1,14 +1,23 @@
 """Tests SalesforceEnrollment class file."""
+import logging
 from datetime import datetime, timedelta
 
 from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
 from django.test import TestCase
-from mock import Mock, patch
+from mock import ANY, Mock, patch
 from opaque_keys.edx.keys import CourseKey
+from testfixtures import LogCapture
 
-from openedx_external_enrollments.external_enrollments.salesforce_external_enrollment import SalesforceEnrollment
+from openedx_external_enrollments.external_enrollments.salesforce_external_enrollment import (
+    OrderUsers,
+    SalesforceEnrollment,
+)
 from openedx_external_enrollments.models import ProgramSalesforceEnrollment
 
+MODULE = 'openedx_external_enrollments.external_enrollments.salesforce_external_enrollment'
+
 
 class SalesforceEnrollmentTest(TestCase):
     """Test class for SalesforceEnrollment class."""
@@ -16,6 +25,7 @@ class SalesforceEnrollmentTest(TestCase):
     def setUp(self):
         """Set test database."""
         self.base = SalesforceEnrollment()
+        cache.clear()
 
     @patch('openedx_external_enrollments.external_enrollments.salesforce_external_enrollment.get_course_by_id')
     def test_get_course(self, get_course_by_id_mock):
@@ -77,7 +87,10 @@ class SalesforceEnrollmentTest(TestCase):
         self.assertEqual('test-token', self.base._get_auth_token())  # pylint: disable=protected-access
         backend_mock.assert_called_once_with(**request_params)
         oauth_session_mock.assert_called_once_with(client='test-client')
-        oauth_mock.fetch_token.assert_called_once_with(token_url=settings.SALESFORCE_API_TOKEN_URL)
+        oauth_mock.fetch_token.assert_called_once_with(
+            token_url=settings.SALESFORCE_API_TOKEN_URL,
+            timeout=(5, 30),
+        )
 
     @patch('openedx_external_enrollments.external_enrollments.salesforce_external_enrollment.get_user')
     def test_get_openedx_user(self, get_user_mock):
@@ -134,7 +147,7 @@ class SalesforceEnrollmentTest(TestCase):
         get_program_mock.return_value = program_data
 
         self.assertEqual(expected_data, self.base._get_salesforce_data(data))  # pylint: disable=protected-access
-        get_program_mock.assert_called_once_with(data, lines)
+        get_program_mock.assert_called_once_with(data, lines, users=None)
 
         data['program'] = True
         expected_data['Purchase_Type'] = 'Program'
@@ -242,7 +255,7 @@ class SalesforceEnrollmentTest(TestCase):
 
         self.assertEqual([expected_data], self.base._get_courses_data({}, lines))  # pylint: disable=protected-access
         get_course_mock.assert_called_with('test-course-id')
-        get_date_mock.assert_called_with(course_mock, 'test-email', 'test-course-id')
+        get_date_mock.assert_called_with(course_mock, 'test-email', 'test-course-id', users=ANY)
 
         course_mock.other_course_settings = {
             'salesforce_data': {
@@ -322,6 +335,7 @@ class SalesforceEnrollmentTest(TestCase):
             self.base._get_course_start_date(course_mock, 'test-email', course_id),  # pylint: disable=protected-access
         )
 
+    @patch('{}.get_users_by_email'.format(MODULE), Mock(return_value={}))
     @patch.object(SalesforceEnrollment, '_get_salesforce_data')
     @patch.object(SalesforceEnrollment, '_get_openedx_user')
     @patch.object(SalesforceEnrollment, '_get_courses_data')
@@ -364,9 +378,10 @@ class SalesforceEnrollmentTest(TestCase):
             'enrollment': enrollment,
         }
         self.assertEqual(expected_data, self.base._get_enrollment_data(data, {}))  # pylint: disable=protected-access
-        get_openedx_mock.assert_called_once_with(data)
-        get_salesforce_mock.assert_called_once_with(data)
-        get_course_mock.assert_called_once_with(data, lines)
+        users = get_openedx_mock.call_args[1]['users']
+        get_openedx_mock.assert_called_once_with(data, users=users)
+        get_salesforce_mock.assert_called_once_with(data, users=users)
+        get_course_mock.assert_called_once_with(data, lines, users=users)
 
         user_data['unwanted_key'] = 'testing'
         get_openedx_mock.return_value = user_data
@@ -383,3 +398,89 @@ class SalesforceEnrollmentTest(TestCase):
         expected_url = '{}/{}'.format('test-instance-url', settings.SALESFORCE_ENROLLMENT_API_PATH)
         self.assertEqual(expected_url, self.base._get_enrollment_url({}))  # pylint: disable=protected-access
         get_auth_token_mock.assert_called_once()
+
+    @patch.object(SalesforceEnrollment, '_get_auth_token')
+    def test_auth_token_shared_by_headers_and_url(self, get_auth_token_mock):
+        """Testing the headers and the url reuse the same cached token."""
+        get_auth_token_mock.return_value = {
+            'token_type': 'test-token-type',
+            'access_token': 'test-access-token',
+            'instance_url': 'test-instance-url',
+        }
+
+        self.base._get_enrollment_url({})  # pylint: disable=protected-access
+        self.base._get_enrollment_headers()  # pylint: disable=protected-access
+        get_auth_token_mock.assert_called_once()
+
+        self.base._invalidate_auth_token()  # pylint: disable=protected-access
+        self.base._get_enrollment_headers()  # pylint: disable=protected-access
+        self.assertEqual(get_auth_token_mock.call_count, 2)
+
+
+class OrderUsersTest(TestCase):
+    """Test class for OrderUsers class."""
+
+    def setUp(self):
+        """Set the order lines."""
+        self.course_id = 'course-v1:test+CS102+2019_T3'
+        self.course_key = CourseKey.from_string(self.course_id)
+        self.lines = [
+            {'user_email': 'test-email', 'course_id': self.course_id},
+            {'user_email': 'test-email', 'course_id': 'invalid-course-id'},
+        ]
+        self.user = Mock(id=1)
+        self.profile = Mock()
+
+    @patch('{}.CourseEnrollment'.format(MODULE))
+    @patch('{}.get_user'.format(MODULE))
+    @patch('{}.get_users_by_email'.format(MODULE))
+    def test_prefetched(self, get_users_mock, get_user_mock, enrollment_mock):
+        """Testing users and enrollments of the order are fetched once."""
+        enrollment = Mock(user_id=1, course_id=self.course_key)
+        get_users_mock.return_value = {'test-email': (self.user, self.profile)}
+        enrollment_mock.objects.filter.return_value = [enrollment]
+
+        users = OrderUsers(self.lines)
+
+        self.assertEqual(users.get_user('test-email'), (self.user, self.profile))
+        self.assertEqual(users.get_user('test-email'), (self.user, self.profile))
+        self.assertIs(users.get_enrollment(self.user, self.course_key), enrollment)
+        get_users_mock.assert_called_once_with({'test-email'})
+        enrollment_mock.objects.filter.assert_called_once_with(user__in=[self.user], course_id__in={self.course_key})
+        get_user_mock.assert_not_called()
+        enrollment_mock.get_enrollment.assert_not_called()
+
+    @patch('{}.CourseEnrollment'.format(MODULE))
+    @patch('{}.get_user'.format(MODULE))
+    @patch('{}.get_users_by_email'.format(MODULE))
+    def test_prefetch_skipped(self, get_users_mock, get_user_mock, enrollment_mock):
+        """Testing the users are read one by one, with a warning, when one of them has no profile."""
+        get_users_mock.side_effect = ObjectDoesNotExist('User has no profile.')
+        get_user_mock.return_value = (self.user, self.profile)
+
+        with LogCapture(level=logging.WARNING) as log_capture:
+            users = OrderUsers(self.lines)
+
+        log_capture.check((
+            MODULE,
+            'WARNING',
+            'Users of the order not prefetched, reading them one by one. Reason: User has no profile.',
+        ))
+        self.assertEqual(users.get_user('test-email'), (self.user, self.profile))
+        get_user_mock.assert_called_once_with(email='test-email')
+        enrollment_mock.objects.filter.assert_not_called()
+
+    @patch('{}.CourseEnrollment'.format(MODULE))
+    @patch('{}.get_user'.format(MODULE))
+    def test_not_prefetched(self, get_user_mock, enrollment_mock):
+        """Testing users and enrollments are read one by one and reused."""
+        get_user_mock.return_value = (self.user, self.profile)
+
+        users = OrderUsers()
+
+        self.assertEqual(users.get_user('test-email'), (self.user, self.profile))
+        users.get_user('test-email')
+        users.get_enrollment(self.user, self.course_key)
+        users.get_enrollment(self.user, self.course_key)
+        get_user_mock.assert_called_once_with(email='test-email')
+        enrollment_mock.get_enrollment.assert_called_once_with(self.user, self.course_key)
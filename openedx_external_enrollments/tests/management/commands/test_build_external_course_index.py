@@ -0,0 +1,32 @@
+"""Tests build_external_course_index command file."""
+from django.core.management import call_command
+from django.test import TestCase
+from mock import Mock, patch
+from six import StringIO
+
+from openedx_external_enrollments.models import ExternalCourse
+
+MODULE = 'openedx_external_enrollments.management.commands.build_external_course_index'
+
+
+class BuildExternalCourseIndexTest(TestCase):
+    """Test class for build_external_course_index command."""
+
+    @patch('{}.get_courses'.format(MODULE))
+    def test_build_index(self, get_courses_mock):
+        """Testing only the external courses are indexed."""
+        get_courses_mock.return_value = [
+            Mock(id='course-v1:test+external+run', other_course_settings={
+                'external_platform_target': 'openedx',
+                'external_course_run_id': 'external-run',
+            }),
+            Mock(id='course-v1:test+internal+run', other_course_settings={}),
+        ]
+        out = StringIO()
+
+        call_command('build_external_course_index', stdout=out)
+
+        self.assertIn('1 external courses indexed.', out.getvalue())
+        external_course = ExternalCourse.objects.get()  # pylint: disable=no-member
+        self.assertEqual(external_course.course_id, 'course-v1:test+external+run')
+        self.assertEqual(external_course.external_course_run_id, 'external-run')
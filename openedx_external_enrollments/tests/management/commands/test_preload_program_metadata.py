@@ -0,0 +1,26 @@
+"""Tests preload_program_metadata command file."""
+from django.core.management import call_command
+from django.test import TestCase
+from mock import patch
+from six import StringIO
+
+MODULE = 'openedx_external_enrollments.management.commands.preload_program_metadata'
+
+
+class PreloadProgramMetadataTest(TestCase):
+    """Test class for preload_program_metadata command."""
+
+    @patch('{}.preload_program_metadata'.format(MODULE))
+    def test_preload(self, preload_mock):
+        """Testing the given programs, or every program, are preloaded."""
+        preload_mock.return_value = 2
+        out = StringIO()
+
+        call_command('preload_program_metadata', 'test-uuid', 'other-uuid', stdout=out)
+
+        preload_mock.assert_called_once_with(['test-uuid', 'other-uuid'])
+        self.assertIn('2 program metadata entries cached.', out.getvalue())
+
+        call_command('preload_program_metadata', stdout=StringIO())
+
+        preload_mock.assert_called_with(None)
@@ -0,0 +1,65 @@
+"""Tests prune_enrollment_request_logs command file."""
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from six import StringIO
+
+from openedx_external_enrollments.models import EnrollmentRequestLog
+
+
+class PruneEnrollmentRequestLogsTest(TestCase):
+    """Test class for prune_enrollment_request_logs command."""
+
+    def setUp(self):
+        """Create old and recent logs."""
+        for index in range(3):
+            request_log = EnrollmentRequestLog.objects.create(  # pylint: disable=no-member
+                request_type='test',
+                details={'old': index},
+            )
+            EnrollmentRequestLog.objects.filter(id=request_log.id).update(  # pylint: disable=no-member
+                created_at=timezone.now() - timedelta(days=100),
+            )
+
+        self.recent_log = EnrollmentRequestLog.objects.create(  # pylint: disable=no-member
+            request_type='test',
+            details={'recent': True},
+        )
+        self.export_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.export_dir)
+
+    def test_dry_run(self):
+        """Testing the dry run doesn't delete anything."""
+        out = StringIO()
+
+        call_command('prune_enrollment_request_logs', '--dry-run', stdout=out)
+
+        self.assertIn('3 enrollment request logs would be pruned.', out.getvalue())
+        self.assertEqual(EnrollmentRequestLog.objects.count(), 4)  # pylint: disable=no-member
+
+    def test_prune_and_export(self):
+        """Testing old logs are exported and deleted in batches."""
+        out = StringIO()
+        export_path = os.path.join(self.export_dir, 'logs.jsonl')
+
+        call_command(
+            'prune_enrollment_request_logs',
+            '--days', '90',
+            '--batch-size', '2',
+            '--export', export_path,
+            stdout=out,
+        )
+
+        self.assertIn('3 enrollment request logs pruned.', out.getvalue())
+        self.assertEqual(list(EnrollmentRequestLog.objects.all()), [self.recent_log])  # pylint: disable=no-member
+
+        with open(export_path) as export_file:
+            exported = [json.loads(line) for line in export_file]
+
+        self.assertEqual([row['details'] for row in exported], [{'old': 0}, {'old': 1}, {'old': 2}])
@@ -0,0 +1,65 @@
+"""Tests replay_dead_letter_enrollments command file."""
+from django.core.management import call_command
+from django.test import TestCase
+from mock import call, patch
+from six import StringIO
+
+from openedx_external_enrollments.models import EnrollmentDeadLetter
+
+MODULE = 'openedx_external_enrollments.tasks'
+
+
+class ReplayDeadLetterEnrollmentsTest(TestCase):
+    """Test class for replay_dead_letter_enrollments command."""
+
+    def setUp(self):
+        """Create the dead letters."""
+        self.dead_letters = [
+            EnrollmentDeadLetter.objects.create(  # pylint: disable=no-member
+                request_type='salesforce',
+                data={'order': index},
+            )
+            for index in range(3)
+        ]
+
+    @patch('{}.generate_salesforce_enrollment'.format(MODULE))
+    def test_replay(self, task_mock):
+        """Testing pending dead letters are enqueued and marked as replayed."""
+        out = StringIO()
+
+        call_command('replay_dead_letter_enrollments', '--batch-size', '2', stdout=out)
+
+        self.assertEqual(
+            task_mock.delay.call_args_list,
+            [call({'order': 0}), call({'order': 1}), call({'order': 2})],
+        )
+        self.assertIn('3 dead letters replayed.', out.getvalue())
+        self.assertFalse(
+            EnrollmentDeadLetter.objects.filter(replayed_at__isnull=True).exists(),  # pylint: disable=no-member
+        )
+
+        task_mock.reset_mock()
+        call_command('replay_dead_letter_enrollments', stdout=out)
+
+        task_mock.delay.assert_not_called()
+
+    @patch('{}.generate_salesforce_enrollment'.format(MODULE))
+    def test_replay_filters(self, task_mock):
+        """Testing ids, limit and dry-run options."""
+        out = StringIO()
+
+        call_command('replay_dead_letter_enrollments', '--dry-run', stdout=out)
+        self.assertIn('3 dead letters would be replayed.', out.getvalue())
+
+        call_command(
+            'replay_dead_letter_enrollments',
+            '--ids', str(self.dead_letters[1].id), str(self.dead_letters[2].id),
+            '--limit', '1',
+            stdout=out,
+        )
+
+        task_mock.delay.assert_called_once_with({'order': 1})
+        self.assertEqual(
+            EnrollmentDeadLetter.objects.filter(replayed_at__isnull=True).count(),  # pylint: disable=no-member
+            2,
+        )
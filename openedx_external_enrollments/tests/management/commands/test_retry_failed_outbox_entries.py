@@ -0,0 +1,66 @@
+"""Tests retry_failed_outbox_entries command file."""
+from django.core.management import call_command
+from django.test import TestCase
+from mock import patch
+from six import StringIO
+
+from openedx_external_enrollments.models import ExternalEnrollmentOutbox
+
+MODULE = 'openedx_external_enrollments.outbox'
+
+
+@patch('{}.schedule_outbox_relay'.format(MODULE))
+class RetryFailedOutboxEntriesTest(TestCase):
+    """Test class for retry_failed_outbox_entries command."""
+
+    def setUp(self):
+        """Create the outbox entries."""
+        self.entries = [
+            ExternalEnrollmentOutbox.objects.create(  # pylint: disable=no-member
+                idempotency_key='key-{}'.format(index),
+                user_email='test{}@example.com'.format(index),
+                course_id='course-v1:test+course+run',
+                is_active=True,
+                version=1,
+                status=status,
+                attempts=5,
+            )
+            for index, status in enumerate([
+                ExternalEnrollmentOutbox.FAILED,
+                ExternalEnrollmentOutbox.FAILED,
+                ExternalEnrollmentOutbox.SENT,
+            ])
+        ]
+
+    def test_retry(self, schedule_mock):
+        """Testing the failed entries are returned to pending and a relay is scheduled."""
+        out = StringIO()
+
+        call_command('retry_failed_outbox_entries', stdout=out)
+
+        self.assertIn('2 outbox entries will be relayed again.', out.getvalue())
+        self.assertEqual(
+            ExternalEnrollmentOutbox.objects.filter(  # pylint: disable=no-member
+                status=ExternalEnrollmentOutbox.PENDING,
+                attempts=0,
+            ).count(),
+            2,
+        )
+        schedule_mock.assert_called_once_with()
+
+    def test_retry_ids(self, schedule_mock):
+        """Testing only the failed entries of ids are retried."""
+        out = StringIO()
+
+        call_command(
+            'retry_failed_outbox_entries',
+            '--ids',
+            str(self.entries[1].id),
+            str(self.entries[2].id),
+            stdout=out,
+        )
+
+        self.assertIn('1 outbox entries will be relayed again.', out.getvalue())
+        self.entries[0].refresh_from_db()
+        self.assertEqual(self.entries[0].status, ExternalEnrollmentOutbox.FAILED)
+        schedule_mock.assert_called_once_with()
@@ -0,0 +1,76 @@
+"""
+Query budgets of the enrollment controllers and the assertions comparing them with a QueryProfile.
+
+A budget is the maximum number of SQL queries and of every edxapp call that one _post_enrollment
+of the controller can make, the edxapp calls not listed in the budget are not allowed at all.
+Raise a budget only when the extra queries are intended.
+"""
+from collections import namedtuple
+
+from openedx_external_enrollments.request_cache import request_cache_scope
+from openedx_external_enrollments.tests.query_profiling import profile_queries
+
+QueryBudget = namedtuple('QueryBudget', ['queries', 'edxapp_calls'])
+
+# Lines of the Salesforce order used by the multi-line budget.
+SALESFORCE_ORDER_LINES = 3
+
+QUERY_BUDGETS = {
+    # The request log.
+    'edX': QueryBudget(queries=1, edxapp_calls={}),
+    'openedX': QueryBudget(queries=1, edxapp_calls={'get_user': 1}),
+    # The request log of the roster upload.
+    'greenfig': QueryBudget(queries=1, edxapp_calls={'get_user': 1}),
+    # The pending roster line, the upload is done by the flush task.
+    'greenfig_buffered': QueryBudget(queries=1, edxapp_calls={'get_user': 1}),
+    # The program metadata and the request log, the learners and their enrollments are fetched
+    # once for the whole order and every course of the order is loaded once.
+    'salesforce_order': QueryBudget(queries=2, edxapp_calls={
+        'get_users_by_email': 1,
+        'get_enrollments': 1,
+        'get_course_by_id': SALESFORCE_ORDER_LINES,
+    }),
+}
+
+
+def profile_post_enrollment(controller, data, course_settings=None):
+    """
+    Execute one _post_enrollment of the controller in its own unit of work.
+
+    Returns:
+        Tuple with the result of _post_enrollment and its QueryProfile.
+    """
+    with request_cache_scope(), profile_queries() as profile:
+        result = controller._post_enrollment(data, course_settings)  # pylint: disable=protected-access
+
+    return result, profile
+
+
+class QueryBudgetMixin(object):
+    """
+    Assertions of the query budgets for the TestCase classes.
+    """
+
+    def assertWithinQueryBudget(self, budget_name, profile):  # pylint: disable=invalid-name
+        """
+        Fail listing every query and edxapp call when the profile exceeds the budget.
+        """
+        budget = QUERY_BUDGETS[budget_name]
+        exceeded = []
+
+        if profile.query_count > budget.queries:
+            exceeded.append('{} queries, the budget is {}'.format(profile.query_count, budget.queries))
+
+        for name, calls in sorted(profile.edxapp_calls.items()):
+            allowed = budget.edxapp_calls.get(name, 0)
+
+            if calls > allowed:
+                exceeded.append('{} {} calls, the budget is {}'.format(calls, name, allowed))
+
+        if exceeded:
+            self.fail('The {} query budget was exceeded: {}.\nQueries:\n{}\nEdxapp calls: {}'.format(
+                budget_name,
+                ', '.join(exceeded),
+                '\n'.join('  {}'.format(query) for query in profile.queries),
+                dict(profile.edxapp_calls),
+            ))
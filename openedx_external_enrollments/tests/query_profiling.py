@@ -0,0 +1,60 @@
+"""
+Profiling of the database queries and edxapp calls made by the enrollments.
+
+profile_queries records the SQL queries executed in the wrapped block and the calls made through
+the edxapp wrappers. The tests compare the profiles with the query budgets of every controller,
+so N+1 patterns fail loudly, and the benchmarks report them.
+"""
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+from openedx_external_enrollments.query_profiling import record_edxapp_calls
+
+
+class QueryProfile(object):
+    """
+    Queries and edxapp calls recorded by profile_queries.
+    """
+
+    def __init__(self, edxapp_calls):
+        self.queries = []
+        self.edxapp_calls = edxapp_calls
+
+    @property
+    def query_count(self):
+        """
+        Number of executed SQL queries.
+        """
+        return len(self.queries)
+
+    def to_dict(self):
+        """
+        Return the profile as a dict, e.g. to log it.
+        """
+        return {
+            'query_count': self.query_count,
+            'queries': list(self.queries),
+            'edxapp_calls': dict(self.edxapp_calls),
+        }
+
+
+@contextmanager
+def profile_queries(using=DEFAULT_DB_ALIAS):
+    """
+    Record the queries and the edxapp calls of the wrapped block.
+
+    Yields:
+        The QueryProfile, its queries are set when the block exits.
+    """
+    context = CaptureQueriesContext(connections[using])
+
+    with record_edxapp_calls() as edxapp_calls:
+        profile = QueryProfile(edxapp_calls)
+
+        try:
+            with context:
+                yield profile
+        finally:
+            profile.queries = [query['sql'] for query in context.captured_queries]
@@ -0,0 +1,44 @@
+"""Tests backend_registry file."""
+from django.test import TestCase, override_settings
+
+from openedx_external_enrollments.edxapp_wrapper.backend_registry import (
+    get_backend_function,
+    reset_backends,
+    warm_up_backends,
+)
+from openedx_external_enrollments.tests import tests_backends
+
+
+class BackendRegistryTest(TestCase):
+    """Test class for the resolved backends registry."""
+
+    def setUp(self):
+        """Start every test with an empty registry."""
+        reset_backends()
+
+    def test_get_backend_function(self):
+        """Testing backend functions are resolved from the configured module."""
+        self.assertIs(
+            get_backend_function('OEE_COURSEWARE_BACKEND', 'get_course_published_signal_backend'),
+            tests_backends.get_course_published_signal_backend,
+        )
+
+    def test_reset_on_setting_change(self):
+        """Testing the registry is cleared when a backend setting changes."""
+        get_backend_function('OEE_STUDENT_BACKEND', 'get_course_enrollment_backend')
+
+        with override_settings(OEE_STUDENT_BACKEND='openedx_external_enrollments.edxapp_wrapper.backend_registry'):
+            with self.assertRaises(AttributeError):
+                get_backend_function('OEE_STUDENT_BACKEND', 'get_course_enrollment_backend')
+
+        self.assertIs(
+            get_backend_function('OEE_STUDENT_BACKEND', 'get_course_enrollment_backend'),
+            tests_backends.get_course_enrollment_backend,
+        )
+
+    def test_warm_up_backends(self):
+        """Testing the warm up skips the backends that can't be resolved."""
+        # The course home setting isn't defined in tests and the test backends
+        # don't define get_course_by_id_backend, get_courses_backend, get_user_backend, IsStaffOrOwner
+        # nor get_site_configuration_model.
+        self.assertEqual(warm_up_backends(), 5)
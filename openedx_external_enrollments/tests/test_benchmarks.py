@@ -0,0 +1,43 @@
+"""Tests the benchmarks harness."""
+import requests
+from django.test import SimpleTestCase
+
+from openedx_external_enrollments.tests.benchmarks.runner import compare_results, percentile
+from openedx_external_enrollments.tests.benchmarks.stub_servers import DOWNLOAD_PATH, StubProviderServer
+
+
+class BenchmarksTest(SimpleTestCase):
+    """Test class for the benchmarks harness."""
+
+    def test_percentile(self):
+        """Testing the nearest-rank percentiles are returned in milliseconds."""
+        durations = [number / 1000.0 for number in range(100, 0, -1)]
+
+        self.assertEqual(percentile(durations, 50), 50)
+        self.assertEqual(percentile(durations, 99), 99)
+        self.assertIsNone(percentile([], 95))
+
+    def test_compare_results(self):
+        """Testing slower operations and new queries are reported as regressions."""
+        baseline = {'enrollment': {'ops_per_sec': 100, 'p95_ms': 10, 'queries_per_op': 2}}
+        results = {'enrollment': {'ops_per_sec': 95, 'p95_ms': 15, 'queries_per_op': 3}}
+
+        regressions = compare_results(baseline, results, threshold=0.1)
+
+        self.assertEqual(regressions, [
+            ('enrollment', 'p95_ms', 10, 15),
+            ('enrollment', 'queries_per_op', 2, 3),
+        ])
+
+    def test_stub_server(self):
+        """Testing the stub platform serves the roster and fails the configured fraction of requests."""
+        with StubProviderServer(roster_lines=2) as server:
+            response = requests.post(server.url + DOWNLOAD_PATH)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.text.splitlines()), 2)
+
+        with StubProviderServer(error_rate=1) as server:
+            response = requests.post(server.url + '/api/enrollment/v1/enrollment', json={})
+
+        self.assertEqual(response.status_code, 503)
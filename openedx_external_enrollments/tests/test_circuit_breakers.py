@@ -0,0 +1,145 @@
+"""Tests circuit_breakers file."""
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from mock import call, patch
+
+from openedx_external_enrollments.circuit_breakers import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    get_circuit_breakers_stats,
+)
+
+MODULE = 'openedx_external_enrollments.circuit_breakers'
+
+
+@override_settings(OEE_CIRCUIT_BREAKER_SETTINGS={
+    'default': {
+        'failure_threshold': 3,
+        'failure_rate': 0.5,
+        'min_requests': 6,
+        'window': 60,
+        'reset_timeout': 30,
+    },
+})
+class CircuitBreakerTest(TestCase):
+    """Test class for the CircuitBreaker class."""
+
+    def setUp(self):
+        """Clear the cache."""
+        cache.clear()
+        self.circuit_breaker = CircuitBreaker('test')
+
+    def test_open_after_consecutive_failures(self):
+        """Testing the circuit opens after failure_threshold consecutive failures."""
+        self.circuit_breaker.record_failure()
+        self.circuit_breaker.record_failure()
+        self.circuit_breaker.record_success()
+        self.circuit_breaker.record_failure()
+        self.circuit_breaker.record_failure()
+
+        self.assertEqual(self.circuit_breaker.get_state(), CLOSED)
+
+        self.circuit_breaker.record_failure()
+
+        self.assertEqual(self.circuit_breaker.get_state(), OPEN)
+        self.assertFalse(self.circuit_breaker.allow_request())
+        self.assertEqual(self.circuit_breaker.get_stats()['rejected'], 1)
+
+    def test_open_after_failure_rate(self):
+        """Testing the circuit opens when failure_rate of the window requests failed."""
+        for _ in range(2):
+            self.circuit_breaker.record_success()
+            self.circuit_breaker.record_failure()
+            self.circuit_breaker.record_failure()
+
+        stats = self.circuit_breaker.get_stats()
+        self.assertEqual(stats['state'], OPEN)
+        self.assertEqual(stats['window_requests'], 6)
+        self.assertEqual(stats['window_failures'], 4)
+        self.assertEqual(stats['opened'], 1)
+
+    def test_half_open_probe(self):
+        """Testing a single probe is allowed once reset_timeout passes and its success closes the circuit."""
+        with patch('{}.time.time'.format(MODULE), return_value=1000):
+            self.circuit_breaker.open()
+            self.assertEqual(self.circuit_breaker.get_retry_after(), 30)
+
+        with patch('{}.time.time'.format(MODULE), return_value=1031):
+            self.assertEqual(self.circuit_breaker.get_state(), HALF_OPEN)
+            self.assertTrue(self.circuit_breaker.allow_request())
+            self.assertFalse(self.circuit_breaker.allow_request())
+
+            self.circuit_breaker.record_success()
+
+        self.assertEqual(self.circuit_breaker.get_state(), CLOSED)
+        self.assertTrue(self.circuit_breaker.allow_request())
+
+    def test_half_open_probe_failure(self):
+        """Testing a failed probe opens the circuit again."""
+        with patch('{}.time.time'.format(MODULE), return_value=1000):
+            self.circuit_breaker.open()
+
+        with patch('{}.time.time'.format(MODULE), return_value=1031):
+            self.assertTrue(self.circuit_breaker.allow_request())
+            self.circuit_breaker.record_failure()
+
+            self.assertEqual(self.circuit_breaker.get_state(), OPEN)
+            self.assertEqual(self.circuit_breaker.get_retry_after(), 30)
+
+    @patch('{}.gauge'.format(MODULE))
+    @patch('{}.increment'.format(MODULE))
+    def test_metrics(self, increment_mock, gauge_mock):
+        """Testing the state changes and the rejected requests are emitted as metrics."""
+        with patch('{}.time.time'.format(MODULE), return_value=1000):
+            self.circuit_breaker.open()
+            self.circuit_breaker.allow_request()
+
+        with patch('{}.time.time'.format(MODULE), return_value=1031):
+            self.circuit_breaker.allow_request()
+            self.circuit_breaker.record_success()
+
+        self.assertEqual(increment_mock.call_args_list, [
+            call('circuit_state_changes', controller='test', state=OPEN),
+            call('circuit_rejections', controller='test', state=OPEN),
+            call('circuit_state_changes', controller='test', state=HALF_OPEN),
+            call('circuit_state_changes', controller='test', state=CLOSED),
+        ])
+        self.assertEqual(gauge_mock.call_args_list, [
+            call('circuit_state', 2, controller='test'),
+            call('circuit_state', 1, controller='test'),
+            call('circuit_state', 0, controller='test'),
+        ])
+
+    def test_reset(self):
+        """Testing reset closes the circuit and clears its counters."""
+        self.circuit_breaker.record_failure()
+        self.circuit_breaker.open()
+
+        self.circuit_breaker.reset()
+
+        stats = self.circuit_breaker.get_stats()
+        self.assertEqual(stats['state'], CLOSED)
+        self.assertEqual(stats['consecutive_failures'], 0)
+        self.assertEqual(stats['window_requests'], 0)
+        self.assertEqual(stats['opened'], 0)
+
+    @override_settings(OEE_CIRCUIT_BREAKER_SETTINGS={'default': {'enabled': False, 'failure_threshold': 1}})
+    def test_disabled(self):
+        """Testing a disabled circuit never opens."""
+        circuit_breaker = CircuitBreaker('test')
+        circuit_breaker.record_failure()
+
+        self.assertEqual(circuit_breaker.get_state(), CLOSED)
+        self.assertTrue(circuit_breaker.allow_request())
+
+    @override_settings(OEE_CIRCUIT_BREAKER_SETTINGS={'default': {}, 'other': {'reset_timeout': 10}})
+    def test_get_circuit_breakers_stats(self):
+        """Testing the stats include the known providers and the configured ones."""
+        stats = get_circuit_breakers_stats()
+
+        self.assertEqual(
+            [circuit['provider'] for circuit in stats],
+            ['edX', 'openedX', 'greenfig', 'salesforce', 'other'],
+        )
@@ -0,0 +1,100 @@
+"""Tests course_index file."""
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from mock import Mock, patch
+
+from openedx_external_enrollments.course_index import (
+    ExternalCourseEntry,
+    get_external_course,
+    index_course,
+    is_external_course,
+    rebuild_index,
+)
+from openedx_external_enrollments.models import ExternalCourse
+
+MODULE = 'openedx_external_enrollments.course_index'
+
+
+@override_settings(OEE_EXTERNAL_COURSE_INDEX_SETTINGS={'enabled': True})
+@patch.dict('{}._LOCAL_INDEX'.format(MODULE), {})
+class CourseIndexTest(TestCase):
+    """Test class for the external course index."""
+
+    def setUp(self):
+        """Clear the cache."""
+        cache.clear()
+
+    def test_index_course(self):
+        """Testing courses are added, updated and removed from the index."""
+        self.assertFalse(is_external_course('course-v1:test+course+run'))
+
+        index_course('course-v1:test+course+run', {
+            'external_platform_target': 'openedx',
+            'external_course_run_id': 'external-run',
+        })
+
+        self.assertTrue(is_external_course('course-v1:test+course+run'))
+        self.assertEqual(
+            get_external_course('course-v1:test+course+run'),
+            ExternalCourseEntry('openedx', 'external-run'),
+        )
+
+        index_course('course-v1:test+course+run', {'external_platform_target': 'greenfig'})
+
+        self.assertEqual(get_external_course('course-v1:test+course+run'), ExternalCourseEntry('greenfig', ''))
+
+        index_course('course-v1:test+course+run', {})
+
+        self.assertFalse(is_external_course('course-v1:test+course+run'))
+        self.assertFalse(ExternalCourse.objects.exists())  # pylint: disable=no-member
+
+    @override_settings(OEE_EXTERNAL_COURSE_INDEX_SETTINGS={'enabled': False})
+    def test_index_disabled(self):
+        """Testing every course is external while the index is disabled."""
+        self.assertTrue(is_external_course('course-v1:test+course+run'))
+
+    @override_settings(OEE_EXTERNAL_COURSE_INDEX_SETTINGS={'enabled': True, 'check_interval': 60})
+    def test_local_index(self):
+        """Testing the index is loaded once per process until its version changes."""
+        ExternalCourse.objects.create(  # pylint: disable=no-member
+            course_id='course-v1:test+course+run',
+            external_platform_target='openedx',
+        )
+
+        self.assertTrue(is_external_course('course-v1:test+course+run'))
+
+        with self.assertNumQueries(0):
+            self.assertFalse(is_external_course('course-v1:test+internal+run'))
+
+    @override_settings(OEE_EXTERNAL_COURSE_INDEX_SETTINGS={'enabled': True, 'check_interval': 60})
+    @patch('{}.time.time'.format(MODULE))
+    def test_index_miss(self, time_mock):
+        """Testing a course indexed without changing the shared version is found after reload_interval."""
+        time_mock.return_value = 1000
+
+        self.assertFalse(is_external_course('course-v1:test+course+run'))
+
+        ExternalCourse.objects.create(  # pylint: disable=no-member
+            course_id='course-v1:test+course+run',
+            external_platform_target='openedx',
+        )
+        time_mock.return_value = 1100
+
+        self.assertFalse(is_external_course('course-v1:test+course+run'))
+
+        time_mock.return_value = 1300
+
+        self.assertTrue(is_external_course('course-v1:test+course+run'))
+
+    def test_rebuild_index(self):
+        """Testing the index is replaced with the external courses."""
+        index_course('course-v1:test+removed+run', {'external_platform_target': 'openedx'})
+        courses = [
+            Mock(id='course-v1:test+external+run', other_course_settings={'external_platform_target': 'edx'}),
+            Mock(id='course-v1:test+internal+run', other_course_settings={}),
+        ]
+
+        self.assertEqual(rebuild_index(courses), 1)
+        self.assertTrue(is_external_course('course-v1:test+external+run'))
+        self.assertFalse(is_external_course('course-v1:test+internal+run'))
+        self.assertFalse(is_external_course('course-v1:test+removed+run'))
@@ -0,0 +1,65 @@
+"""Tests enrollment_changes file."""
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from mock import Mock
+
+from openedx_external_enrollments.enrollment_changes import (
+    debounce_enrollment_change,
+    get_enrollment_state,
+    get_remembered_enrollment_state,
+    is_latest_enrollment_change,
+    remember_enrollment_state,
+)
+
+COURSE_ID = 'course-v1:test+course+run'
+
+
+class EnrollmentStateTest(TestCase):
+    """Test class for the enrollment state tracking."""
+
+    def test_remember_enrollment_state(self):
+        """Testing the remembered state doesn't follow the later changes of the instance."""
+        instance = Mock(is_active=True, mode='audit')
+
+        remember_enrollment_state(instance)
+        instance.mode = 'verified'
+
+        self.assertEqual(get_remembered_enrollment_state(instance), (True, 'audit'))
+        self.assertEqual(get_enrollment_state(instance), (True, 'verified'))
+
+
+@override_settings(OEE_ENROLLMENT_DEBOUNCE_WINDOW=5)
+class DebounceEnrollmentChangeTest(TestCase):
+    """Test class for the debouncing of the enrollment changes."""
+
+    def setUp(self):
+        """Clear the cache."""
+        cache.clear()
+
+    def test_latest_change(self):
+        """Testing only the latest change of a burst is dispatched."""
+        first_data = {'user_email': 'test@example.com', 'course_mode': 'audit', 'is_active': True}
+        last_data = dict(first_data, course_mode='verified')
+
+        first_token = debounce_enrollment_change(first_data, COURSE_ID)
+        last_token = debounce_enrollment_change(last_data, COURSE_ID)
+
+        self.assertFalse(is_latest_enrollment_change(first_data, COURSE_ID, first_token))
+        self.assertTrue(is_latest_enrollment_change(last_data, COURSE_ID, last_token))
+
+    def test_burst_back_to_initial_state(self):
+        """Testing a burst that returns to the state it started from is not dispatched."""
+        unenrolled = {'user_email': 'test@example.com', 'course_mode': 'audit', 'is_active': False}
+        enrolled = dict(unenrolled, is_active=True)
+
+        debounce_enrollment_change(unenrolled, COURSE_ID, previous_state=(True, 'audit'))
+        token = debounce_enrollment_change(enrolled, COURSE_ID, previous_state=(False, 'audit'))
+
+        self.assertFalse(is_latest_enrollment_change(enrolled, COURSE_ID, token))
+
+    @override_settings(OEE_ENROLLMENT_DEBOUNCE_WINDOW=0)
+    def test_debounce_disabled(self):
+        """Testing no token is returned while debouncing is disabled."""
+        data = {'user_email': 'test@example.com', 'course_mode': 'audit', 'is_active': True}
+
+        self.assertIsNone(debounce_enrollment_change(data, COURSE_ID))
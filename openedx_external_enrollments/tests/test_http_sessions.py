@@ -0,0 +1,84 @@
+"""Tests http_sessions file."""
+from django.test import TestCase, override_settings
+from mock import call, patch
+
+from openedx_external_enrollments.http_sessions import (
+    close_sessions,
+    emit_session_stats,
+    get_session,
+    get_session_settings,
+    get_session_stats,
+    get_timeout,
+)
+
+
+class HttpSessionsTest(TestCase):
+    """Test class for the provider sessions registry."""
+
+    def setUp(self):
+        """Start every test with an empty registry."""
+        close_sessions()
+
+    def test_get_session(self):
+        """Testing sessions are reused per provider."""
+        session = get_session('edX')
+
+        self.assertIs(session, get_session('edX'))
+        self.assertIsNot(session, get_session('salesforce'))
+
+        adapter = session.get_adapter('https://api.edx.org')
+        self.assertEqual(adapter._pool_maxsize, 10)  # pylint: disable=protected-access
+        self.assertEqual(adapter.max_retries.connect, 2)
+        self.assertEqual(adapter.max_retries.read, 0)
+
+    @override_settings(OEE_HTTP_SESSION_SETTINGS={
+        'default': {'read_timeout': 20},
+        'salesforce': {'read_timeout': 60, 'pool_size': 3},
+    })
+    def test_provider_settings(self):
+        """Testing provider settings are merged over the default ones."""
+        self.assertEqual(get_timeout('edX'), (5, 20))
+        self.assertEqual(get_timeout('salesforce'), (5, 60))
+        self.assertEqual(get_session_settings('salesforce')['pool_size'], 3)
+
+        adapter = get_session('salesforce').get_adapter('https://salesforce.com')
+        self.assertEqual(adapter._pool_maxsize, 3)  # pylint: disable=protected-access
+
+    def test_get_session_stats(self):
+        """Testing the pool usage stats of the registered sessions."""
+        self.assertEqual(get_session_stats(), {})
+
+        session = get_session('greenfig')
+        pool = session.get_adapter('https://dropbox.com').poolmanager.connection_from_url('https://dropbox.com')
+        pool.num_requests = 5
+        pool.num_connections = 2
+
+        self.assertEqual(
+            get_session_stats(),
+            {
+                'greenfig': {
+                    'requests': 5,
+                    'new_connections': 2,
+                    'reused_connections': 3,
+                },
+            },
+        )
+
+    @patch('openedx_external_enrollments.http_sessions.gauge')
+    def test_emit_session_stats(self, gauge_mock):
+        """Testing the pool usage of the provider session is emitted after every response."""
+        emit_session_stats('greenfig')
+        gauge_mock.assert_not_called()
+
+        session = get_session('greenfig')
+        pool = session.get_adapter('https://dropbox.com').poolmanager.connection_from_url('https://dropbox.com')
+        pool.num_requests = 5
+        pool.num_connections = 2
+        response = object()
+
+        self.assertIs(session.hooks['response'][-1](response), response)
+        gauge_mock.assert_has_calls([
+            call('http_pool_requests', 5, controller='greenfig'),
+            call('http_pool_new_connections', 2, controller='greenfig'),
+            call('http_pool_reused_connections', 3, controller='greenfig'),
+        ], any_order=True)
@@ -0,0 +1,33 @@
+"""Tests locks file."""
+from django.core.cache import cache
+from django.test import TestCase
+
+from openedx_external_enrollments.locks import acquire_lock, release_lock
+
+
+class LocksTest(TestCase):
+    """Test class for the cache locks."""
+
+    def setUp(self):
+        """Clear the cache."""
+        cache.clear()
+
+    def test_acquire_lock(self):
+        """Testing a held lock can't be acquired and is released by its holder."""
+        lock_token = acquire_lock('test-lock', 10)
+
+        self.assertIsNotNone(lock_token)
+        self.assertIsNone(acquire_lock('test-lock', 10))
+
+        release_lock('test-lock', lock_token)
+
+        self.assertIsNotNone(acquire_lock('test-lock', 10))
+
+    def test_release_lock_of_other_holder(self):
+        """Testing only the holder of the lock releases it."""
+        acquire_lock('test-lock', 10)
+
+        release_lock('test-lock', 'other-token')
+        release_lock('test-lock', None)
+
+        self.assertIsNone(acquire_lock('test-lock', 10))
@@ -0,0 +1,80 @@
+"""Tests metrics file."""
+from django.test import TestCase, override_settings
+from mock import Mock, patch
+
+from openedx_external_enrollments.metrics import (
+    NoopMetricsBackend,
+    StatsdMetricsBackend,
+    collect_timings,
+    gauge,
+    get_collected_timings,
+    get_metrics_backend,
+    increment,
+    timed,
+)
+
+MODULE = 'openedx_external_enrollments.metrics'
+
+
+class MetricsTest(TestCase):
+    """Test class for the metrics helpers."""
+
+    def test_noop_backend(self):
+        """Testing the noop backend is used by default."""
+        self.assertIsInstance(get_metrics_backend(), NoopMetricsBackend)
+
+    @override_settings(OEE_METRICS_BACKEND='statsd', OEE_METRICS_SETTINGS={'prefix': 'oee'})
+    @patch('{}.import_module'.format(MODULE))
+    def test_statsd_backend(self, import_module_mock):
+        """Testing the statsd backend appends the tag values to the stat name."""
+        client_mock = import_module_mock.return_value.StatsClient.return_value
+
+        with timed('http_time', controller='greenfig'):
+            pass
+
+        increment('enrollment_requests', outcome='success', controller='open.edx')
+        gauge('http_pool_requests', 5, controller='greenfig')
+
+        import_module_mock.assert_called_once_with('statsd')
+        import_module_mock.return_value.StatsClient.assert_called_once_with('localhost', 8125, prefix='oee')
+        self.assertEqual(client_mock.timing.call_args[0][0], 'http_time.greenfig')
+        client_mock.incr.assert_called_once_with('enrollment_requests.open_edx.success')
+        client_mock.gauge.assert_called_once_with('http_pool_requests.greenfig', 5)
+
+    @override_settings(OEE_METRICS_BACKEND='prometheus')
+    @patch('{}.import_module'.format(MODULE))
+    def test_missing_backend(self, import_module_mock):
+        """Testing the noop backend is used when the backend package is not installed."""
+        import_module_mock.side_effect = ImportError('No module named prometheus_client')
+
+        self.assertIsInstance(get_metrics_backend(), NoopMetricsBackend)
+
+    @patch('{}.get_metrics_backend'.format(MODULE))
+    def test_backend_failure(self, backend_mock):
+        """Testing the failures of the backend don't reach the caller."""
+        backend_mock.return_value = Mock(spec=StatsdMetricsBackend)
+        backend_mock.return_value.increment.side_effect = Exception('unreachable')
+
+        increment('enrollment_requests', outcome='success')
+
+    def test_collect_timings(self):
+        """Testing the timings are collected in milliseconds by the innermost collection."""
+        self.assertIsNone(get_collected_timings())
+
+        with collect_timings() as timings:
+            with patch('{}.time.time'.format(MODULE), side_effect=[10, 10.25, 20, 20.5]):
+                with timed('http_time'):
+                    pass
+
+                with timed('http_time'):
+                    pass
+
+            with collect_timings() as inner_timings:
+                with timed('auth_time'):
+                    pass
+
+            self.assertEqual(get_collected_timings(), {'http_time': 750})
+
+        self.assertEqual(timings, {'http_time': 750})
+        self.assertEqual(list(inner_timings), ['auth_time'])
+        self.assertIsNone(get_collected_timings())
@@ -0,0 +1,246 @@
+"""Tests outbox file."""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from mock import patch
+
+from openedx_external_enrollments.exceptions import RetryableEnrollmentError
+from openedx_external_enrollments.models import ExternalEnrollmentOutbox
+from openedx_external_enrollments.outbox import add_to_outbox, get_next_relay_countdown, relay_outbox
+
+MODULE = 'openedx_external_enrollments.outbox'
+LOCK_KEY = 'openedx_external_enrollments.outbox.lock'
+COURSE_ID = 'course-v1:test+course+run'
+
+
+@patch('{}.transaction.on_commit'.format(MODULE))
+class AddToOutboxTest(TestCase):
+    """Test class for add_to_outbox method."""
+
+    def setUp(self):
+        """Clear the cache."""
+        cache.clear()
+
+    def test_add_to_outbox(self, on_commit_mock):
+        """Testing every change gets a new version and a single relay is scheduled."""
+        data = {'user_email': 'test@example.com', 'course_mode': 'verified', 'is_active': True}
+
+        first_entry = add_to_outbox(data, COURSE_ID)
+        second_entry = add_to_outbox(dict(data, is_active=False), COURSE_ID)
+
+        self.assertEqual(first_entry.version, 1)
+        self.assertEqual(second_entry.version, 2)
+        self.assertEqual(
+            first_entry.idempotency_key,
+            ExternalEnrollmentOutbox.build_idempotency_key('test@example.com', COURSE_ID, True, 'verified', 1),
+        )
+        self.assertNotEqual(first_entry.idempotency_key, second_entry.idempotency_key)
+        on_commit_mock.assert_called_once()
+
+    def test_duplicated_change(self, on_commit_mock):  # pylint: disable=unused-argument
+        """Testing a change with an existing idempotency key is not enqueued again."""
+        data = {'user_email': 'test@example.com', 'course_mode': 'verified', 'is_active': True}
+        outbox_entry = add_to_outbox(data, COURSE_ID)
+
+        with patch('{}._get_next_version'.format(MODULE), return_value=1):
+            self.assertEqual(add_to_outbox(data, COURSE_ID), outbox_entry)
+
+        self.assertEqual(ExternalEnrollmentOutbox.objects.count(), 1)  # pylint: disable=no-member
+
+    def test_concurrent_change(self, on_commit_mock):  # pylint: disable=unused-argument
+        """Testing a change whose version was taken by a concurrent change is written with the next one."""
+        data = {'user_email': 'test@example.com', 'course_mode': 'verified', 'is_active': True}
+        add_to_outbox(data, COURSE_ID)
+
+        with patch('{}._get_next_version'.format(MODULE), side_effect=[1, 2]):
+            outbox_entry = add_to_outbox(dict(data, is_active=False), COURSE_ID)
+
+        self.assertEqual(outbox_entry.version, 2)
+        self.assertFalse(outbox_entry.is_active)
+
+
+@patch('{}.get_course_by_id'.format(MODULE))
+@patch('{}.get_enrollment_controller'.format(MODULE))
+class RelayOutboxTest(TestCase):
+    """Test class for relay_outbox method."""
+
+    def setUp(self):
+        """Clear the cache."""
+        cache.clear()
+
+    @staticmethod
+    def get_post_mock(controller_mock, response_status=200):
+        """Return the _post_enrollment mock of the controller."""
+        post_mock = controller_mock.return_value._post_enrollment  # pylint: disable=protected-access
+        post_mock.return_value = ({}, response_status)
+
+        return post_mock
+
+    @staticmethod
+    def create_entry(is_active, status=ExternalEnrollmentOutbox.PENDING, user_email='test@example.com', **kwargs):
+        """Create an outbox entry for the test course."""
+        version = ExternalEnrollmentOutbox.objects.count() + 1  # pylint: disable=no-member
+
+        return ExternalEnrollmentOutbox.objects.create(  # pylint: disable=no-member
+            idempotency_key='key-{}'.format(version),
+            user_email=user_email,
+            course_id=COURSE_ID,
+            course_mode='verified',
+            is_active=is_active,
+            version=version,
+            status=status,
+            **kwargs
+        )
+
+    def test_relay(self, controller_mock, course_mock):
+        """Testing the changes of every user and course are coalesced into their final state."""
+        post_mock = self.get_post_mock(controller_mock)
+        course = course_mock.return_value
+        self.create_entry(True)
+        self.create_entry(False)
+        final_entry = self.create_entry(True)
+        other_entry = self.create_entry(False, user_email='other@example.com')
+
+        self.assertEqual(relay_outbox(), 2)
+
+        self.assertEqual(post_mock.call_count, 2)
+        post_mock.assert_any_call(final_entry.get_data(), course.other_course_settings, raise_on_retryable=True)
+        post_mock.assert_any_call(other_entry.get_data(), course.other_course_settings, raise_on_retryable=True)
+        self.assertEqual(final_entry.get_data()['idempotency_key'], final_entry.idempotency_key)
+        self.assertEqual(
+            ExternalEnrollmentOutbox.objects.filter(  # pylint: disable=no-member
+                status=ExternalEnrollmentOutbox.COALESCED,
+            ).count(),
+            2,
+        )
+        final_entry.refresh_from_db()
+        self.assertEqual(final_entry.status, ExternalEnrollmentOutbox.SENT)
+        self.assertIsNotNone(final_entry.sent_at)
+        self.assertIsNone(get_next_relay_countdown())
+
+    def test_relay_already_sent_state(self, controller_mock, course_mock):  # pylint: disable=unused-argument
+        """Testing a final state equal to the last delivered one is not sent again."""
+        post_mock = self.get_post_mock(controller_mock)
+        self.create_entry(True, status=ExternalEnrollmentOutbox.SENT)
+        self.create_entry(False)
+        final_entry = self.create_entry(True)
+
+        self.assertEqual(relay_outbox(), 0)
+
+        post_mock.assert_not_called()
+        final_entry.refresh_from_db()
+        self.assertEqual(final_entry.status, ExternalEnrollmentOutbox.COALESCED)
+
+    def test_relay_outdated_change(self, controller_mock, course_mock):  # pylint: disable=unused-argument
+        """Testing a retried change older than the last delivered one is not sent."""
+        post_mock = self.get_post_mock(controller_mock)
+        outdated_entry = self.create_entry(False)
+        self.create_entry(True, status=ExternalEnrollmentOutbox.SENT)
+
+        self.assertEqual(relay_outbox(), 0)
+
+        post_mock.assert_not_called()
+        outdated_entry.refresh_from_db()
+        self.assertEqual(outdated_entry.status, ExternalEnrollmentOutbox.COALESCED)
+
+    def test_relay_failure(self, controller_mock, course_mock):  # pylint: disable=unused-argument
+        """Testing changes that can't be delivered are marked as failed."""
+        post_mock = self.get_post_mock(controller_mock)
+        outbox_entry = self.create_entry(True)
+        post_mock.side_effect = Exception('boom')
+
+        self.assertEqual(relay_outbox(), 0)
+
+        outbox_entry.refresh_from_db()
+        self.assertEqual(outbox_entry.status, ExternalEnrollmentOutbox.FAILED)
+
+    def test_relay_rejected(self, controller_mock, course_mock):  # pylint: disable=unused-argument
+        """Testing changes rejected by the provider or without a valid controller are marked as failed."""
+        self.get_post_mock(controller_mock, response_status=400)
+        controller_mock.side_effect = [controller_mock.return_value, None]
+        rejected_entry = self.create_entry(True)
+        other_entry = self.create_entry(True, user_email='other@example.com')
+
+        self.assertEqual(relay_outbox(), 0)
+
+        rejected_entry.refresh_from_db()
+        self.assertEqual(rejected_entry.status, ExternalEnrollmentOutbox.FAILED)
+        other_entry.refresh_from_db()
+        self.assertEqual(other_entry.status, ExternalEnrollmentOutbox.FAILED)
+
+    def test_relay_retryable(self, controller_mock, course_mock):  # pylint: disable=unused-argument
+        """Testing changes the provider couldn't process are deferred, and failed after max_attempts."""
+        post_mock = self.get_post_mock(controller_mock)
+        post_mock.side_effect = RetryableEnrollmentError('test-error', status_code=503, retry_after=30)
+        outbox_entry = self.create_entry(True)
+        now = timezone.now()
+
+        with patch('{}.timezone.now'.format(MODULE), return_value=now):
+            self.assertEqual(relay_outbox(), 0)
+
+            outbox_entry.refresh_from_db()
+            self.assertEqual(outbox_entry.status, ExternalEnrollmentOutbox.PENDING)
+            self.assertEqual(outbox_entry.attempts, 1)
+            self.assertEqual(outbox_entry.next_attempt_at, now + timedelta(seconds=30))
+            self.assertEqual(get_next_relay_countdown(), 31)
+            self.assertEqual(relay_outbox(), 0)
+            self.assertEqual(post_mock.call_count, 1)
+
+        ExternalEnrollmentOutbox.objects.filter(id=outbox_entry.id).update(attempts=4)  # pylint: disable=no-member
+
+        with patch('{}.timezone.now'.format(MODULE), return_value=now + timedelta(seconds=30)):
+            self.assertEqual(relay_outbox(), 0)
+
+        outbox_entry.refresh_from_db()
+        self.assertEqual(outbox_entry.status, ExternalEnrollmentOutbox.FAILED)
+        self.assertEqual(outbox_entry.attempts, 5)
+
+    def test_relay_stale_claims(self, controller_mock, course_mock):  # pylint: disable=unused-argument
+        """Testing entries left in sending by an interrupted relay are delivered again."""
+        self.get_post_mock(controller_mock)
+        outbox_entry = self.create_entry(True, status=ExternalEnrollmentOutbox.SENDING)
+        ExternalEnrollmentOutbox.objects.filter(id=outbox_entry.id).update(  # pylint: disable=no-member
+            updated_at=timezone.now() - timedelta(hours=1),
+        )
+
+        self.assertEqual(relay_outbox(), 1)
+
+    def test_relay_locked(self, controller_mock, course_mock):  # pylint: disable=unused-argument
+        """Testing a single relay runs at a time."""
+        self.create_entry(True)
+        cache.add(LOCK_KEY, True)
+
+        self.assertEqual(relay_outbox(), 0)
+
+        controller_mock.assert_not_called()
+
+    def test_relay_lock_taken_over(self, controller_mock, course_mock):  # pylint: disable=unused-argument
+        """Testing a relay whose lock expired keeps the lock of the relay that took it over."""
+        post_mock = self.get_post_mock(controller_mock)
+
+        def take_over_lock(*args, **kwargs):  # pylint: disable=unused-argument
+            """Replace the lock as another relay would after it expired."""
+            cache.set(LOCK_KEY, 'other-relay')
+            return {}, 200
+
+        post_mock.side_effect = take_over_lock
+        self.create_entry(True)
+
+        self.assertEqual(relay_outbox(), 1)
+
+        self.assertEqual(cache.get(LOCK_KEY), 'other-relay')
+
+    @override_settings(OEE_OUTBOX_SETTINGS={'batch_size': 1, 'max_batches': 1})
+    @patch('{}.schedule_outbox_relay'.format(MODULE))
+    def test_relay_max_batches(self, schedule_mock, controller_mock, course_mock):  # noqa pylint: disable=unused-argument
+        """Testing a relay stops after max_batches and schedules a relay for the changes left."""
+        self.get_post_mock(controller_mock)
+        self.create_entry(True)
+        self.create_entry(True, user_email='other@example.com')
+
+        self.assertEqual(relay_outbox(), 1)
+
+        schedule_mock.assert_called_once_with(countdown=0)
+        self.assertIsNone(cache.get(LOCK_KEY))
@@ -0,0 +1,93 @@
+"""Tests program_metadata file."""
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.test import TestCase, override_settings
+
+from openedx_external_enrollments.models import ProgramSalesforceEnrollment
+from openedx_external_enrollments.program_metadata import (
+    get_program_metadata,
+    invalidate_program_metadata,
+    preload_program_metadata,
+)
+from openedx_external_enrollments.signal_receivers import invalidate_program_metadata_cache
+
+
+@override_settings(OEE_PROGRAM_METADATA_CACHE_TIMEOUT=3600)
+class ProgramMetadataTest(TestCase):
+    """Test class for the program metadata cache."""
+
+    def setUp(self):
+        """Clear the cache and create a program."""
+        cache.clear()
+        self.program = ProgramSalesforceEnrollment.objects.create(  # pylint: disable=no-member
+            bundle_id='test-uuid',
+            meta={'Program_of_Interest': 'Test program', 'Lead_Source': {'name': 'test'}},
+        )
+
+    def test_read_through(self):
+        """Testing the metadata is queried once and every caller gets its own copy."""
+        with self.assertNumQueries(1):
+            meta = get_program_metadata('test-uuid')
+            meta['Drupal_ID'] = 'enrollment+program'
+            meta['Lead_Source']['name'] = 'changed'
+
+            self.assertEqual(get_program_metadata('test-uuid'), {
+                'Program_of_Interest': 'Test program',
+                'Lead_Source': {'name': 'test'},
+            })
+
+    def test_missing_program(self):
+        """Testing a missing program is not cached."""
+        with self.assertRaises(ProgramSalesforceEnrollment.DoesNotExist):  # pylint: disable=no-member
+            get_program_metadata('missing-uuid')
+
+        ProgramSalesforceEnrollment.objects.create(  # pylint: disable=no-member
+            bundle_id='missing-uuid',
+            meta={'Program_of_Interest': 'New program'},
+        )
+
+        self.assertEqual(get_program_metadata('missing-uuid'), {'Program_of_Interest': 'New program'})
+
+    def test_invalidated_on_save_and_delete(self):
+        """Testing saving or deleting a program drops the cached metadata."""
+        # The plugin signals_config isn't applied by the test settings, connect its receivers.
+        for signal in (post_save, post_delete):
+            signal.connect(invalidate_program_metadata_cache, sender=ProgramSalesforceEnrollment)
+            self.addCleanup(signal.disconnect, invalidate_program_metadata_cache, sender=ProgramSalesforceEnrollment)
+
+        get_program_metadata('test-uuid')
+        self.program.meta = {'Program_of_Interest': 'Renamed program'}
+        self.program.save()
+
+        self.assertEqual(get_program_metadata('test-uuid'), {'Program_of_Interest': 'Renamed program'})
+
+        self.program.delete()
+
+        with self.assertRaises(ProgramSalesforceEnrollment.DoesNotExist):  # pylint: disable=no-member
+            get_program_metadata('test-uuid')
+
+    def test_preload(self):
+        """Testing the preload caches the given programs, or every program, with one query."""
+        ProgramSalesforceEnrollment.objects.create(  # pylint: disable=no-member
+            bundle_id='other-uuid',
+            meta={'Program_of_Interest': 'Other program'},
+        )
+
+        with self.assertNumQueries(1):
+            self.assertEqual(preload_program_metadata(['other-uuid']), 1)
+
+        invalidate_program_metadata()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(preload_program_metadata(), 2)
+            get_program_metadata('test-uuid')
+            get_program_metadata('other-uuid')
+
+    @override_settings(OEE_PROGRAM_METADATA_CACHE_TIMEOUT=0)
+    def test_disabled(self):
+        """Testing the metadata is always queried when the cache is disabled."""
+        self.assertEqual(preload_program_metadata(), 0)
+
+        with self.assertNumQueries(2):
+            get_program_metadata('test-uuid')
+            get_program_metadata('test-uuid')
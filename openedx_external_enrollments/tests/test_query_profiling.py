@@ -0,0 +1,43 @@
+"""Tests query_profiling file."""
+from django.test import TestCase
+
+from openedx_external_enrollments.models import ProgramSalesforceEnrollment
+from openedx_external_enrollments.query_profiling import record_edxapp_call, record_edxapp_calls
+from openedx_external_enrollments.tests.query_profiling import profile_queries
+
+
+class QueryProfilingTest(TestCase):
+    """Test class for the query profiling helpers."""
+
+    def test_profile_queries(self):
+        """Testing the queries and edxapp calls of the block are recorded by every active profile."""
+        record_edxapp_call('get_user')
+
+        with profile_queries() as outer_profile:
+            ProgramSalesforceEnrollment.objects.count()  # pylint: disable=no-member
+            record_edxapp_call('get_user')
+
+            with profile_queries() as inner_profile:
+                record_edxapp_call('get_course_by_id')
+
+        record_edxapp_call('get_user')
+
+        self.assertEqual(outer_profile.query_count, 1)
+        self.assertIn('COUNT', outer_profile.queries[0])
+        self.assertEqual(outer_profile.edxapp_calls, {'get_user': 1, 'get_course_by_id': 1})
+        self.assertEqual(inner_profile.to_dict(), {
+            'query_count': 0,
+            'queries': [],
+            'edxapp_calls': {'get_course_by_id': 1},
+        })
+
+    def test_record_edxapp_calls(self):
+        """Testing the calls are only counted while a recording is active."""
+        record_edxapp_call('get_user')
+
+        with record_edxapp_calls() as calls:
+            record_edxapp_call('get_user')
+
+        record_edxapp_call('get_user')
+
+        self.assertEqual(calls, {'get_user': 1})
@@ -0,0 +1,84 @@
+"""Tests rate_limits file."""
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from mock import patch
+
+from openedx_external_enrollments.rate_limits import RateLimiter
+
+MODULE = 'openedx_external_enrollments.rate_limits'
+
+
+class RateLimiterTest(TestCase):
+    """Test class for the RateLimiter class."""
+
+    def setUp(self):
+        """Clear the cache."""
+        cache.clear()
+
+    def test_unlimited(self):
+        """Testing the requests aren't limited by default."""
+        rate_limiter = RateLimiter('test')
+
+        for _ in range(100):
+            self.assertEqual(rate_limiter.acquire(), 0)
+
+    @override_settings(OEE_RATE_LIMIT_SETTINGS={'test': {'rate': 2, 'burst': 3}})
+    def test_token_bucket(self):
+        """Testing the bucket allows a burst and then refills rate tokens per second."""
+        rate_limiter = RateLimiter('test')
+
+        with patch('{}.time.time'.format(MODULE), return_value=1000):
+            self.assertEqual([rate_limiter.acquire() for _ in range(3)], [0, 0, 0])
+            self.assertEqual(rate_limiter.acquire(), 0.5)
+
+        with patch('{}.time.time'.format(MODULE), return_value=1000.5):
+            self.assertEqual(rate_limiter.acquire(), 0)
+            self.assertEqual(rate_limiter.acquire(), 0.5)
+
+        with patch('{}.time.time'.format(MODULE), return_value=1100):
+            self.assertEqual(rate_limiter.get_stats()['tokens'], 3)
+
+        self.assertEqual(RateLimiter('other').acquire(), 0)
+
+    @override_settings(OEE_RATE_LIMIT_SETTINGS={'default': {'max_in_flight': 2, 'in_flight_retry_after': 3}})
+    def test_max_in_flight(self):
+        """Testing the concurrent requests are capped until a slot is released."""
+        rate_limiter = RateLimiter('test')
+
+        self.assertEqual(rate_limiter.acquire(), 0)
+        self.assertEqual(rate_limiter.acquire(), 0)
+        self.assertEqual(rate_limiter.acquire(), 3)
+        self.assertEqual(rate_limiter.get_stats()['in_flight'], 2)
+
+        rate_limiter.release()
+
+        self.assertEqual(rate_limiter.acquire(), 0)
+
+    @override_settings(OEE_RATE_LIMIT_SETTINGS={'default': {'max_in_flight': 2}})
+    def test_expired_slot(self):
+        """Testing an expired slot is taken again without freeing the slots still in flight."""
+        rate_limiter = RateLimiter('test')
+        other_rate_limiter = RateLimiter('test')
+
+        self.assertEqual(rate_limiter.acquire(), 0)
+        self.assertEqual(other_rate_limiter.acquire(), 0)
+
+        cache.delete(rate_limiter._get_key('in_flight.0'))  # pylint: disable=protected-access
+
+        self.assertEqual(RateLimiter('test').acquire(), 0)
+        self.assertEqual(RateLimiter('test').acquire(), 1)
+
+        rate_limiter.release()
+
+        self.assertEqual(rate_limiter.get_stats()['in_flight'], 2)
+
+    @override_settings(OEE_RATE_LIMIT_SETTINGS={'default': {'rate': 4, 'max_in_flight': 1}})
+    def test_locked_bucket(self):
+        """Testing the request is throttled, freeing its slot, when the bucket lock can't be taken."""
+        rate_limiter = RateLimiter('test')
+        cache.add(rate_limiter._get_key('lock'), True)  # pylint: disable=protected-access
+
+        with patch('{}.LOCK_MAX_WAIT'.format(MODULE), 0):
+            self.assertEqual(rate_limiter.acquire(), 0.25)
+
+        self.assertEqual(rate_limiter.get_stats()['in_flight'], 0)
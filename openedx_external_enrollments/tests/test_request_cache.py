@@ -0,0 +1,90 @@
+"""Tests request_cache file and the memoized courseware getters."""
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from mock import Mock, patch
+
+from openedx_external_enrollments.edxapp_wrapper.get_courseware import (
+    get_course_by_id,
+    get_other_course_settings,
+    invalidate_other_course_settings,
+)
+from openedx_external_enrollments.request_cache import end_request, get_request_cache, request_cache_scope
+from openedx_external_enrollments.signal_receivers import invalidate_course_settings_cache
+
+MODULE = 'openedx_external_enrollments.edxapp_wrapper.get_courseware'
+
+
+class RequestCacheTest(TestCase):
+    """Test class for the unit of work cache."""
+
+    def setUp(self):
+        """Start every test outside of a unit of work."""
+        end_request()
+
+    def test_no_scope(self):
+        """Testing nothing is cached outside of a unit of work."""
+        self.assertIsNone(get_request_cache('test'))
+
+    def test_nested_scopes(self):
+        """Testing nested scopes don't share or clear their values."""
+        with request_cache_scope():
+            get_request_cache('test')['key'] = 'outer'
+
+            with request_cache_scope():
+                self.assertEqual(get_request_cache('test'), {})
+                get_request_cache('test')['key'] = 'inner'
+
+            self.assertEqual(get_request_cache('test'), {'key': 'outer'})
+
+        self.assertIsNone(get_request_cache('test'))
+
+
+@patch('{}._get_course_by_id'.format(MODULE))
+class GetCoursewareTest(TestCase):
+    """Test class for the memoized courseware getters."""
+
+    def setUp(self):
+        """Start every test with empty caches."""
+        end_request()
+        cache.clear()
+        self.course = Mock()
+        self.course.other_course_settings = {'external_platform_target': 'edX'}
+
+    def test_get_course_by_id_memoized(self, get_course_mock):
+        """Testing the descriptor is loaded once per unit of work."""
+        get_course_mock.return_value = self.course
+
+        with request_cache_scope():
+            self.assertIs(get_course_by_id('course-key'), self.course)
+            self.assertIs(get_course_by_id('course-key'), self.course)
+            get_course_by_id('course-key', depth=0)
+
+        get_course_by_id('course-key')
+
+        self.assertEqual(get_course_mock.call_count, 3)
+
+    def test_get_other_course_settings_not_cached(self, get_course_mock):
+        """Testing the settings are read from the course when the cache is disabled."""
+        get_course_mock.return_value = self.course
+
+        get_other_course_settings('course-key')
+        self.assertEqual(get_other_course_settings('course-key'), {'external_platform_target': 'edX'})
+
+        self.assertEqual(get_course_mock.call_count, 2)
+
+    @override_settings(OEE_COURSE_SETTINGS_CACHE_TIMEOUT=60)
+    def test_get_other_course_settings_cached(self, get_course_mock):
+        """Testing the settings are cached across requests until the course is published."""
+        get_course_mock.return_value = self.course
+
+        get_other_course_settings('course-key')
+        self.assertEqual(get_other_course_settings('course-key'), {'external_platform_target': 'edX'})
+        self.assertEqual(get_course_mock.call_count, 1)
+
+        invalidate_course_settings_cache(sender=None, course_key='course-key')
+        get_other_course_settings('course-key')
+        self.assertEqual(get_course_mock.call_count, 2)
+
+        invalidate_other_course_settings('course-key')
+        get_other_course_settings('course-key')
+        self.assertEqual(get_course_mock.call_count, 3)
@@ -0,0 +1,62 @@
+"""Tests request_logs file."""
+from django.test import TestCase, override_settings
+from mock import patch
+
+from openedx_external_enrollments.models import EnrollmentRequestLog
+from openedx_external_enrollments.request_logs import (
+    BufferedRequestLogSink,
+    SyncRequestLogSink,
+    flush_request_logs,
+    get_request_log_sink,
+    log_enrollment_request,
+)
+
+
+class RequestLogsTest(TestCase):
+    """Test class for the enrollment request log sinks."""
+
+    def test_sync_sink(self):
+        """Testing the sync sink writes every record right away."""
+        self.assertIsInstance(get_request_log_sink(), SyncRequestLogSink)
+
+        log_enrollment_request('test', {'test': 'details'})
+
+        self.assertEqual(EnrollmentRequestLog.objects.get().details, {'test': 'details'})  # noqa pylint: disable=no-member
+
+    @override_settings(OEE_REQUEST_LOG_SETTINGS={'mode': 'buffered', 'buffer_size': 3})
+    def test_buffered_sink_size(self):
+        """Testing the buffered sink writes the records in one query when the buffer is full."""
+        self.assertIsInstance(get_request_log_sink(), BufferedRequestLogSink)
+
+        log_enrollment_request('test', {'record': 1})
+        log_enrollment_request('test', {'record': 2})
+        self.assertFalse(EnrollmentRequestLog.objects.exists())  # pylint: disable=no-member
+
+        with self.assertNumQueries(1):
+            log_enrollment_request('test', {'record': 3})
+
+        self.assertEqual(EnrollmentRequestLog.objects.count(), 3)  # pylint: disable=no-member
+
+    @override_settings(OEE_REQUEST_LOG_SETTINGS={'mode': 'buffered', 'flush_interval': 10})
+    @patch('openedx_external_enrollments.request_logs.time.time')
+    def test_buffered_sink_interval(self, time_mock):
+        """Testing the buffered sink writes the records when the oldest one is too old."""
+        time_mock.return_value = 1000
+        log_enrollment_request('test', {'record': 1})
+        time_mock.return_value = 1005
+        log_enrollment_request('test', {'record': 2})
+        self.assertFalse(EnrollmentRequestLog.objects.exists())  # pylint: disable=no-member
+
+        time_mock.return_value = 1010
+        log_enrollment_request('test', {'record': 3})
+
+        self.assertEqual(EnrollmentRequestLog.objects.count(), 3)  # pylint: disable=no-member
+
+    @override_settings(OEE_REQUEST_LOG_SETTINGS={'mode': 'buffered'})
+    def test_flush_request_logs(self):
+        """Testing pending records are written when the unit of work ends."""
+        log_enrollment_request('test', {'record': 1})
+
+        self.assertEqual(flush_request_logs(), 1)
+        self.assertEqual(flush_request_logs(), 0)
+        self.assertEqual(EnrollmentRequestLog.objects.count(), 1)  # pylint: disable=no-member
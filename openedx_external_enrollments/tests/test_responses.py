@@ -0,0 +1,62 @@
+"""Tests responses file."""
+from django.test import TestCase
+from mock import Mock
+
+from openedx_external_enrollments.responses import (
+    CLIENT_ERROR,
+    NON_JSON,
+    SERVER_ERROR,
+    SUCCESS,
+    classify_response,
+    decode_response,
+)
+
+
+def build_response(status_code, chunks):
+    """Return a response mock streaming the given chunks."""
+    response = Mock(status_code=status_code, encoding=None)
+    response.iter_content.return_value = iter(chunks)
+    return response
+
+
+class ResponsesTest(TestCase):
+    """Test class for the provider responses decoding."""
+
+    def test_decode_json(self):
+        """Testing JSON bodies are parsed once and the response is closed."""
+        response = build_response(200, [b'{"test": ', b'"response"}'])
+
+        decoded = decode_response(response)
+
+        self.assertEqual(decoded.body, {'test': 'response'})
+        self.assertEqual(decoded.status_code, 200)
+        self.assertEqual(decoded.classification, SUCCESS)
+        self.assertFalse(decoded.truncated)
+        response.close.assert_called_once_with()
+
+    def test_decode_non_json(self):
+        """Testing text bodies are kept as text."""
+        decoded = decode_response(build_response(200, [b'<html>ok</html>']))
+
+        self.assertEqual(decoded.body, '<html>ok</html>')
+        self.assertEqual(decoded.classification, NON_JSON)
+
+    def test_decode_truncated(self):
+        """Testing large bodies are truncated and not read further."""
+        chunks = iter([b'a' * 6, b'b' * 6, b'c' * 6])
+        response = Mock(status_code=500, encoding='utf-8')
+        response.iter_content.return_value = chunks
+
+        decoded = decode_response(response, max_size=10)
+
+        self.assertEqual(decoded.body, 'aaaaaabbbb')
+        self.assertTrue(decoded.truncated)
+        self.assertEqual(decoded.classification, SERVER_ERROR)
+        self.assertEqual(list(chunks), [b'c' * 6])
+
+    def test_classify_response(self):
+        """Testing error statuses take precedence over the body format."""
+        self.assertEqual(classify_response(201), SUCCESS)
+        self.assertEqual(classify_response(200, is_json=False), NON_JSON)
+        self.assertEqual(classify_response(404, is_json=False), CLIENT_ERROR)
+        self.assertEqual(classify_response(502), SERVER_ERROR)
@@ -0,0 +1,42 @@
+"""Tests retries file."""
+from email.utils import formatdate
+from time import time
+
+from django.test import TestCase
+from mock import patch
+
+from openedx_external_enrollments.retries import get_retry_countdown, is_retryable_status, parse_retry_after
+
+
+class RetriesTest(TestCase):
+    """Test class for the retry helpers."""
+
+    def test_is_retryable_status(self):
+        """Testing rate limits and server errors are retryable."""
+        self.assertTrue(is_retryable_status(429))
+        self.assertTrue(is_retryable_status(500))
+        self.assertTrue(is_retryable_status(503))
+        self.assertFalse(is_retryable_status(200))
+        self.assertFalse(is_retryable_status(400))
+
+    def test_parse_retry_after(self):
+        """Testing Retry-After is parsed from seconds and HTTP dates."""
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after('not-a-date'))
+        self.assertEqual(parse_retry_after('120'), 120)
+        self.assertEqual(parse_retry_after('-5'), 0)
+        self.assertAlmostEqual(parse_retry_after(formatdate(time() + 60, usegmt=True)), 60, delta=2)
+        self.assertEqual(parse_retry_after(formatdate(time() - 60, usegmt=True)), 0)
+
+    @patch('openedx_external_enrollments.retries.random.uniform')
+    def test_get_retry_countdown(self, uniform_mock):
+        """Testing the countdown grows exponentially with jitter and honors Retry-After."""
+        uniform_mock.side_effect = lambda low, high: high
+
+        self.assertEqual(get_retry_countdown(0, 5, 600), 5)
+        self.assertEqual(get_retry_countdown(3, 5, 600), 40)
+        self.assertEqual(get_retry_countdown(10, 5, 600), 600)
+        uniform_mock.assert_called_with(0, 300)
+
+        self.assertEqual(get_retry_countdown(1, 5, 600, retry_after=30), 30)
+        self.assertEqual(get_retry_countdown(1, 5, 600, retry_after=3600), 600)
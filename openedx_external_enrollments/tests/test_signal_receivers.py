@@ -1,24 +1,32 @@
 """Tests SalesforceEnrollment class file."""
-from django.test import TestCase
-from mock import Mock, patch
+from django.test import TestCase, override_settings
+from mock import ANY, Mock, patch
 
-from openedx_external_enrollments.signal_receivers import delete_external_enrollment, update_external_enrollment
+from openedx_external_enrollments.course_index import is_external_course
+from openedx_external_enrollments.signal_receivers import (
+    delete_external_enrollment,
+    invalidate_program_metadata_cache,
+    invalidate_site_configuration_cache,
+    track_enrollment_state,
+    update_external_course_index,
+    update_external_enrollment,
+)
 
 
 class UpdateExternalEnrollmentTest(TestCase):
     """Test class for update_external_enrollment method."""
 
     @patch('openedx_external_enrollments.signal_receivers.get_course_by_id')
-    @patch('openedx_external_enrollments.signal_receivers.configuration_helpers')
-    def test_update_enrollments(self, configuration_helpers_mock, get_course_by_id_mock):
+    @patch('openedx_external_enrollments.signal_receivers.get_site_settings')
+    def test_update_enrollments(self, site_settings_mock, get_course_by_id_mock):
         """Testing update_external_enrollments method."""
         instance = Mock()
         instance.is_active = False
         instance.mode = 'test-mode'
         instance.user.email = 'test-email'
-        instance.course.id = 'test-course-id'
+        instance.course_id = 'test-course-id'
         get_course_by_id_mock.return_value = 'test-course'
-        configuration_helpers_mock.get_value.return_value = False
+        site_settings_mock.return_value.enabled = False
         data = {
             'user_email': instance.user.email,
             'course_mode': instance.mode,
@@ -31,16 +39,18 @@ class UpdateExternalEnrollmentTest(TestCase):
             get_course_by_id_mock.assert_not_called()
             execute_mock.assert_not_called()
 
-            configuration_helpers_mock.get_value.return_value = True
+            site_settings_mock.return_value.enabled = True
 
             update_external_enrollment('fake-sender', True, instance)
 
             get_course_by_id_mock.assert_not_called()
             execute_mock.assert_not_called()
 
+            # The enrollment was loaded active.
+            instance._oee_enrollment_state = (True, 'test-mode')  # pylint: disable=protected-access
             update_external_enrollment('fake-sender', False, instance)
 
-            get_course_by_id_mock.assert_called_once_with(instance.course.id)
+            get_course_by_id_mock.assert_called_once_with(instance.course_id)
             execute_mock.assert_called_once_with(
                 data=data,
                 course='test-course',
@@ -55,20 +65,127 @@ class UpdateExternalEnrollmentTest(TestCase):
                 course='test-course',
             )
 
+    @override_settings(EXTERNAL_ENROLLMENTS_DISPATCH_MODE='async')
+    @patch('openedx_external_enrollments.signal_receivers.transaction')
+    @patch('openedx_external_enrollments.signal_receivers.process_external_enrollment')
+    @patch('openedx_external_enrollments.signal_receivers.get_course_by_id')
+    @patch('openedx_external_enrollments.signal_receivers.get_site_settings')
+    def test_update_enrollments_async(self, site_settings_mock, get_course_by_id_mock, task_mock,
+                                      transaction_mock):
+        """Testing update_external_enrollments method when the async dispatch mode is enabled."""
+        instance = Mock()
+        instance.is_active = True
+        instance.mode = 'test-mode'
+        instance.user.email = 'test-email'
+        instance.course_id = 'test-course-id'
+        site_settings_mock.return_value.enabled = True
+        data = {
+            'user_email': instance.user.email,
+            'course_mode': instance.mode,
+            'is_active': True,
+        }
+
+        with patch('openedx_external_enrollments.signal_receivers.execute_external_enrollment') as execute_mock:
+            update_external_enrollment('fake-sender', False, instance)
+
+            task_mock.delay.assert_not_called()
+            on_commit_callback = transaction_mock.on_commit.call_args[0][0]
+            on_commit_callback()
+
+            task_mock.delay.assert_called_once_with('test-course-id', data)
+            get_course_by_id_mock.assert_not_called()
+            execute_mock.assert_not_called()
+
+    @patch('openedx_external_enrollments.signal_receivers.get_course_by_id')
+    @patch('openedx_external_enrollments.signal_receivers.get_site_settings')
+    def test_update_enrollments_unchanged(self, site_settings_mock, get_course_by_id_mock):
+        """Testing saves that don't change is_active nor mode are not dispatched."""
+        instance = Mock(is_active=True, mode='test-mode', course_id='test-course-id')
+        site_settings_mock.return_value.enabled = True
+        track_enrollment_state(sender=None, instance=instance)
+
+        with patch('openedx_external_enrollments.signal_receivers.execute_external_enrollment') as execute_mock:
+            update_external_enrollment('fake-sender', False, instance)
+
+            execute_mock.assert_not_called()
+
+            instance.mode = 'verified'
+            update_external_enrollment('fake-sender', False, instance)
+            update_external_enrollment('fake-sender', False, instance)
+
+            execute_mock.assert_called_once()
+            self.assertEqual(get_course_by_id_mock.call_count, 1)
+
+    @override_settings(EXTERNAL_ENROLLMENTS_DISPATCH_MODE='async', OEE_ENROLLMENT_DEBOUNCE_WINDOW=5)
+    @patch('openedx_external_enrollments.signal_receivers.transaction')
+    @patch('openedx_external_enrollments.signal_receivers.process_external_enrollment')
+    @patch('openedx_external_enrollments.signal_receivers.get_site_settings')
+    def test_update_enrollments_debounced(self, site_settings_mock, task_mock, transaction_mock):
+        """Testing async enrollments are delayed by the debounce window."""
+        instance = Mock(is_active=True, mode='test-mode', course_id='test-course-id')
+        instance.user.email = 'test-email'
+        site_settings_mock.return_value.enabled = True
+
+        update_external_enrollment('fake-sender', True, instance)
+        transaction_mock.on_commit.call_args[0][0]()
+
+        task_mock.apply_async.assert_called_once_with(
+            args=('test-course-id', {'user_email': 'test-email', 'course_mode': 'test-mode', 'is_active': True}),
+            kwargs={'debounce_token': ANY},
+            countdown=5,
+        )
+        task_mock.delay.assert_not_called()
+
+    @override_settings(EXTERNAL_ENROLLMENTS_DISPATCH_MODE='outbox')
+    @patch('openedx_external_enrollments.signal_receivers.add_to_outbox')
+    @patch('openedx_external_enrollments.signal_receivers.get_course_by_id')
+    @patch('openedx_external_enrollments.signal_receivers.get_site_settings')
+    def test_update_enrollments_outbox(self, site_settings_mock, get_course_by_id_mock, outbox_mock):
+        """Testing update_external_enrollments method when the outbox dispatch mode is enabled."""
+        instance = Mock(is_active=True, mode='test-mode', course_id='test-course-id')
+        instance.user.email = 'test-email'
+        site_settings_mock.return_value.enabled = True
+
+        with patch('openedx_external_enrollments.signal_receivers.execute_external_enrollment') as execute_mock:
+            update_external_enrollment('fake-sender', False, instance)
+
+        outbox_mock.assert_called_once_with(
+            {'user_email': 'test-email', 'course_mode': 'test-mode', 'is_active': True},
+            'test-course-id',
+        )
+        get_course_by_id_mock.assert_not_called()
+        execute_mock.assert_not_called()
+
+    @override_settings(OEE_EXTERNAL_COURSE_INDEX_SETTINGS={'enabled': True})
+    @patch.dict('openedx_external_enrollments.course_index._LOCAL_INDEX', {})
+    @patch('openedx_external_enrollments.signal_receivers.get_course_by_id')
+    @patch('openedx_external_enrollments.signal_receivers.get_site_settings')
+    def test_update_enrollments_internal_course(self, site_settings_mock, get_course_by_id_mock):
+        """Testing the enrollments of courses missing from the external course index are skipped."""
+        instance = Mock(is_active=True, course_id='internal-course-id')
+        site_settings_mock.return_value.enabled = True
+
+        with patch('openedx_external_enrollments.signal_receivers.execute_external_enrollment') as execute_mock:
+            update_external_enrollment('fake-sender', False, instance)
+            delete_external_enrollment('fake-sender', instance)
+
+        get_course_by_id_mock.assert_not_called()
+        execute_mock.assert_not_called()
+
 
 class DeleteExternalEnrollmentTest(TestCase):
     """Test class for delete_external_enrollment method."""
 
     @patch('openedx_external_enrollments.signal_receivers.get_course_by_id')
-    @patch('openedx_external_enrollments.signal_receivers.configuration_helpers')
-    def test_delete_enrollments(self, configuration_helpers_mock, get_course_by_id_mock):
+    @patch('openedx_external_enrollments.signal_receivers.get_site_settings')
+    def test_delete_enrollments(self, site_settings_mock, get_course_by_id_mock):
         """Testing delete_external_enrollments method."""
         instance = Mock()
         instance.mode = 'test-mode'
         instance.user.email = 'test-email'
-        instance.course.id = 'test-course-id'
+        instance.course_id = 'test-course-id'
         get_course_by_id_mock.return_value = 'test-course'
-        configuration_helpers_mock.get_value.return_value = False
+        site_settings_mock.return_value.enabled = False
         data = {
             'user_email': instance.user.email,
             'course_mode': instance.mode,
@@ -81,12 +198,63 @@ class DeleteExternalEnrollmentTest(TestCase):
             get_course_by_id_mock.assert_not_called()
             execute_mock.assert_not_called()
 
-            configuration_helpers_mock.get_value.return_value = True
+            site_settings_mock.return_value.enabled = True
 
             delete_external_enrollment('fake-sender', instance)
 
-            get_course_by_id_mock.assert_called_once_with(instance.course.id)
+            get_course_by_id_mock.assert_called_once_with(instance.course_id)
             execute_mock.assert_called_once_with(
                 data=data,
                 course='test-course',
             )
+
+
+class UpdateExternalCourseIndexTest(TestCase):
+    """Test class for update_external_course_index receiver."""
+
+    @patch('openedx_external_enrollments.signal_receivers.index_course')
+    @patch('openedx_external_enrollments.signal_receivers.get_course_by_id')
+    def test_update_external_course_index(self, get_course_by_id_mock, index_course_mock):
+        """Testing the published course is indexed with its other_course_settings."""
+        course_settings = {'external_platform_target': 'openedx'}
+        get_course_by_id_mock.return_value.other_course_settings = course_settings
+
+        update_external_course_index(sender=None, course_key='course-key')
+
+        get_course_by_id_mock.assert_called_once_with('course-key')
+        index_course_mock.assert_called_once_with('course-key', course_settings)
+
+    @override_settings(OEE_EXTERNAL_COURSE_INDEX_SETTINGS={'enabled': True, 'check_interval': 60})
+    @patch.dict('openedx_external_enrollments.course_index._LOCAL_INDEX', {})
+    @patch('openedx_external_enrollments.signal_receivers.get_course_by_id')
+    def test_publish_new_external_course(self, get_course_by_id_mock):
+        """Testing a course missing from the index is external as soon as it's published."""
+        get_course_by_id_mock.return_value.other_course_settings = {'external_platform_target': 'openedx'}
+
+        self.assertFalse(is_external_course('course-v1:test+course+run'))
+
+        update_external_course_index(sender=None, course_key='course-v1:test+course+run')
+
+        self.assertTrue(is_external_course('course-v1:test+course+run'))
+
+
+class InvalidateSiteConfigurationCacheTest(TestCase):
+    """Test class for invalidate_site_configuration_cache receiver."""
+
+    @patch('openedx_external_enrollments.signal_receivers.invalidate_site')
+    def test_invalidate_site_configuration_cache(self, invalidate_site_mock):
+        """Testing the site of the saved configuration is invalidated."""
+        invalidate_site_configuration_cache(sender=None, instance=Mock(site_id=3))
+
+        invalidate_site_mock.assert_called_once_with('3')
+
+
+class InvalidateProgramMetadataCacheTest(TestCase):
+    """Test class for invalidate_program_metadata_cache receiver."""
+
+    @patch('openedx_external_enrollments.signal_receivers.invalidate_program_metadata')
+    def test_invalidate_program_metadata_cache(self, invalidate_mock):
+        """Testing the program metadata cache is invalidated."""
+        invalidate_program_metadata_cache(sender=None, instance=Mock(bundle_id='test-uuid'))
+
+        invalidate_mock.assert_called_once_with()
@@ -0,0 +1,103 @@
+"""Tests site_cache file."""
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from mock import Mock, patch
+
+from openedx_external_enrollments.site_cache import (
+    get_current_site_key,
+    get_site_settings,
+    get_site_version,
+    invalidate_site,
+)
+
+MODULE = 'openedx_external_enrollments.site_cache'
+
+
+@patch.dict('{}._SITE_SETTINGS'.format(MODULE), {})
+@patch.dict('{}._SITE_VERSIONS'.format(MODULE), {})
+class SiteCacheTest(TestCase):
+    """Test class for the site versions."""
+
+    def setUp(self):
+        """Clear the cache."""
+        cache.clear()
+
+    @patch('{}.configuration_helpers'.format(MODULE))
+    def test_get_current_site_key(self, configuration_helpers_mock):
+        """Testing the site id is the key, and the default key is used outside of a site."""
+        configuration_helpers_mock.get_current_site_configuration.return_value = Mock(site_id=3)
+
+        self.assertEqual(get_current_site_key(), '3')
+
+        configuration_helpers_mock.get_current_site_configuration.return_value = None
+
+        self.assertEqual(get_current_site_key(), 'default')
+
+    def test_site_version(self):
+        """Testing the version is stable until the site is invalidated."""
+        version = get_site_version('1')
+
+        self.assertEqual(get_site_version('1'), version)
+        self.assertNotEqual(get_site_version('2'), version)
+
+        invalidate_site('1')
+
+        self.assertNotEqual(get_site_version('1'), version)
+
+    @patch('{}.get_current_site_key'.format(MODULE))
+    @patch('{}.configuration_helpers'.format(MODULE))
+    def test_get_site_settings(self, configuration_helpers_mock, site_key_mock):
+        """Testing the values are read once per site until its configuration changes."""
+        values = {
+            'ENABLE_EXTERNAL_ENROLLMENTS': True,
+            'VALID_EXTERNAL_TARGETS': ['openedx', 'greenfig'],
+            'DROPBOX_FILE_PATH': '/roster.txt',
+        }
+        configuration_helpers_mock.get_value.side_effect = values.get
+        site_key_mock.return_value = '1'
+
+        site_settings = get_site_settings()
+
+        self.assertTrue(site_settings.enabled)
+        self.assertEqual(site_settings.valid_targets, frozenset(['openedx', 'greenfig']))
+        self.assertEqual(site_settings.dropbox_file_path, '/roster.txt')
+        self.assertEqual(site_settings.dropbox_token, 'token')
+        self.assertIs(get_site_settings(), site_settings)
+        self.assertEqual(configuration_helpers_mock.get_value.call_count, 5)
+
+        values['ENABLE_EXTERNAL_ENROLLMENTS'] = False
+        invalidate_site('1')
+
+        self.assertFalse(get_site_settings().enabled)
+
+    @patch('{}.get_site_configuration_model'.format(MODULE))
+    @patch('{}.get_current_site_key'.format(MODULE))
+    @patch('{}.configuration_helpers'.format(MODULE))
+    def test_get_other_site_settings(self, configuration_helpers_mock, site_key_mock, model_mock):
+        """Testing the values of another site are read from its configuration, or are the defaults without one."""
+        site_key_mock.return_value = 'default'
+        site_configuration = model_mock.return_value.objects.filter.return_value.first.return_value
+        site_configuration.get_value.side_effect = {'DROPBOX_FILE_PATH': '/site-3.txt'}.get
+
+        site_settings = get_site_settings('3')
+
+        self.assertEqual(site_settings.site_key, '3')
+        self.assertEqual(site_settings.dropbox_file_path, '/site-3.txt')
+        model_mock.return_value.objects.filter.assert_called_once_with(site_id='3')
+        configuration_helpers_mock.get_value.assert_not_called()
+
+        model_mock.return_value.objects.filter.return_value.first.return_value = None
+
+        self.assertEqual(get_site_settings('4').dropbox_file_path, '/courses.txt')
+
+    @override_settings(OEE_SITE_VERSION_CHECK_INTERVAL=60)
+    def test_site_version_check_interval(self):
+        """Testing the shared version is read once per interval, local invalidations apply right away."""
+        version = get_site_version('1')
+        cache.clear()
+
+        self.assertEqual(get_site_version('1'), version)
+
+        invalidate_site('1')
+
+        self.assertNotEqual(get_site_version('1'), version)
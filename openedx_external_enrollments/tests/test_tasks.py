@@ -0,0 +1,217 @@
+"""Tests tasks file."""
+from django.test import TestCase
+from mock import patch
+from opaque_keys.edx.keys import CourseKey
+
+from openedx_external_enrollments.exceptions import RetryableEnrollmentError, ThrottledEnrollmentError
+from openedx_external_enrollments.models import EnrollmentDeadLetter, ExternalEnrollmentJob
+from openedx_external_enrollments.tasks import (
+    flush_greenfig_roster,
+    generate_salesforce_enrollment,
+    process_external_enrollment,
+    process_external_enrollment_job,
+    relay_external_enrollment_outbox,
+)
+
+
+@patch('openedx_external_enrollments.tasks.SalesforceEnrollment')
+class GenerateSalesforceEnrollmentTest(TestCase):
+    """Test class for generate_salesforce_enrollment task."""
+
+    def setUp(self):
+        """Set the payload."""
+        self.data = {'supported_lines': [{'user_email': 'test-email'}]}
+
+    def test_enrollment(self, controller_class_mock):
+        """Testing successful enrollments are not retried."""
+        controller_mock = controller_class_mock.return_value
+
+        with patch.object(generate_salesforce_enrollment, 'retry') as retry_mock:
+            generate_salesforce_enrollment(self.data)  # pylint: disable=no-value-for-parameter
+
+        controller_mock._post_enrollment.assert_called_once_with(  # pylint: disable=protected-access
+            self.data,
+            raise_on_retryable=True,
+        )
+        retry_mock.assert_not_called()
+
+    @patch('openedx_external_enrollments.tasks.get_retry_countdown')
+    def test_retry(self, countdown_mock, controller_class_mock):
+        """Testing transient failures are retried with the computed countdown."""
+        error = RetryableEnrollmentError('test-error', status_code=429, retry_after=30)
+        controller_class_mock.return_value._post_enrollment.side_effect = error  # noqa pylint: disable=protected-access
+        countdown_mock.return_value = 30
+
+        with patch.object(generate_salesforce_enrollment, 'retry', return_value=Exception('retry')) as retry_mock:
+            with self.assertRaises(Exception):
+                generate_salesforce_enrollment(self.data)  # pylint: disable=no-value-for-parameter
+
+        countdown_mock.assert_called_once_with(0, 5, 600, retry_after=30)
+        retry_mock.assert_called_once_with(exc=error, countdown=30)
+        self.assertFalse(EnrollmentDeadLetter.objects.exists())  # pylint: disable=no-member
+
+    def test_dead_letter(self, controller_class_mock):
+        """Testing the payload is dead-lettered when the retries run out."""
+        controller_mock = controller_class_mock.return_value
+        controller_mock.__str__.return_value = 'salesforce'
+        controller_mock._post_enrollment.side_effect = RetryableEnrollmentError('test-error')  # noqa pylint: disable=protected-access
+
+        with patch.object(generate_salesforce_enrollment, 'max_retries', 0):
+            with patch.object(generate_salesforce_enrollment, 'retry') as retry_mock:
+                generate_salesforce_enrollment(self.data)  # pylint: disable=no-value-for-parameter
+
+        retry_mock.assert_not_called()
+        dead_letter = EnrollmentDeadLetter.objects.get()  # pylint: disable=no-member
+        self.assertEqual(dead_letter.request_type, 'salesforce')
+        self.assertEqual(dead_letter.data, self.data)
+        self.assertEqual(dead_letter.reason, 'test-error')
+        self.assertEqual(dead_letter.attempts, 1)
+
+    def test_throttled(self, controller_class_mock):
+        """Testing throttled enrollments are enqueued again without using a retry."""
+        error = ThrottledEnrollmentError('throttled', retry_after=0.5)
+        controller_class_mock.return_value._post_enrollment.side_effect = error  # noqa pylint: disable=protected-access
+
+        with patch.object(generate_salesforce_enrollment, 'max_retries', 0):
+            with patch.object(generate_salesforce_enrollment, 'apply_async') as apply_async_mock:
+                generate_salesforce_enrollment(self.data)  # pylint: disable=no-value-for-parameter
+
+        apply_async_mock.assert_called_once_with(args=(self.data,), countdown=0.5)
+        self.assertFalse(EnrollmentDeadLetter.objects.exists())  # pylint: disable=no-member
+
+
+class ProcessExternalEnrollmentTest(TestCase):
+    """Test class for process_external_enrollment task."""
+
+    @patch('openedx_external_enrollments.tasks.execute_external_enrollment')
+    @patch('openedx_external_enrollments.tasks.get_course_by_id')
+    def test_process_external_enrollment(self, get_course_by_id_mock, execute_mock):
+        """Testing the task loads the course and runs the enrollment controller."""
+        course_id = 'course-v1:test+CS102+2019_T3'
+        data = {
+            'user_email': 'test-email',
+            'course_mode': 'test-mode',
+            'is_active': True,
+        }
+        get_course_by_id_mock.return_value = 'test-course'
+
+        process_external_enrollment(course_id, data)
+
+        get_course_by_id_mock.assert_called_once_with(CourseKey.from_string(course_id))
+        execute_mock.assert_called_once_with(data=data, course='test-course')
+
+    @patch('openedx_external_enrollments.tasks.is_latest_enrollment_change')
+    @patch('openedx_external_enrollments.tasks.execute_external_enrollment')
+    @patch('openedx_external_enrollments.tasks.get_course_by_id')
+    def test_superseded_enrollment(self, get_course_by_id_mock, execute_mock, latest_mock):
+        """Testing enrollments superseded by a later change are skipped."""
+        course_id = 'course-v1:test+CS102+2019_T3'
+        data = {'user_email': 'test-email', 'course_mode': 'test-mode', 'is_active': True}
+        latest_mock.return_value = False
+
+        process_external_enrollment(course_id, data, debounce_token='token')
+
+        latest_mock.assert_called_once_with(data, course_id, 'token')
+        get_course_by_id_mock.assert_not_called()
+        execute_mock.assert_not_called()
+
+
+class FlushGreenfigRosterTest(TestCase):
+    """Test class for flush_greenfig_roster task."""
+
+    @patch('openedx_external_enrollments.tasks.GreenfigInstanceExternalEnrollment')
+    def test_flush_greenfig_roster(self, controller_class_mock):
+        """Testing the roster of the site and file path is flushed and rescheduled only while lines remain."""
+        controller_mock = controller_class_mock.return_value
+        controller_mock.has_pending_lines.return_value = False
+
+        flush_greenfig_roster(site_key='3', file_path='/courses.txt')
+
+        controller_class_mock.assert_called_once_with(site_key='3', file_path='/courses.txt')
+        controller_mock.clear_scheduled_flush.assert_called_once_with()
+        controller_mock.flush_roster.assert_called_once_with()
+        controller_mock._schedule_roster_flush.assert_not_called()  # pylint: disable=protected-access
+
+        controller_mock.has_pending_lines.return_value = True
+        flush_greenfig_roster(site_key='3', file_path='/courses.txt')
+
+        controller_mock._schedule_roster_flush.assert_called_once_with()  # pylint: disable=protected-access
+
+
+class RelayExternalEnrollmentOutboxTest(TestCase):
+    """Test class for relay_external_enrollment_outbox task."""
+
+    @patch('openedx_external_enrollments.tasks.schedule_outbox_relay')
+    @patch('openedx_external_enrollments.tasks.get_next_relay_countdown')
+    @patch('openedx_external_enrollments.tasks.relay_outbox')
+    @patch('openedx_external_enrollments.tasks.clear_scheduled_relay')
+    def test_relay_outbox(self, clear_mock, relay_mock, countdown_mock, schedule_mock):
+        """Testing another relay is scheduled only while changes remain, once the next one is due."""
+        countdown_mock.return_value = None
+
+        relay_external_enrollment_outbox()
+
+        clear_mock.assert_called_once_with()
+        relay_mock.assert_called_once_with()
+        schedule_mock.assert_not_called()
+
+        countdown_mock.return_value = 30
+        relay_external_enrollment_outbox()
+
+        schedule_mock.assert_called_once_with(30)
+
+
+class ProcessExternalEnrollmentJobTest(TestCase):
+    """Test class for process_external_enrollment_job task."""
+
+    def setUp(self):
+        """Create the job."""
+        self.course_id = 'course-v1:test+CS102+2019_T3'
+        self.job = ExternalEnrollmentJob.objects.create(  # pylint: disable=no-member
+            controller='edX',
+            course_id=self.course_id,
+            data={'user_email': 'test-email'},
+        )
+
+    @patch('openedx_external_enrollments.tasks.get_other_course_settings')
+    @patch('openedx_external_enrollments.tasks.ExternalEnrollmentFactory')
+    def test_job_succeeded(self, factory_mock, get_settings_mock):
+        """Testing the job stores the controller response."""
+        controller_mock = factory_mock.get_enrollment_controller.return_value
+        controller_mock._post_enrollment.return_value = ({'test': 'response'}, 200)  # pylint: disable=protected-access
+        get_settings_mock.return_value = {'external_platform_target': 'edX'}
+
+        process_external_enrollment_job(str(self.job.job_id))
+
+        self.job.refresh_from_db()
+        factory_mock.get_enrollment_controller.assert_called_once_with('edX')
+        controller_mock._post_enrollment.assert_called_once_with(  # pylint: disable=protected-access
+            {'user_email': 'test-email'},
+            {'external_platform_target': 'edX'},
+        )
+        get_settings_mock.assert_called_once_with(CourseKey.from_string(self.course_id))
+        self.assertEqual(self.job.status, ExternalEnrollmentJob.SUCCEEDED)
+        self.assertEqual(self.job.response, {'test': 'response'})
+        self.assertEqual(self.job.response_status, 200)
+
+    @patch('openedx_external_enrollments.tasks.get_other_course_settings')
+    @patch('openedx_external_enrollments.tasks.ExternalEnrollmentFactory')
+    def test_job_failed(self, factory_mock, get_settings_mock):
+        """Testing error responses and exceptions mark the job as failed."""
+        controller_mock = factory_mock.get_enrollment_controller.return_value
+        controller_mock._post_enrollment.return_value = ('test-error', 400)  # pylint: disable=protected-access
+
+        process_external_enrollment_job(str(self.job.job_id))
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, ExternalEnrollmentJob.FAILED)
+        self.assertEqual(self.job.response_status, 400)
+
+        get_settings_mock.side_effect = Exception('test-exception')
+
+        process_external_enrollment_job(str(self.job.job_id))
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, ExternalEnrollmentJob.FAILED)
+        self.assertEqual(self.job.response, {'error': 'test-exception'})
+        self.assertIsNone(self.job.response_status)
@@ -0,0 +1,91 @@
+"""Tests token_cache file."""
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from mock import Mock, patch
+
+from openedx_external_enrollments.token_cache import _get_cache_key, get_token, invalidate_token
+
+MODULE = 'openedx_external_enrollments.token_cache'
+
+
+class TokenCacheTest(TestCase):
+    """Test class for the token cache functions."""
+
+    def setUp(self):
+        """Clear the cache."""
+        cache.clear()
+        self.credentials = ('test-url', 'test-client-id')
+        self.token = {
+            'access_token': 'test-access-token',
+            'expires_in': 3600,
+        }
+
+    def test_get_token_cached(self):
+        """Testing the token is fetched once and reused."""
+        fetch_mock = Mock(return_value=self.token)
+
+        self.assertEqual(self.token, get_token('test', self.credentials, fetch_mock))
+        self.assertEqual(self.token, get_token('test', self.credentials, fetch_mock))
+        fetch_mock.assert_called_once_with()
+
+        self.assertEqual(self.token, get_token('test', ('other-url', 'test-client-id'), fetch_mock))
+        self.assertEqual(fetch_mock.call_count, 2)
+
+    def test_invalidate_token(self):
+        """Testing an invalidated token is fetched again."""
+        fetch_mock = Mock(return_value=self.token)
+
+        get_token('test', self.credentials, fetch_mock)
+        invalidate_token('test', self.credentials)
+        get_token('test', self.credentials, fetch_mock)
+
+        self.assertEqual(fetch_mock.call_count, 2)
+
+    def test_failed_fetch_not_cached(self):
+        """Testing a failed fetch is not stored."""
+        fetch_mock = Mock(return_value=None)
+
+        self.assertIsNone(get_token('test', self.credentials, fetch_mock))
+        self.assertIsNone(get_token('test', self.credentials, fetch_mock))
+        self.assertEqual(fetch_mock.call_count, 2)
+
+    @patch('{}.time'.format(MODULE))
+    def test_proactive_refresh(self, time_mock):
+        """Testing the token is refreshed before it expires and kept when the refresh fails."""
+        time_mock.time.return_value = 1000
+        fetch_mock = Mock(return_value=self.token)
+        get_token('test', self.credentials, fetch_mock)
+
+        time_mock.time.return_value = 1000 + 3600 - 60
+        new_token = dict(self.token, access_token='new-access-token')
+        fetch_mock.return_value = new_token
+
+        self.assertEqual(new_token, get_token('test', self.credentials, fetch_mock))
+        self.assertEqual(fetch_mock.call_count, 2)
+
+        time_mock.time.return_value = 1000 + 2 * (3600 - 60)
+        fetch_mock.side_effect = Exception('test-exception')
+
+        self.assertEqual(new_token, get_token('test', self.credentials, fetch_mock))
+
+    @override_settings(OEE_TOKEN_CACHE_SETTINGS={'lock_timeout': 10})
+    def test_refresh_locked(self):
+        """Testing only the worker holding the lock refreshes a token that is still valid."""
+        key = _get_cache_key('test', self.credentials)
+        cache.set(key, {'token': self.token, 'expires_at': float('inf'), 'refresh_at': 0})
+        cache.add('{}.lock'.format(key), True)
+        fetch_mock = Mock()
+
+        self.assertEqual(self.token, get_token('test', self.credentials, fetch_mock))
+        fetch_mock.assert_not_called()
+
+    @patch('{}.MAX_LOCK_WAIT'.format(MODULE), 0)
+    def test_wait_timed_out(self):
+        """Testing a worker that timed out waiting fetches the token and keeps the lock of the other worker."""
+        lock_key = '{}.lock'.format(_get_cache_key('test', self.credentials))
+        cache.add(lock_key, 'other-worker')
+        fetch_mock = Mock(return_value=self.token)
+
+        self.assertEqual(self.token, get_token('test', self.credentials, fetch_mock))
+        fetch_mock.assert_called_once_with()
+        self.assertEqual(cache.get(lock_key), 'other-worker')
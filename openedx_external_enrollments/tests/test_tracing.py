@@ -0,0 +1,156 @@
+"""Tests tracing file."""
+from unittest import skipUnless
+
+from django.test import TestCase, override_settings
+from mock import Mock, patch
+from rest_framework import status
+
+from openedx_external_enrollments.external_enrollments.base_external_enrollment import BaseExternalEnrollment
+from openedx_external_enrollments.tests.external_enrollments.tests_base_external_enrollment import build_response
+from openedx_external_enrollments.tracing import (
+    _get_task_carrier,
+    end_task_span,
+    inject_task_trace_context,
+    inject_trace_headers,
+    start_span,
+    start_task_span,
+    traced,
+)
+
+try:
+    from opentelemetry import trace
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+except ImportError:
+    EXPORTER = None
+else:
+    EXPORTER = InMemorySpanExporter()
+    PROVIDER = TracerProvider()
+    PROVIDER.add_span_processor(SimpleSpanProcessor(EXPORTER))
+    trace.set_tracer_provider(PROVIDER)
+
+
+class TracedEnrollment(BaseExternalEnrollment):
+    """Controller used to trace the enrollment requests."""
+
+    def __str__(self):
+        return 'test-class'
+
+    def _get_enrollment_data(self, data, course_settings):
+        """Return the payload of the enrollment."""
+        return data
+
+    def _get_enrollment_headers(self):
+        """Return the headers of the enrollment."""
+        return {}
+
+    def _get_enrollment_url(self, course_settings):
+        """Return the url of the enrollment."""
+        return 'https://fake-testing.com'
+
+
+class TracingDisabledTest(TestCase):
+    """Test class for the tracing helpers while tracing is disabled."""
+
+    def test_helpers_are_noop(self):
+        """Testing no span is opened and the headers are not changed."""
+        headers = {'Authorization': 'Bearer token'}
+        message_headers = {}
+
+        with start_span('test-span') as span:
+            self.assertIsNone(span)
+
+        inject_task_trace_context(sender='openedx_external_enrollments.tasks.task', headers=message_headers)
+
+        self.assertIs(inject_trace_headers(headers), headers)
+        self.assertEqual(message_headers, {})
+        self.assertEqual(traced('test-span')(lambda value: value * 2)(2), 4)
+
+    def test_task_carrier(self):
+        """Testing only the string trace context headers of the task request are propagated."""
+        request = Mock(spec=['headers', 'traceparent', 'tracestate'], headers=None, traceparent='test-parent')
+        request.tracestate = Mock()
+
+        self.assertEqual(_get_task_carrier(request), {'traceparent': 'test-parent'})
+
+
+@skipUnless(EXPORTER is not None, 'opentelemetry-sdk is not installed')
+@override_settings(OEE_TRACING_ENABLED=True)
+class TracingTest(TestCase):
+    """Test class for the tracing helpers."""
+
+    def setUp(self):
+        """Clear the exported spans."""
+        EXPORTER.clear()
+
+    def get_spans(self):
+        """Return the finished spans by name."""
+        return {span.name: span for span in EXPORTER.get_finished_spans()}
+
+    @patch.object(TracedEnrollment, '_get_enrollment_url')
+    @patch.object(TracedEnrollment, '_get_enrollment_headers')
+    @patch.object(TracedEnrollment, '_get_enrollment_data')
+    @patch.object(TracedEnrollment, '_execute_post')
+    def test_enrollment_spans(self, post_mock, data_mock, headers_mock, url_mock):
+        """Testing the enrollment steps are children of the caller span and the context is propagated."""
+        url_mock.return_value = 'https://fake-testing.com'
+        data_mock.return_value = {'test': 'data'}
+        headers_mock.return_value = {'Content-Type': 'application/json'}
+        post_mock.side_effect = lambda **kwargs: build_response(status.HTTP_200_OK, {'test': 'data'})
+
+        traced('update_external_enrollment')(TracedEnrollment()._post_enrollment)(  # pylint: disable=protected-access
+            {'user_email': 'test@email.com'},
+        )
+
+        spans = self.get_spans()
+        root = spans['update_external_enrollment']
+
+        for name in ('build_payload', 'auth', 'http_post'):
+            self.assertEqual(spans[name].parent.span_id, root.context.span_id)
+            self.assertEqual(spans[name].attributes['controller'], 'test-class')
+
+        self.assertEqual(spans['http_post'].attributes['http.status_code'], status.HTTP_200_OK)
+        headers = post_mock.call_args[1]['headers']
+        self.assertEqual(headers['Content-Type'], 'application/json')
+        self.assertIn('{:032x}'.format(root.context.trace_id), headers['traceparent'])
+        self.assertEqual(headers_mock.return_value, {'Content-Type': 'application/json'})
+
+    def test_task_trace_context(self):
+        """Testing the tasks of the app continue the trace of the code that published them."""
+        headers = {}
+
+        with start_span('update_external_enrollment') as span:
+            inject_task_trace_context(sender='openedx_external_enrollments.tasks.process_external_enrollment',
+                                      headers=headers)
+
+        task = Mock(spec=['name', 'request'])
+        task.name = 'openedx_external_enrollments.tasks.process_external_enrollment'
+        task.request = Mock(spec=['headers'], headers=dict(headers, other='header', retries=0))
+
+        start_task_span(task_id='task-id', task=task)
+
+        with start_span('execute_external_enrollment'):
+            pass
+
+        end_task_span(task_id='task-id')
+
+        spans = self.get_spans()
+        task_span = spans[task.name]
+        self.assertEqual(task_span.parent.span_id, span.get_span_context().span_id)
+        self.assertEqual(spans['execute_external_enrollment'].parent.span_id, task_span.context.span_id)
+
+    def test_task_of_other_apps(self):
+        """Testing the tasks of other apps are not traced."""
+        headers = {}
+        task = Mock(spec=['name', 'request'])
+        task.name = 'lms.djangoapps.grades.tasks.compute_grades'
+
+        with start_span('test-span'):
+            inject_task_trace_context(sender=task.name, headers=headers)
+
+        start_task_span(task_id='task-id', task=task)
+        end_task_span(task_id='task-id')
+
+        self.assertEqual(headers, {})
+        self.assertEqual(list(self.get_spans()), ['test-span'])
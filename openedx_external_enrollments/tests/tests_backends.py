@@ -1,4 +1,7 @@
 """This file contains all the necessary backend in a test scenario."""
+from django.dispatch import Signal
+
+course_published = Signal(providing_args=['course_key'])  # pylint: disable=invalid-name
 
 
 class ApiKeyHeaderPermissionIsAuthenticated(object):
@@ -15,3 +18,8 @@ def get_course_enrollment_backend():
 
 def get_configuration_helpers():
     """Test get_configuration_helpers method."""
+
+
+def get_course_published_signal_backend():
+    """Test get_course_published_signal_backend method."""
+    return course_published
@@ -1,6 +1,9 @@
 """Tests factory file."""
+from django.core.cache import cache
 from django.test import TestCase
+from mock import Mock, patch
 
+from openedx_external_enrollments.exceptions import UnknownExternalTargetError
 from openedx_external_enrollments.external_enrollments.edx_enterprise_external_enrollment import (
     EdxEnterpriseExternalEnrollment,
 )
@@ -8,11 +11,27 @@ from openedx_external_enrollments.external_enrollments.edx_instance_external_enr
     EdxInstanceExternalEnrollment,
 )
 from openedx_external_enrollments.factory import ExternalEnrollmentFactory
+from openedx_external_enrollments.site_cache import invalidate_site
+
+MODULE = 'openedx_external_enrollments.factory'
+
+
+class PluginExternalEnrollment(EdxInstanceExternalEnrollment):
+    """Test controller installed through the entry point group."""
 
 
 class ExternalEnrollmentFactoryTest(TestCase):
     """Test class for ExternalEnrollmentFactory class."""
 
+    def setUp(self):
+        """Start every test with an empty registry and the default site."""
+        cache.clear()
+        ExternalEnrollmentFactory.reset()
+        self.addCleanup(ExternalEnrollmentFactory.reset)
+        site_key_patcher = patch('{}.get_current_site_key'.format(MODULE), return_value='default')
+        self.site_key_mock = site_key_patcher.start()
+        self.addCleanup(site_key_patcher.stop)
+
     def test_get_enrollment_controller(self):
         """Testing _get_enrollment_controller method."""
         controller = 'edX'
@@ -29,3 +48,44 @@ class ExternalEnrollmentFactoryTest(TestCase):
                 EdxInstanceExternalEnrollment,
             )
         )
+
+    def test_unknown_target(self):
+        """Testing unknown targets raise instead of falling back to edX."""
+        with self.assertRaises(UnknownExternalTargetError):
+            ExternalEnrollmentFactory.get_enrollment_controller('unknown')
+
+    def test_instances_cached_per_site(self):
+        """Testing instances are reused per site until the site configuration changes."""
+        controller = ExternalEnrollmentFactory.get_enrollment_controller('openedX')
+
+        self.assertIs(ExternalEnrollmentFactory.get_enrollment_controller('openedx'), controller)
+
+        self.site_key_mock.return_value = '2'
+        other_site_controller = ExternalEnrollmentFactory.get_enrollment_controller('openedx')
+
+        self.assertIsNot(other_site_controller, controller)
+
+        invalidate_site('2')
+
+        self.assertIsNot(ExternalEnrollmentFactory.get_enrollment_controller('openedx'), other_site_controller)
+        self.site_key_mock.return_value = 'default'
+        self.assertIs(ExternalEnrollmentFactory.get_enrollment_controller('openedx'), controller)
+
+    @patch('{}.pkg_resources.iter_entry_points'.format(MODULE))
+    def test_plugin_controllers(self, iter_entry_points_mock):
+        """Testing controllers are loaded from the entry point group, skipping the broken ones."""
+        plugin_entry_point = Mock()
+        plugin_entry_point.name = 'Plugin'
+        plugin_entry_point.load.return_value = PluginExternalEnrollment
+        broken_entry_point = Mock()
+        broken_entry_point.name = 'broken'
+        broken_entry_point.load.side_effect = ImportError('test-error')
+        iter_entry_points_mock.return_value = [plugin_entry_point, broken_entry_point]
+
+        self.assertIsInstance(ExternalEnrollmentFactory.get_enrollment_controller('plugin'), PluginExternalEnrollment)
+        self.assertNotIn('broken', ExternalEnrollmentFactory.get_registry())
+        iter_entry_points_mock.assert_called_once_with('openedx_external_enrollments.controllers')
+
+        ExternalEnrollmentFactory.register_controller('other', PluginExternalEnrollment)
+
+        self.assertIsInstance(ExternalEnrollmentFactory.get_enrollment_controller('other'), PluginExternalEnrollment)
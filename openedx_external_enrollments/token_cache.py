@@ -0,0 +1,154 @@
+"""
+Shared cache for the OAuth tokens used by the enrollment controllers.
+
+Tokens are stored in the Django cache keyed by provider and credentials, so every
+worker reuses the same token until it is close to expiring. Only the worker holding
+the refresh lock fetches a new token, the rest keep using the current one.
+"""
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from openedx_external_enrollments.locks import acquire_lock, release_lock
+from openedx_external_enrollments.metrics import increment, timed
+
+LOG = logging.getLogger(__name__)
+
+TOKEN_CACHE_KEY = 'openedx_external_enrollments.token.{provider}.{credentials}'
+LOCK_WAIT_INTERVAL = 0.1
+# Longest time a request waits for another worker's refresh before fetching the token itself.
+MAX_LOCK_WAIT = 2
+DEFAULT_TOKEN_CACHE_SETTINGS = {
+    'default_timeout': 900,
+    'refresh_margin': 120,
+    'lock_timeout': 10,
+}
+
+
+def get_token(provider, credentials, fetch_token):
+    """
+    Return a valid access token for the provider, fetching a new one when necessary.
+
+    Args:
+        provider: name of the provider, e.g. str(controller).
+        credentials: iterable with the values that identify the client credentials.
+        fetch_token: callable that returns a token dict or None when the request fails.
+    Returns:
+        The token dict or None.
+    """
+    key = _get_cache_key(provider, credentials)
+    cached_token = cache.get(key)
+
+    if cached_token and time.time() < cached_token['refresh_at']:
+        return cached_token['token']
+
+    lock_key = '{}.lock'.format(key)
+    lock_token = acquire_lock(lock_key, get_token_cache_settings()['lock_timeout'])
+
+    if lock_token is None:
+        if cached_token and time.time() < cached_token['expires_at']:
+            # Another worker is already refreshing the token and the current one is still valid.
+            return cached_token['token']
+
+        cached_token = _wait_for_token(key)
+
+        if cached_token:
+            return cached_token['token']
+
+        LOG.warning('Timed out waiting for the %s token refresh, fetching a new token.', provider)
+
+    try:
+        with timed('token_fetch_time', controller=provider):
+            token = fetch_token()
+    except Exception as error:  # pylint: disable=broad-except
+        increment('token_fetches', controller=provider, outcome='error')
+
+        if not (cached_token and time.time() < cached_token['expires_at']):
+            raise
+
+        LOG.error('Failed to refresh the %s token, using the cached one. Reason: %s', provider, str(error))
+        return cached_token['token']
+    finally:
+        release_lock(lock_key, lock_token)
+
+    increment('token_fetches', controller=provider, outcome='success' if token else 'failure')
+
+    if token:
+        _store_token(key, token)
+    elif cached_token and time.time() < cached_token['expires_at']:
+        return cached_token['token']
+
+    return token
+
+
+def invalidate_token(provider, credentials):
+    """
+    Remove the cached token of the provider, e.g. after the provider rejected it with a 401.
+    """
+    cache.delete(_get_cache_key(provider, credentials))
+
+
+def get_token_cache_settings():
+    """
+    Return the token cache settings merged over the default ones.
+    """
+    token_cache_settings = dict(DEFAULT_TOKEN_CACHE_SETTINGS)
+    token_cache_settings.update(settings.OEE_TOKEN_CACHE_SETTINGS)
+
+    return token_cache_settings
+
+
+def _get_cache_key(provider, credentials):
+    """
+    Return the cache key for the given provider and credentials.
+    """
+    credentials_hash = hashlib.sha256(
+        '|'.join(str(value) for value in credentials).encode('utf-8')
+    ).hexdigest()
+
+    return TOKEN_CACHE_KEY.format(provider=provider, credentials=credentials_hash)
+
+
+def _store_token(key, token):
+    """
+    Store the token with a TTL derived from its expires_in value.
+    """
+    token_cache_settings = get_token_cache_settings()
+
+    try:
+        expires_in = int(token.get('expires_in') or token_cache_settings['default_timeout'])
+    except (TypeError, ValueError):
+        expires_in = token_cache_settings['default_timeout']
+
+    if expires_in <= 0:
+        return
+
+    now = time.time()
+    cache.set(
+        key,
+        {
+            'token': dict(token),
+            'expires_at': now + expires_in,
+            'refresh_at': now + max(expires_in - token_cache_settings['refresh_margin'], 0),
+        },
+        expires_in,
+    )
+
+
+def _wait_for_token(key):
+    """
+    Wait until the worker holding the lock stores a new token, at most MAX_LOCK_WAIT seconds.
+    """
+    deadline = time.time() + min(get_token_cache_settings()['lock_timeout'], MAX_LOCK_WAIT)
+
+    while time.time() < deadline:
+        time.sleep(LOCK_WAIT_INTERVAL)
+        cached_token = cache.get(key)
+
+        if cached_token and time.time() < cached_token['expires_at']:
+            return cached_token
+
+    return None
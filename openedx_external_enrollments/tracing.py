@@ -0,0 +1,182 @@
+"""
+Optional OpenTelemetry tracing of the external enrollments.
+
+When OEE_TRACING_ENABLED is set and the opentelemetry-api package is installed, spans are opened
+from the CourseEnrollment signal receivers and the API views down to the provider requests,
+otherwise every helper is a no-op. The spans are exported by the tracer provider configured by
+the application.
+
+The W3C trace context is injected in the outbound request headers and in the headers of the
+celery tasks of this app, so the tasks continue the trace of the code that enqueued them.
+"""
+import logging
+from contextlib import contextmanager
+from functools import wraps
+from importlib import import_module
+
+from celery.signals import before_task_publish, task_postrun, task_prerun
+from django.conf import settings
+
+LOG = logging.getLogger(__name__)
+
+TRACER_NAME = 'openedx_external_enrollments'
+TASK_NAME_PREFIX = 'openedx_external_enrollments.'
+TRACE_CONTEXT_HEADERS = ('traceparent', 'tracestate')
+
+_OPENTELEMETRY = {}
+_TASK_SPANS = {}
+
+
+def get_opentelemetry():
+    """
+    Return the (trace, propagate, context) opentelemetry modules or None when tracing is disabled.
+    """
+    if not settings.OEE_TRACING_ENABLED:
+        return None
+
+    if 'modules' not in _OPENTELEMETRY:
+        try:
+            _OPENTELEMETRY['modules'] = (
+                import_module('opentelemetry.trace'),
+                import_module('opentelemetry.propagate'),
+                import_module('opentelemetry.context'),
+            )
+        except ImportError as error:
+            LOG.error('OpenTelemetry is not available, spans are not recorded. Reason: %s', str(error))
+            _OPENTELEMETRY['modules'] = None
+
+    return _OPENTELEMETRY['modules']
+
+
+@contextmanager
+def start_span(name, **attributes):
+    """
+    Open a span, child of the current one, for the wrapped block.
+
+    Yields:
+        The span or None when tracing is disabled.
+    """
+    opentelemetry = get_opentelemetry()
+
+    if opentelemetry is None:
+        yield None
+        return
+
+    tracer = opentelemetry[0].get_tracer(TRACER_NAME)
+
+    with tracer.start_as_current_span(name, attributes=_get_attributes(attributes)) as span:
+        yield span
+
+
+def traced(name):
+    """
+    Decorator that opens a span named name for every call of the function.
+    """
+    def decorator(func):
+        """
+        Wrap func in the span.
+        """
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            """
+            Call func in the span.
+            """
+            with start_span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def inject_trace_headers(headers):
+    """
+    Return a copy of the headers with the W3C trace context of the current span.
+
+    The headers are returned unchanged when tracing is disabled.
+    """
+    opentelemetry = get_opentelemetry()
+
+    if opentelemetry is None:
+        return headers
+
+    headers = dict(headers or {})
+    opentelemetry[1].inject(headers)
+
+    return headers
+
+
+def inject_task_trace_context(sender=None, headers=None, **kwargs):  # pylint: disable=unused-argument
+    """
+    Add the W3C trace context to the headers of the tasks of this app when they're published.
+    """
+    opentelemetry = get_opentelemetry()
+
+    if opentelemetry is None or headers is None or not str(sender).startswith(TASK_NAME_PREFIX):
+        return
+
+    opentelemetry[1].inject(headers)
+
+
+def start_task_span(task_id=None, task=None, **kwargs):  # pylint: disable=unused-argument
+    """
+    Open the span of a task of this app as a child of the trace context of its headers.
+    """
+    opentelemetry = get_opentelemetry()
+
+    if opentelemetry is None or task is None or not task.name.startswith(TASK_NAME_PREFIX):
+        return
+
+    trace, propagate, context = opentelemetry
+    parent_context = propagate.extract(_get_task_carrier(task.request))
+    span = trace.get_tracer(TRACER_NAME).start_span(task.name, context=parent_context)
+    _TASK_SPANS[task_id] = (span, context.attach(trace.set_span_in_context(span)))
+
+
+def end_task_span(task_id=None, **kwargs):  # pylint: disable=unused-argument
+    """
+    Close the span opened for the task.
+    """
+    task_span = _TASK_SPANS.pop(task_id, None)
+
+    if task_span is None:
+        return
+
+    span, token = task_span
+    get_opentelemetry()[2].detach(token)
+    span.end()
+
+
+def _get_task_carrier(request):
+    """
+    Return the trace context headers of the task request.
+
+    Celery 3 keeps the custom message headers in request.headers, newer protocols set them
+    as attributes of the request. Only the string values are kept, as the propagators expect.
+    """
+    headers = getattr(request, 'headers', None)
+
+    if not isinstance(headers, dict):
+        headers = {}
+
+    carrier = {}
+
+    for header in TRACE_CONTEXT_HEADERS:
+        value = headers.get(header) or getattr(request, header, None)
+
+        if value and isinstance(value, str):
+            carrier[header] = value
+
+    return carrier
+
+
+def _get_attributes(attributes):
+    """
+    Return the span attributes as strings, dropping the empty ones.
+    """
+    return {key: str(value) for key, value in attributes.items() if value is not None}
+
+
+before_task_publish.connect(inject_task_trace_context, dispatch_uid='oee_inject_task_trace_context')
+task_prerun.connect(start_task_span, dispatch_uid='oee_start_task_span')
+task_postrun.connect(end_task_span, dispatch_uid='oee_end_task_span')
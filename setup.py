@@ -42,5 +42,8 @@ setup(
         "lms.djangoapp": [
             'openedx_external_enrollments = openedx_external_enrollments.apps:OpenedxExternalEnrollmentConfig',
         ],
+        "cms.djangoapp": [
+            'openedx_external_enrollments = openedx_external_enrollments.apps:OpenedxExternalEnrollmentConfig',
+        ],
     }
 )